@@ -1,6 +1,7 @@
 import os
+import re
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, Response
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
@@ -39,7 +40,7 @@ def from_json_filter(value):
         return []
 
 # Import utils after app initialization
-from utils import proxmox, docker, storage
+from utils import proxmox, docker, storage, cache, proxmox_collector, proxmox_tasks, proxmox_delta, upstream, docker_events, docker_sampler, docker_jobs, docker_logs, docker_df, sshpool, zfs, zfs_snapshots, dirsize
 from models import UserSettings, DocuEntry, ScriptEntry, MediaRequest
 
 # Initialize default settings if none exist
@@ -58,6 +59,22 @@ with app.app_context():
         db.session.commit()
         logging.info("Initialized default settings")
 
+# Start the optional background Proxmox collector
+if proxmox_collector.PROXMOX_COLLECTOR_ENABLED:
+    proxmox_collector.start_collector()
+
+# Start the optional Docker events subscriber
+if docker_events.DOCKER_EVENTS_ENABLED:
+    docker_events.start_watcher()
+
+# Start the optional streaming container stats sampler
+if docker_sampler.DOCKER_SAMPLER_ENABLED:
+    docker_sampler.start_sampler()
+
+# Start the optional Docker disk usage inventory
+if docker_df.DOCKER_DF_ENABLED:
+    docker_df.start_inventory()
+
 # Routes
 @app.route('/')
 def index():
@@ -131,6 +148,10 @@ def settings_page():
 # API Routes
 @app.route('/api/proxmox/nodes')
 def get_proxmox_nodes():
+    snapshot = proxmox_collector.get_fresh_snapshot()
+    if snapshot:
+        return jsonify(snapshot.nodes)
+    
     settings = UserSettings.query.first()
     try:
         nodes = proxmox.get_nodes(settings)
@@ -142,31 +163,269 @@ def get_proxmox_nodes():
 
 @app.route('/api/proxmox/resources')
 def get_proxmox_resources():
+    """
+    Proxmox cluster resources
+    
+    Without query parameters this returns the full list. With ?since=<version>
+    it returns only what was added, removed or changed since that version
+    (or a full keyed snapshot if the version is no longer known).
+    """
+    since = request.args.get('since')
+    
+    snapshot = proxmox_collector.get_fresh_snapshot()
+    if snapshot:
+        resources = snapshot.resources
+    else:
+        settings = UserSettings.query.first()
+        try:
+            resources = proxmox.get_resources(settings)
+        except Exception as e:
+            logging.error(f"Error getting Proxmox resources: {str(e)}")
+            if since is not None:
+                # Keep the client's version so it retains what it already has
+                return jsonify({"version": since, "delta": True, "added": {},
+                                "removed": [], "changed": {}, "error": str(e)}), 200
+            # Return empty array instead of error
+            return jsonify([]), 200
+    
+    if since is None:
+        version, _ = proxmox_delta.resource_versions.record(resources)
+        response = jsonify(resources)
+        response.headers['X-Resource-Version'] = version
+        return response
+    
+    return jsonify(proxmox_delta.resource_versions.delta(since, resources))
+
+@app.route('/api/proxmox/nodes/details')
+def get_proxmox_nodes_details():
+    snapshot = proxmox_collector.get_fresh_snapshot()
+    if snapshot:
+        return jsonify(snapshot.node_details)
+    
     settings = UserSettings.query.first()
     try:
-        resources = proxmox.get_resources(settings)
-        return jsonify(resources)
+        details = proxmox.get_nodes_details(settings)
+        return jsonify(details)
     except Exception as e:
-        logging.error(f"Error getting Proxmox resources: {str(e)}")
-        # Return empty array instead of error
-        return jsonify([]), 200
+        logging.error(f"Error getting Proxmox node details: {str(e)}")
+        return jsonify({"nodes": {}, "errors": {}, "error": str(e)}), 200
+
+@app.route('/api/proxmox/history/<path:resource_id>')
+def get_proxmox_history(resource_id):
+    """Locally stored RRD history for a node or guest, e.g. qemu/100?metric=cpu"""
+    settings = UserSettings.query.first()
+    try:
+        history = proxmox_collector.get_history(
+            settings,
+            resource_id,
+            request.args.get('metric', 'cpu'),
+            start=request.args.get('start', type=int),
+            end=request.args.get('end', type=int),
+            resolution=request.args.get('resolution')
+        )
+        return jsonify(history)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error getting Proxmox history: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/proxmox/tasks')
+def get_proxmox_tasks():
+    """Recent Proxmox tasks from the local index, filterable by type/node/status/vmid"""
+    settings = UserSettings.query.first()
+    try:
+        proxmox_tasks.task_index.refresh(settings)
+    except Exception as e:
+        logging.error(f"Error refreshing Proxmox tasks: {str(e)}")
+    
+    tasks = proxmox_tasks.task_index.query(
+        task_type=request.args.get('type'),
+        node=request.args.get('node'),
+        state=request.args.get('status'),
+        vmid=request.args.get('vmid'),
+        cluster=request.args.get('cluster'),
+        limit=request.args.get('limit', 100, type=int)
+    )
+    return jsonify(tasks)
+
+@app.route('/api/proxmox/tasks/status')
+def get_proxmox_tasks_status():
+    """Task index size, per-node cursors and last poll errors"""
+    return jsonify(proxmox_tasks.task_index.get_status())
+
+@app.route('/api/proxmox/clusters')
+def get_proxmox_clusters():
+    """Reachability of each configured Proxmox cluster from its last query"""
+    try:
+        return jsonify(proxmox.get_cluster_status())
+    except Exception as e:
+        logging.error(f"Error getting Proxmox cluster status: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/proxmox/collector')
+def get_proxmox_collector_status():
+    """Background collector health: snapshot age, lag and failures"""
+    collector = proxmox_collector.get_collector()
+    if not collector:
+        return jsonify({"running": False, "enabled": False})
+    status = collector.get_status()
+    status['enabled'] = True
+    return jsonify(status)
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """Hit/miss/coalescing counters for the upstream response caches"""
+    return jsonify(cache.get_all_stats())
+
+@app.route('/api/upstream/breakers')
+def get_upstream_breakers():
+    """Circuit breaker state for every upstream (Proxmox clusters, Docker hosts)"""
+    return jsonify(upstream.get_all_breakers())
+
+@app.route('/api/upstream/breakers/<path:name>/reset', methods=['POST'])
+def reset_upstream_breaker(name):
+    """Force a breaker closed so the next call goes straight to the upstream"""
+    if not upstream.reset_breaker(name):
+        return jsonify({"error": f"No breaker named {name}"}), 404
+    return jsonify({"success": True, "message": f"Breaker {name} reset"})
 
 @app.route('/api/docker/containers')
 def get_docker_containers():
+    """
+    List containers, optionally shaped on the server
+    
+    Query: fields (comma list of keys), state (comma list), sort (a name
+    from docker.SORT_KEYS such as name, created or sizerw; '-' for
+    descending), limit and cursor. The body stays a plain array;
+    X-Total-Count and X-Next-Cursor carry the paging info.
+    """
+    args = request.args
+    
+    def split(name):
+        return [v for v in args.get(name, '').split(',') if v] or None
+    
+    limit = None
+    if args.get('limit'):
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+    
+    # Served from the event-driven table when the watcher is attached
+    containers = docker_events.get_current_containers()
+    if containers is None:
+        settings = UserSettings.query.first()
+        try:
+            containers = docker.get_containers(settings)
+        except Exception as e:
+            logging.error(f"Error getting Docker containers: {str(e)}")
+            # Return empty array instead of error
+            return jsonify([]), 200
+    
+    if not any(args.get(name) for name in ('fields', 'state', 'sort', 'limit', 'cursor')):
+        return jsonify(containers)
+    
+    try:
+        page, next_cursor, total = docker.query_containers(
+            containers,
+            fields=split('fields'),
+            states=split('state'),
+            sort=args.get('sort'),
+            limit=limit,
+            cursor=args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    response = jsonify(page)
+    response.headers['X-Total-Count'] = str(total)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/docker/hosts')
+def get_docker_hosts():
+    """Last listing outcome for each Docker host in the fleet"""
+    try:
+        return jsonify(docker.get_host_status())
+    except Exception as e:
+        logging.error(f"Error getting Docker host status: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/docker/stats')
+def get_docker_stats():
+    """Stats for all running containers (or ?ids=a,b), gathered concurrently"""
     settings = UserSettings.query.first()
+    ids = request.args.get('ids')
+    if ids:
+        container_ids = [i for i in ids.split(',') if i]
+    else:
+        # Avoid an extra /containers/json round-trip when the event table is current
+        running = docker_events.get_current_containers(all_containers=False)
+        container_ids = [c['Id'] for c in running] if running is not None else None
     try:
-        containers = docker.get_containers(settings)
-        return jsonify(containers)
+        return jsonify(docker.get_all_container_stats(settings, container_ids))
     except Exception as e:
-        logging.error(f"Error getting Docker containers: {str(e)}")
-        # Return empty array instead of error
-        return jsonify([]), 200
+        logging.error(f"Error getting Docker stats: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/docker/stats/live')
+def get_docker_live_stats():
+    """Rolling 1m/5m averages and peaks from the streaming sampler (?ids=a,b to filter)"""
+    sampler = docker_sampler.get_sampler()
+    if not sampler or not sampler.is_running():
+        return jsonify({"enabled": False, "containers": {}})
+    ids = request.args.get('ids')
+    container_ids = set(i for i in ids.split(',') if i) if ids else None
+    return jsonify({"enabled": True, "containers": sampler.summaries(container_ids)})
+
+@app.route('/api/docker/sampler')
+def get_docker_sampler_status():
+    """Stats sampler health: open streams and error counters"""
+    sampler = docker_sampler.get_sampler()
+    if not sampler:
+        return jsonify({"running": False, "enabled": docker_sampler.DOCKER_SAMPLER_ENABLED})
+    status = sampler.get_status()
+    status['enabled'] = docker_sampler.DOCKER_SAMPLER_ENABLED
+    return jsonify(status)
+
+@app.route('/api/docker/disk')
+def get_docker_disk_usage():
+    """Cached /system/df summary per host, refreshed in the background"""
+    inventory = docker_df.get_inventory()
+    if not inventory:
+        return jsonify({"enabled": False, "hosts": {}})
+    return jsonify({"enabled": True, "status": inventory.get_status(), "hosts": inventory.hosts()})
+
+@app.route('/api/docker/disk/refresh', methods=['POST'])
+def refresh_docker_disk_usage():
+    """Trigger an early background refresh of the disk usage inventory"""
+    inventory = docker_df.get_inventory()
+    if not inventory or not inventory.is_running():
+        return jsonify({"error": "Docker disk usage inventory is not enabled"}), 409
+    inventory.request_refresh()
+    return jsonify({"success": True, "message": "Refresh scheduled"}), 202
+
+@app.route('/api/docker/events')
+def get_docker_events_status():
+    """Event watcher health: connection state, table size and event counters"""
+    watchers = docker_events.get_watchers()
+    hosts = {host: watcher.get_status() for host, watcher in watchers.items()}
+    return jsonify({
+        "enabled": docker_events.DOCKER_EVENTS_ENABLED,
+        "running": any(status['running'] for status in hosts.values()),
+        "current": bool(hosts) and all(status['current'] for status in hosts.values()),
+        "hosts": hosts
+    })
 
 @app.route('/api/docker/container/<container_id>/start', methods=['POST'])
 def start_container(container_id):
     settings = UserSettings.query.first()
     try:
-        result = docker.start_container(settings, container_id)
+        result = docker.start_container(settings, container_id, request.args.get('host'))
         return jsonify({"success": True, "message": "Container started"})
     except Exception as e:
         logging.error(f"Error starting container: {str(e)}")
@@ -176,7 +435,7 @@ def start_container(container_id):
 def stop_container(container_id):
     settings = UserSettings.query.first()
     try:
-        result = docker.stop_container(settings, container_id)
+        result = docker.stop_container(settings, container_id, request.args.get('host'))
         return jsonify({"success": True, "message": "Container stopped"})
     except Exception as e:
         logging.error(f"Error stopping container: {str(e)}")
@@ -186,12 +445,128 @@ def stop_container(container_id):
 def restart_container(container_id):
     settings = UserSettings.query.first()
     try:
-        result = docker.restart_container(settings, container_id)
+        result = docker.restart_container(settings, container_id, request.args.get('host'))
         return jsonify({"success": True, "message": "Container restarted"})
     except Exception as e:
         logging.error(f"Error restarting container: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/docker/container/<container_id>/logs')
+def stream_container_logs(container_id):
+    """
+    Stream container logs as Server-Sent Events (or plain text with ?format=text)
+    
+    Query: follow (default 1), tail, filter (regex), stream (stdout,stderr),
+    timestamps, host
+    """
+    settings = UserSettings.query.first()
+    try:
+        pattern = re.compile(request.args['filter']) if request.args.get('filter') else None
+    except re.error as e:
+        return jsonify({"error": f"Invalid filter: {str(e)}"}), 400
+    
+    follow = request.args.get('follow', '1').lower() not in ('0', 'false')
+    streams = tuple(request.args.get('stream', 'stdout,stderr').split(','))
+    as_text = request.args.get('format') == 'text'
+    
+    try:
+        lines = docker_logs.follow_logs(
+            settings,
+            container_id,
+            host=request.args.get('host'),
+            follow=follow,
+            tail=request.args.get('tail', type=int),
+            streams=streams,
+            pattern=pattern,
+            timestamps=request.args.get('timestamps') == '1'
+        )
+    except docker_logs.StreamLimitError as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '10'
+        return response, 429
+    except Exception as e:
+        logging.error(f"Error opening logs for container {container_id}: {str(e)}")
+        response = getattr(e, 'response', None)
+        status = 404 if response is not None and response.status_code == 404 else 500
+        return jsonify({"error": str(e)}), status
+    
+    def generate():
+        try:
+            if as_text:
+                for stream, line in lines:
+                    yield f"{line}\n"
+                return
+            # Comment line so proxies and the browser see the stream open immediately
+            yield ": connected\n\n"
+            for stream, line in lines:
+                yield f"event: {stream}\ndata: {line}\n\n"
+            yield "event: end\ndata: \n\n"
+        finally:
+            # Closes the Docker connection when the browser goes away
+            lines.close()
+    
+    response = Response(
+        generate(),
+        mimetype='text/plain' if as_text else 'text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Also runs if generate() is never iterated (client gone before the first chunk)
+    response.call_on_close(lines.close)
+    return response
+
+@app.route('/api/docker/bulk', methods=['POST'])
+def bulk_container_action():
+    """
+    Start, stop or restart many containers in the background
+    
+    Body: {"action": "restart", "ids": [...]} or {"action": "restart", "label": "com.docker.compose.project=media"}
+    with an optional "concurrency". Returns a job ID to poll at /api/docker/jobs/<job_id>.
+    """
+    settings = UserSettings.query.first()
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in docker_jobs.ACTIONS:
+        return jsonify({"error": f"Unknown action: {action}"}), 400
+    if not data.get('ids') and not data.get('label'):
+        return jsonify({"error": "Provide a list of container ids or a label selector"}), 400
+    if data.get('label') and not isinstance(data['label'], str):
+        return jsonify({"error": "'label' must be a string"}), 400
+    
+    concurrency = None
+    if data.get('concurrency') is not None:
+        try:
+            concurrency = int(data['concurrency'])
+        except (TypeError, ValueError):
+            concurrency = 0
+        if concurrency < 1:
+            return jsonify({"error": "'concurrency' must be a positive integer"}), 400
+    
+    try:
+        targets = docker_jobs.resolve_targets(settings, data.get('ids'), data.get('label'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error resolving bulk action targets: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    if not targets:
+        return jsonify({"error": "No containers matched"}), 404
+    
+    job = docker_jobs.jobs.submit(settings, action, targets, concurrency)
+    return jsonify({"job_id": job.id, "total": len(targets)}), 202
+
+@app.route('/api/docker/jobs')
+def list_docker_jobs():
+    """Recent bulk jobs, newest first"""
+    return jsonify(docker_jobs.jobs.list())
+
+@app.route('/api/docker/jobs/<job_id>')
+def get_docker_job(job_id):
+    """Per-container progress for one bulk job"""
+    job = docker_jobs.jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/api/storage/info')
 def get_storage_info():
     settings = UserSettings.query.first()
@@ -203,6 +578,48 @@ def get_storage_info():
         # Return empty array instead of error
         return jsonify([]), 200
 
+@app.route('/api/storage/details')
+def get_storage_details():
+    """
+    Largest top-level directories under a storage path
+    
+    Query: path (must be within a configured storage path). With
+    ?stream=1 each directory is sent as a Server-Sent Event as soon as its
+    subtree has been sized, followed by an "end" event.
+    """
+    settings = UserSettings.query.first()
+    try:
+        path = storage.resolve_storage_path(settings, request.args.get('path', ''))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if request.args.get('stream') != '1':
+        return jsonify(storage.get_storage_details(path))
+    
+    if not os.path.isdir(path):
+        return jsonify({"error": f"'{path}' is not a directory"}), 404
+    
+    def generate():
+        sizes = dirsize.iter_directory_sizes(path)
+        try:
+            yield ": connected\n\n"
+            count = 0
+            for entry in sizes:
+                count += 1
+                yield f"event: dir\ndata: {json.dumps(entry)}\n\n"
+            yield f"event: end\ndata: {json.dumps({'path': path, 'directories': count})}\n\n"
+        except OSError as e:
+            yield f"event: failed\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            # Stops the walker threads when the browser goes away
+            sizes.close()
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/storage/zpool/list')
 def list_zpools():
     """List all ZFS pools"""
@@ -214,6 +631,127 @@ def list_zpools():
         logging.error(f"Error listing ZFS pools: {str(e)}")
         return jsonify({"error": str(e)}), 500
         
+@app.route('/api/storage/zfs')
+def get_zfs_inventory():
+    """Pools, vdev trees and datasets from one batched ZFS listing (?refresh=1 to bypass the cache)"""
+    try:
+        settings = UserSettings.query.first()
+        inventory = zfs.get_inventory(settings, use_cache=request.args.get('refresh') != '1')
+        return jsonify(inventory.to_dict())
+    except Exception as e:
+        logging.error(f"Error getting ZFS inventory: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 200
+
+@app.route('/api/storage/zfs/snapshots')
+def get_zfs_snapshots():
+    """Snapshot counts and bytes per dataset (?dataset=name lists that dataset's snapshots)"""
+    try:
+        settings = UserSettings.query.first()
+        index = zfs_snapshots.get_index(settings)
+        index.refresh(settings, force=request.args.get('refresh') == '1')
+        dataset = request.args.get('dataset')
+        if dataset:
+            return jsonify({
+                "success": True,
+                "dataset": dataset,
+                "snapshots": [s.to_dict() for s in index.snapshots(dataset)]
+            })
+        return jsonify({"success": True, "status": index.get_status(), "datasets": index.summary()})
+    except Exception as e:
+        logging.error(f"Error listing ZFS snapshots: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/storage/zfs/snapshots/plan')
+def plan_zfs_snapshot_prune():
+    """
+    Dry-run a retention policy against the snapshot index
+    
+    Query: hourly, daily, weekly, monthly, yearly, last (counts to keep),
+    dataset (comma list), recursive, pattern (regex on snapshot names),
+    limit (max snapshot names returned, default 1000).
+    """
+    args = request.args
+    try:
+        policy = zfs_snapshots.parse_policy(args)
+        limit = args.get('limit', 1000, type=int)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    datasets = [d for d in args.get('dataset', '').split(',') if d] or None
+    try:
+        settings = UserSettings.query.first()
+        index = zfs_snapshots.get_index(settings)
+        index.refresh(settings)
+        plan = index.plan(policy, datasets, args.get('pattern'), args.get('recursive') == '1')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error planning ZFS snapshot prune: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+    
+    plan['prune'] = [s.to_dict() for s in plan['prune'][:limit]]
+    plan['success'] = True
+    return jsonify(plan)
+
+@app.route('/api/storage/zfs/snapshots/prune', methods=['POST'])
+def prune_zfs_snapshots():
+    """
+    Destroy the snapshots a retention policy prunes
+    
+    Body: {"policy": {"hourly": 24, "daily": 7, ...}, "datasets": [...],
+    "recursive": false, "pattern": "^autosnap_", "confirm": true}. Pruning
+    every dataset on the host takes "all": true in place of "datasets". The
+    affected datasets are re-listed first so nothing is destroyed on the
+    strength of a stale index.
+    """
+    data = request.json or {}
+    if data.get('confirm') is not True:
+        return jsonify({"success": False, "message": "Set \"confirm\": true to destroy snapshots"}), 400
+    if not isinstance(data.get('policy') or {}, dict):
+        return jsonify({"success": False, "message": "'policy' must be an object"}), 400
+    if data.get('pattern') is not None and not isinstance(data['pattern'], str):
+        return jsonify({"success": False, "message": "'pattern' must be a string"}), 400
+    try:
+        policy = zfs_snapshots.parse_policy(data.get('policy') or {})
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    datasets = data.get('datasets') or None
+    if datasets is not None and (not isinstance(datasets, list)
+                                 or not all(isinstance(d, str) and d for d in datasets)):
+        # A bare string would be matched by substring against dataset names
+        return jsonify({"success": False, "message": "'datasets' must be a list of dataset names"}), 400
+    if datasets is None and data.get('all') is not True:
+        return jsonify({"success": False,
+                        "message": "Give a list of 'datasets', or \"all\": true to prune every dataset"}), 400
+    try:
+        settings = UserSettings.query.first()
+        index = zfs_snapshots.get_index(settings)
+        if datasets and not data.get('recursive'):
+            index.refresh(settings, datasets, force=True)
+        else:
+            index.refresh(settings, force=True)
+        plan = index.plan(policy, datasets, data.get('pattern'), bool(data.get('recursive')))
+        result = index.execute(settings, plan['prune'])
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error pruning ZFS snapshots: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+    
+    zfs.invalidate_inventory()
+    result.update({
+        'planned': plan['total_prune'],
+        'bytes_freed': plan['bytes_freed'],
+        'datasets': plan['datasets']
+    })
+    return jsonify(result)
+
+@app.route('/api/storage/ssh-pool')
+def get_ssh_pool_status():
+    """Pooled SSH connections used for ZFS management, with reuse counters"""
+    return jsonify(sshpool.ssh_pool.get_status())
+
 @app.route('/api/storage/zpool/test-ssh')
 def test_zpool_ssh():
     """Test SSH connection for ZFS management"""
@@ -284,6 +822,7 @@ def delete_zpool(pool_name):
     try:
         settings = UserSettings.query.first()
         result = storage.manage_zpool('delete', pool_name, settings)
+        zfs.invalidate_inventory()
         return jsonify(result)
     except Exception as e:
         logging.error(f"Error deleting ZFS pool: {str(e)}")
@@ -303,6 +842,7 @@ def delete_apatosaurus_zpool():
             }), 400
         
         result = storage.manage_zpool('delete', 'apatosaurus', settings)
+        zfs.invalidate_inventory()
         return jsonify(result)
     except Exception as e:
         logging.error(f"Error deleting 'apatosaurus' ZFS pool: {str(e)}")
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Fake Proxmox API Server for Homelab Dashboard
+
+A small stand-in for pveproxy that serves a synthetic cluster of any size,
+so the dashboard can be benchmarked and load-tested without a real Proxmox
+host. Latency and errors can be injected to exercise timeouts and retries.
+
+Usage:
+    python fake-proxmox.py --nodes 20 --guests 5000 --latency-ms 40
+
+Then point the dashboard at it:
+    PROXMOX_HOST=http://localhost:8006 PROXMOX_USER=fake@pve \
+    PROXMOX_TOKEN_NAME=fake PROXMOX_TOKEN_VALUE=fake gunicorn main:app
+
+Implemented endpoints (under /api2/json):
+    /nodes
+    /cluster/resources[?type=vm|storage|node]
+    /nodes/{node}/status
+    /nodes/{node}/storage
+    /nodes/{node}/tasks
+    /nodes/{node}/rrddata
+    /nodes/{node}/qemu/{vmid}/rrddata
+    /nodes/{node}/lxc/{vmid}/rrddata
+
+Environment variables (overridden by command line options):
+    FAKE_PROXMOX_PORT: Port to listen on (default: 8006)
+    FAKE_PROXMOX_NODES: Number of nodes (default: 3)
+    FAKE_PROXMOX_GUESTS: Number of VMs and containers (default: 20)
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger('fake-proxmox')
+
+GIB = 1024 ** 3
+
+# Sample spacing Proxmox uses for each rrddata timeframe
+RRD_STEPS = {
+    'hour': 60,
+    'day': 1200,
+    'week': 10800,
+    'month': 43200,
+    'year': 604800
+}
+RRD_POINTS = 70
+
+class FakeCluster:
+    """Deterministic synthetic cluster whose usage numbers drift over time"""
+
+    def __init__(self, node_count, guest_count, seed):
+        rng = random.Random(seed)
+        self.started = time.time()
+
+        self.nodes = []
+        for i in range(node_count):
+            self.nodes.append({
+                'node': f"pve{i + 1:02d}",
+                'maxcpu': rng.choice([8, 16, 32, 64]),
+                'maxmem': rng.choice([32, 64, 128, 256]) * GIB,
+                'maxdisk': rng.choice([256, 512, 1024]) * GIB,
+                'phase': rng.random() * math.tau
+            })
+
+        self.guests = []
+        for i in range(guest_count):
+            node = self.nodes[i % node_count]
+            gtype = 'qemu' if rng.random() < 0.7 else 'lxc'
+            self.guests.append({
+                'vmid': 100 + i,
+                'type': gtype,
+                'node': node['node'],
+                'name': f"{'vm' if gtype == 'qemu' else 'ct'}-{100 + i}",
+                'status': 'running' if rng.random() < 0.85 else 'stopped',
+                'maxcpu': rng.choice([1, 2, 4, 8]),
+                'maxmem': rng.choice([1, 2, 4, 8, 16]) * GIB,
+                'maxdisk': rng.choice([8, 16, 32, 64, 128]) * GIB,
+                'phase': rng.random() * math.tau
+            })
+
+        self.storages = []
+        for node in self.nodes:
+            for name, total in (('local', 100 * GIB), ('local-lvm', 400 * GIB), ('nas', 8192 * GIB)):
+                self.storages.append({
+                    'node': node['node'],
+                    'storage': name,
+                    'total': total,
+                    'shared': 1 if name == 'nas' else 0,
+                    'fill': rng.uniform(0.1, 0.9)
+                })
+
+        self.by_node = {node['node']: node for node in self.nodes}
+        self.guest_by_vmid = {guest['vmid']: guest for guest in self.guests}
+
+    @staticmethod
+    def _wave(phase, ts, period=600.0):
+        """Smooth 0..1 load curve so repeated reads look like a live system"""
+        return 0.5 + 0.45 * math.sin(phase + ts * math.tau / period)
+
+    def uptime(self):
+        return int(time.time() - self.started) + 86400
+
+    def node_resource(self, node, now):
+        load = self._wave(node['phase'], now)
+        return {
+            'id': f"node/{node['node']}",
+            'type': 'node',
+            'node': node['node'],
+            'status': 'online',
+            'cpu': round(load, 4),
+            'maxcpu': node['maxcpu'],
+            'mem': int(node['maxmem'] * (0.3 + 0.4 * load)),
+            'maxmem': node['maxmem'],
+            'disk': int(node['maxdisk'] * 0.35),
+            'maxdisk': node['maxdisk'],
+            'uptime': self.uptime(),
+            'level': ''
+        }
+
+    def guest_resource(self, guest, now):
+        running = guest['status'] == 'running'
+        load = self._wave(guest['phase'], now) if running else 0
+        return {
+            'id': f"{guest['type']}/{guest['vmid']}",
+            'type': guest['type'],
+            'vmid': guest['vmid'],
+            'node': guest['node'],
+            'name': guest['name'],
+            'status': guest['status'],
+            'template': 0,
+            'cpu': round(load * 0.8, 4),
+            'maxcpu': guest['maxcpu'],
+            'mem': int(guest['maxmem'] * 0.6 * load),
+            'maxmem': guest['maxmem'],
+            'disk': 0,
+            'maxdisk': guest['maxdisk'],
+            'netin': int(now * 1000 * load) if running else 0,
+            'netout': int(now * 400 * load) if running else 0,
+            'uptime': self.uptime() if running else 0
+        }
+
+    def storage_resource(self, storage):
+        used = int(storage['total'] * storage['fill'])
+        return {
+            'id': f"storage/{storage['node']}/{storage['storage']}",
+            'type': 'storage',
+            'node': storage['node'],
+            'storage': storage['storage'],
+            'status': 'available',
+            'shared': storage['shared'],
+            'disk': used,
+            'maxdisk': storage['total']
+        }
+
+    def resources(self, resource_type=None):
+        now = time.time()
+        result = []
+        if resource_type in (None, 'node'):
+            result.extend(self.node_resource(n, now) for n in self.nodes)
+        if resource_type in (None, 'vm'):
+            result.extend(self.guest_resource(g, now) for g in self.guests)
+        if resource_type in (None, 'storage'):
+            result.extend(self.storage_resource(s) for s in self.storages)
+        return result
+
+    def node_list(self):
+        now = time.time()
+        return [
+            {k: v for k, v in self.node_resource(n, now).items() if k not in ('id', 'type')}
+            for n in self.nodes
+        ]
+
+    def node_status(self, node):
+        res = self.node_resource(node, time.time())
+        return {
+            'cpu': res['cpu'],
+            'uptime': res['uptime'],
+            'loadavg': [f"{res['cpu'] * node['maxcpu']:.2f}"] * 3,
+            'memory': {'total': res['maxmem'], 'used': res['mem'], 'free': res['maxmem'] - res['mem']},
+            'rootfs': {'total': res['maxdisk'], 'used': res['disk'], 'avail': res['maxdisk'] - res['disk']},
+            'cpuinfo': {'cpus': node['maxcpu'], 'model': 'Fake CPU @ 3.00GHz', 'sockets': 1},
+            'pveversion': 'pve-manager/8.2.0/fake',
+            'kversion': 'Linux 6.8.0-fake'
+        }
+
+    def node_storage(self, node_name):
+        return [
+            {
+                'storage': s['storage'],
+                'type': 'nfs' if s['shared'] else 'dir',
+                'active': 1,
+                'enabled': 1,
+                'shared': s['shared'],
+                'total': s['total'],
+                'used': int(s['total'] * s['fill']),
+                'avail': s['total'] - int(s['total'] * s['fill']),
+                'content': 'images,rootdir,backup'
+            }
+            for s in self.storages if s['node'] == node_name
+        ]
+
+    def node_tasks(self, node_name, since=None, limit=50, start=0):
+        # One backup task every 5 minutes per node, newest first
+        now = int(time.time())
+        tasks = []
+        ts = now - now % 300
+        while len(tasks) < start + limit and ts > now - 86400:
+            if since is not None and ts < since:
+                break
+            vmid = 100 + (ts // 300) % max(1, len(self.guests))
+            upid = f"UPID:{node_name}:{ts % 65536:08X}:{ts:08X}:{ts:08X}:vzdump:{vmid}:root@pam:"
+            task = {'upid': upid, 'node': node_name, 'starttime': ts, 'type': 'vzdump',
+                    'id': str(vmid), 'user': 'root@pam'}
+            if now - ts > 120:
+                task['endtime'] = ts + 120
+                task['status'] = 'OK'
+            tasks.append(task)
+            ts -= 300
+        return tasks[start:]
+
+    def rrddata(self, phase, maxcpu, maxmem, timeframe, is_node):
+        step = RRD_STEPS.get(timeframe, 60)
+        end = int(time.time()) // step * step
+        points = []
+        for i in range(RRD_POINTS):
+            ts = end - (RRD_POINTS - 1 - i) * step
+            load = self._wave(phase, ts)
+            sample = {
+                'time': ts,
+                'cpu': round(load, 4),
+                'maxcpu': maxcpu,
+                'netin': round(load * 125000, 2),
+                'netout': round(load * 50000, 2)
+            }
+            if is_node:
+                sample.update({
+                    'memtotal': maxmem,
+                    'memused': int(maxmem * (0.3 + 0.4 * load)),
+                    'loadavg': round(load * maxcpu, 2),
+                    'iowait': round(load * 0.05, 4)
+                })
+            else:
+                sample.update({
+                    'mem': int(maxmem * 0.6 * load),
+                    'maxmem': maxmem,
+                    'diskread': round(load * 2e6, 2),
+                    'diskwrite': round(load * 1e6, 2)
+                })
+            points.append(sample)
+        return points
+
+class FakeProxmoxHandler(BaseHTTPRequestHandler):
+    cluster = None
+    latency_ms = 0
+    jitter_ms = 0
+    error_rate = 0.0
+    stall_rate = 0.0
+    stall_seconds = 30.0
+
+    ROUTES = [
+        (re.compile(r'^/nodes$'), 'nodes'),
+        (re.compile(r'^/cluster/resources$'), 'resources'),
+        (re.compile(r'^/nodes/([^/]+)/status$'), 'node_status'),
+        (re.compile(r'^/nodes/([^/]+)/storage$'), 'node_storage'),
+        (re.compile(r'^/nodes/([^/]+)/tasks$'), 'node_tasks'),
+        (re.compile(r'^/nodes/([^/]+)/rrddata$'), 'node_rrd'),
+        (re.compile(r'^/nodes/([^/]+)/(qemu|lxc)/(\d+)/rrddata$'), 'guest_rrd'),
+    ]
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status_code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject_faults(self):
+        """Apply configured latency; return True if this request should fail"""
+        if self.stall_rate and random.random() < self.stall_rate:
+            time.sleep(self.stall_seconds)
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return bool(self.error_rate) and random.random() < self.error_rate
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path.startswith('/api2/json'):
+            path = path[len('/api2/json'):]
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        for pattern, name in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            self._send_json(404, {'data': None, 'errors': {'path': 'Not found'}})
+            return
+
+        if self._inject_faults():
+            self._send_json(500, {'data': None, 'errors': {'fake': 'Injected error'}})
+            return
+
+        cluster = self.cluster
+        args = match.groups()
+        if args and args[0] not in cluster.by_node:
+            self._send_json(500, {'data': None, 'errors': {'node': f"hostname lookup '{args[0]}' failed"}})
+            return
+
+        if name == 'nodes':
+            data = cluster.node_list()
+        elif name == 'resources':
+            data = cluster.resources(query.get('type'))
+        elif name == 'node_status':
+            data = cluster.node_status(cluster.by_node[args[0]])
+        elif name == 'node_storage':
+            data = cluster.node_storage(args[0])
+        elif name == 'node_tasks':
+            since = int(query['since']) if 'since' in query else None
+            data = cluster.node_tasks(args[0], since, int(query.get('limit', 50)),
+                                      int(query.get('start', 0)))
+        elif name == 'node_rrd':
+            node = cluster.by_node[args[0]]
+            data = cluster.rrddata(node['phase'], node['maxcpu'], node['maxmem'],
+                                   query.get('timeframe', 'hour'), True)
+        else:
+            guest = cluster.guest_by_vmid.get(int(args[2]))
+            if not guest or guest['node'] != args[0] or guest['type'] != args[1]:
+                self._send_json(500, {'data': None, 'errors': {'vmid': "Configuration file does not exist"}})
+                return
+            data = cluster.rrddata(guest['phase'], guest['maxcpu'], guest['maxmem'],
+                                   query.get('timeframe', 'hour'), False)
+
+        self._send_json(200, {'data': data})
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Proxmox API server for load testing')
+    parser.add_argument('--host', default='0.0.0.0', help='Address to bind')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('FAKE_PROXMOX_PORT', 8006)))
+    parser.add_argument('--nodes', type=int, default=int(os.environ.get('FAKE_PROXMOX_NODES', 3)))
+    parser.add_argument('--guests', type=int, default=int(os.environ.get('FAKE_PROXMOX_GUESTS', 20)))
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the generated cluster layout')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Base latency added to every request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random +/- jitter on the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='Fraction of requests that hang first')
+    parser.add_argument('--stall-seconds', type=float, default=30.0, help='How long a stalled request hangs')
+    args = parser.parse_args()
+
+    if args.nodes < 1:
+        parser.error('--nodes must be at least 1')
+
+    FakeProxmoxHandler.cluster = FakeCluster(args.nodes, args.guests, args.seed)
+    FakeProxmoxHandler.latency_ms = args.latency_ms
+    FakeProxmoxHandler.jitter_ms = args.jitter_ms
+    FakeProxmoxHandler.error_rate = args.error_rate
+    FakeProxmoxHandler.stall_rate = args.stall_rate
+    FakeProxmoxHandler.stall_seconds = args.stall_seconds
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeProxmoxHandler)
+    logger.info(f"Fake Proxmox API with {args.nodes} nodes and {args.guests} guests "
+                f"listening on http://{args.host}:{args.port}/api2/json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
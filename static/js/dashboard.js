@@ -50,7 +50,7 @@ function checkDockerStatus() {
     const statusIndicator = document.getElementById('docker-status-indicator');
     const statusText = document.getElementById('docker-status-text');
     
-    fetch('/api/docker/containers')
+    fetch('/api/docker/containers?fields=Id')
         .then(response => {
             if (!response.ok) {
                 return response.json().then(err => { throw new Error(err.error || 'Failed to connect'); });
@@ -95,16 +95,59 @@ function checkStorageStatus() {
         });
 }
 
-// Load resource usage chart
-function loadResourceUsage() {
-    // Try to get resources from Proxmox
-    fetch('/api/proxmox/resources')
+// Proxmox resources kept between refreshes so only deltas need to be downloaded
+const resourceState = {
+    version: null,
+    byKey: new Map()
+};
+
+// Fetch resources, applying a server-side delta when we already hold a version
+function fetchProxmoxResources() {
+    const since = resourceState.version ? encodeURIComponent(resourceState.version) : '';
+    return fetch(`/api/proxmox/resources?since=${since}`)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Failed to fetch resource data');
             }
             return response.json();
         })
+        .then(payload => {
+            if (payload.error) {
+                throw new Error(payload.error);
+            }
+            applyResourceDelta(payload);
+            return Array.from(resourceState.byKey.values());
+        });
+}
+
+// Merge a delta (or full keyed snapshot) into the local resource map
+function applyResourceDelta(payload) {
+    if (!payload.delta) {
+        resourceState.byKey = new Map(Object.entries(payload.resources || {}));
+    } else {
+        Object.entries(payload.added || {}).forEach(([key, resource]) => {
+            resourceState.byKey.set(key, resource);
+        });
+        (payload.removed || []).forEach(key => resourceState.byKey.delete(key));
+        Object.entries(payload.changed || {}).forEach(([key, fields]) => {
+            const resource = Object.assign({}, resourceState.byKey.get(key));
+            Object.entries(fields).forEach(([field, value]) => {
+                if (value === null) {
+                    delete resource[field];
+                } else {
+                    resource[field] = value;
+                }
+            });
+            resourceState.byKey.set(key, resource);
+        });
+    }
+    resourceState.version = payload.version;
+}
+
+// Load resource usage chart
+function loadResourceUsage() {
+    // Try to get resources from Proxmox
+    fetchProxmoxResources()
         .then(data => {
             // Process data for chart
             const resources = processResourceData(data);
@@ -307,7 +350,7 @@ function loadNodeList() {
 function loadDockerContainerSummary() {
     const containerSummary = document.getElementById('docker-container-summary');
     
-    fetch('/api/docker/containers')
+    fetch('/api/docker/containers?fields=Name,Status,Image,PortsFormatted&limit=5')
         .then(response => {
             if (!response.ok) {
                 throw new Error('Failed to fetch container data');
@@ -325,10 +368,8 @@ function loadDockerContainerSummary() {
                     </div>
                 `;
             } else {
-                // Limit to 5 containers for the summary
-                const containers = data.slice(0, 5);
-                
-                containers.forEach(container => {
+                // The server already limits the summary to 5 containers
+                data.forEach(container => {
                     const status = container.Status || '';
                     let statusClass = 'secondary';
                     
@@ -10,9 +10,16 @@ document.addEventListener('DOMContentLoaded', function() {
     // Set up container action confirmation
     setupContainerActionModal();
     
+    // Set up the live log viewer
+    setupContainerLogsModal();
+    
     // Load container resources
     loadContainerResources();
     
+    // Load the cached disk usage inventory
+    loadDiskUsage();
+    document.getElementById('refresh-disk-usage').addEventListener('click', refreshDiskUsage);
+    
     // Set up periodic refresh (every 30 seconds)
     setInterval(function() {
         loadContainers();
@@ -34,7 +41,7 @@ function loadContainers() {
     noContainersMessage.style.display = 'none';
     connectionError.style.display = 'none';
     
-    fetch('/api/docker/containers')
+    fetch('/api/docker/containers?fields=Name,Image,Status,StatusClass,CreatedFormatted,PortsFormatted,Host')
         .then(response => {
             if (!response.ok) {
                 throw new Error('Failed to fetch containers');
@@ -55,6 +62,10 @@ function loadContainers() {
             // Create table rows for containers
             let tableHtml = '';
             
+            // Only label hosts when the list spans more than one
+            const hosts = new Set(data.map(container => container.Host).filter(Boolean));
+            const showHost = hosts.size > 1;
+            
             data.forEach(container => {
                 const containerId = container.Id;
                 const name = container.Name;
@@ -63,30 +74,38 @@ function loadContainers() {
                 const created = container.CreatedFormatted || 'Unknown';
                 const ports = container.PortsFormatted.join(', ') || 'None';
                 const statusClass = container.StatusClass || 'secondary';
+                const host = container.Host || '';
+                const hostBadge = showHost ? ` <span class="badge bg-secondary">${host}</span>` : '';
                 
                 // Determine which action buttons to show based on status
                 let actionButtons = '';
                 
                 if (status.includes('Up')) {
                     actionButtons = `
-                        <button class="btn btn-sm btn-outline-warning container-action" data-action="restart" data-id="${containerId}" data-name="${name}">
+                        <button class="btn btn-sm btn-outline-warning container-action" data-action="restart" data-id="${containerId}" data-name="${name}" data-host="${host}">
                             <i class="fas fa-sync-alt"></i>
                         </button>
-                        <button class="btn btn-sm btn-outline-danger container-action" data-action="stop" data-id="${containerId}" data-name="${name}">
+                        <button class="btn btn-sm btn-outline-danger container-action" data-action="stop" data-id="${containerId}" data-name="${name}" data-host="${host}">
                             <i class="fas fa-stop"></i>
                         </button>
                     `;
                 } else {
                     actionButtons = `
-                        <button class="btn btn-sm btn-outline-success container-action" data-action="start" data-id="${containerId}" data-name="${name}">
+                        <button class="btn btn-sm btn-outline-success container-action" data-action="start" data-id="${containerId}" data-name="${name}" data-host="${host}">
                             <i class="fas fa-play"></i>
                         </button>
                     `;
                 }
                 
+                actionButtons += `
+                    <button class="btn btn-sm btn-outline-secondary container-logs" data-id="${containerId}" data-name="${name}" data-host="${host}">
+                        <i class="fas fa-file-alt"></i>
+                    </button>
+                `;
+                
                 tableHtml += `
                     <tr>
-                        <td>${name}</td>
+                        <td>${name}${hostBadge}</td>
                         <td>${image}</td>
                         <td><span class="badge bg-${statusClass}">${status}</span></td>
                         <td>${created}</td>
@@ -106,6 +125,12 @@ function loadContainers() {
             document.querySelectorAll('.container-action').forEach(button => {
                 button.addEventListener('click', handleContainerAction);
             });
+            document.querySelectorAll('.container-logs').forEach(button => {
+                button.addEventListener('click', event => {
+                    const data = event.currentTarget.dataset;
+                    openContainerLogs(data.id, data.name, data.host);
+                });
+            });
             
             // Hide loading, show table
             loadingDiv.style.display = 'none';
@@ -155,8 +180,9 @@ function setupContainerActionModal() {
     confirmBtn.addEventListener('click', function() {
         const action = this.dataset.action;
         const containerId = this.dataset.containerId;
+        const host = this.dataset.host;
         
-        performContainerAction(action, containerId);
+        performContainerAction(action, containerId, host);
         modal.hide();
     });
 }
@@ -167,6 +193,7 @@ function handleContainerAction(event) {
     const action = button.dataset.action;
     const containerId = button.dataset.id;
     const containerName = button.dataset.name;
+    const host = button.dataset.host;
     
     // Update modal content
     const modalTitle = document.getElementById('containerActionModalLabel');
@@ -201,6 +228,7 @@ function handleContainerAction(event) {
     // Store action data
     confirmBtn.dataset.action = action;
     confirmBtn.dataset.containerId = containerId;
+    confirmBtn.dataset.host = host || '';
     
     // Show modal
     const modal = new bootstrap.Modal(document.getElementById('containerActionModal'));
@@ -208,7 +236,7 @@ function handleContainerAction(event) {
 }
 
 // Perform container action (start, stop, restart)
-function performContainerAction(action, containerId) {
+function performContainerAction(action, containerId, host) {
     // Show processing indicator on button
     const actionButtons = document.querySelectorAll(`.container-action[data-id="${containerId}"]`);
     actionButtons.forEach(button => {
@@ -222,7 +250,9 @@ function performContainerAction(action, containerId) {
     });
     
     // Call API to perform action
-    fetch(`/api/docker/container/${containerId}/${action}`, {
+    // Route the action to the container's host when the fleet has several
+    const hostQuery = host ? `?host=${encodeURIComponent(host)}` : '';
+    fetch(`/api/docker/container/${containerId}/${action}${hostQuery}`, {
         method: 'POST'
     })
     .then(response => {
@@ -256,6 +286,99 @@ function performContainerAction(action, containerId) {
     });
 }
 
+// Live log viewer state
+let logSource = null;
+let logTarget = null;
+const MAX_LOG_LINES = 2000;
+
+// Set up the log modal: close the stream when hidden, re-open on filter change
+function setupContainerLogsModal() {
+    const modalElement = document.getElementById('containerLogsModal');
+    
+    modalElement.addEventListener('hidden.bs.modal', function() {
+        closeLogStream();
+        logTarget = null;
+    });
+    
+    document.getElementById('logs-apply-filter').addEventListener('click', function() {
+        if (logTarget) {
+            startLogStream();
+        }
+    });
+}
+
+// Open the log modal for a container
+function openContainerLogs(containerId, name, host) {
+    logTarget = { id: containerId, host: host };
+    document.getElementById('containerLogsModalLabel').textContent = `Logs: ${name}`;
+    document.getElementById('logs-filter').value = '';
+    
+    const modal = bootstrap.Modal.getOrCreateInstance(document.getElementById('containerLogsModal'));
+    modal.show();
+    startLogStream();
+}
+
+function closeLogStream() {
+    if (logSource) {
+        logSource.close();
+        logSource = null;
+    }
+}
+
+// Follow the container's logs over Server-Sent Events
+function startLogStream() {
+    closeLogStream();
+    
+    const output = document.getElementById('container-logs-output');
+    const status = document.getElementById('container-logs-status');
+    output.textContent = '';
+    status.textContent = 'Connecting...';
+    
+    const params = new URLSearchParams({ follow: '1', tail: '200' });
+    const filter = document.getElementById('logs-filter').value;
+    if (filter) {
+        params.set('filter', filter);
+    }
+    if (logTarget.host) {
+        params.set('host', logTarget.host);
+    }
+    
+    const source = new EventSource(`/api/docker/container/${logTarget.id}/logs?${params}`);
+    logSource = source;
+    
+    const appendLine = (line, stream) => {
+        const atBottom = output.scrollTop + output.clientHeight >= output.scrollHeight - 5;
+        const span = document.createElement('span');
+        if (stream === 'stderr') {
+            span.className = 'text-warning';
+        }
+        span.textContent = line + '\n';
+        output.appendChild(span);
+        
+        // Keep the DOM bounded for chatty containers
+        while (output.childNodes.length > MAX_LOG_LINES) {
+            output.removeChild(output.firstChild);
+        }
+        if (atBottom) {
+            output.scrollTop = output.scrollHeight;
+        }
+    };
+    
+    source.onopen = () => { status.textContent = 'Streaming'; };
+    source.addEventListener('stdout', event => appendLine(event.data, 'stdout'));
+    source.addEventListener('stderr', event => appendLine(event.data, 'stderr'));
+    source.addEventListener('end', () => {
+        // The server ends idle streams; stop here so EventSource doesn't reconnect and replay the tail
+        status.textContent = 'Stream ended';
+        closeLogStream();
+    });
+    source.onerror = () => {
+        if (logSource === source && source.readyState === EventSource.CLOSED) {
+            status.textContent = 'Disconnected';
+        }
+    };
+}
+
 // Load container resource charts
 let resourcesChart;
 function loadContainerResources() {
@@ -267,36 +390,26 @@ function loadContainerResources() {
     resourcesDiv.style.display = 'none';
     resourcesError.style.display = 'none';
     
-    // First get container list
-    fetch('/api/docker/containers')
+    // First get the running containers
+    fetch('/api/docker/containers?state=running&fields=Name')
         .then(response => {
             if (!response.ok) {
                 throw new Error('Failed to fetch containers');
             }
             return response.json();
         })
-        .then(containers => {
-            // Filter for running containers only
-            const runningContainers = containers.filter(container => 
-                container.Status.toLowerCase().includes('up')
-            );
-            
+        .then(runningContainers => {
             if (runningContainers.length === 0) {
                 throw new Error('No running containers to show resource usage for');
             }
             
-            // Create placeholder data for the chart
-            // In a real implementation, you would fetch actual stats for each container
-            const resourceData = {
-                labels: runningContainers.map(container => container.Name),
-                cpuData: runningContainers.map(() => Math.random() * 30),
-                memoryData: runningContainers.map(() => Math.random() * 50)
-            };
-            
-            updateResourcesChart(resourceData);
-            
-            resourcesLoading.style.display = 'none';
-            resourcesDiv.style.display = 'block';
+            return fetchContainerStats(runningContainers)
+                .then(resourceData => {
+                    updateResourcesChart(resourceData);
+                    
+                    resourcesLoading.style.display = 'none';
+                    resourcesDiv.style.display = 'block';
+                });
         })
         .catch(error => {
             console.error('Error loading container resources:', error);
@@ -306,6 +419,53 @@ function loadContainerResources() {
         });
 }
 
+// Get chart data for running containers: 1m averages from the live sampler
+// when it is running, otherwise a one-shot batched stats request
+function fetchContainerStats(runningContainers) {
+    const ids = encodeURIComponent(runningContainers.map(container => container.Id).join(','));
+    
+    return fetch(`/api/docker/stats/live?ids=${ids}`)
+        .then(response => response.ok ? response.json() : { enabled: false })
+        .then(live => {
+            const sampled = live.enabled
+                ? runningContainers.filter(container => (live.containers[container.Id] || {}).avg_1m)
+                : [];
+            
+            if (sampled.length > 0) {
+                return {
+                    labels: sampled.map(container => container.Name),
+                    cpuData: sampled.map(container => live.containers[container.Id].avg_1m.cpu_percent),
+                    memoryData: sampled.map(container => live.containers[container.Id].avg_1m.memory_percent),
+                    cpuPeak: sampled.map(container => live.containers[container.Id].peak_5m.cpu_percent),
+                    memoryPeak: sampled.map(container => live.containers[container.Id].peak_5m.memory_percent),
+                    suffix: ' (1m avg)'
+                };
+            }
+            
+            // Stats for every running container in one batched request
+            return fetch(`/api/docker/stats?ids=${ids}`)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error('Failed to fetch container stats');
+                    }
+                    return response.json();
+                })
+                .then(result => {
+                    // Containers that errored or timed out are left out of the chart
+                    const fetched = runningContainers.filter(container => result.stats[container.Id]);
+                    if (fetched.length === 0) {
+                        throw new Error('No container stats available');
+                    }
+                    
+                    return {
+                        labels: fetched.map(container => container.Name),
+                        cpuData: fetched.map(container => result.stats[container.Id].cpu_percent),
+                        memoryData: fetched.map(container => result.stats[container.Id].memory_percent)
+                    };
+                });
+        });
+}
+
 // Update container resources chart
 function updateResourcesChart(data) {
     const ctx = document.getElementById('containerResourcesChart').getContext('2d');
@@ -321,14 +481,14 @@ function updateResourcesChart(data) {
             labels: data.labels,
             datasets: [
                 {
-                    label: 'CPU Usage (%)',
+                    label: 'CPU Usage (%)' + (data.suffix || ''),
                     data: data.cpuData,
                     backgroundColor: 'rgba(54, 162, 235, 0.6)',
                     borderColor: 'rgba(54, 162, 235, 1)',
                     borderWidth: 1
                 },
                 {
-                    label: 'Memory Usage (%)',
+                    label: 'Memory Usage (%)' + (data.suffix || ''),
                     data: data.memoryData,
                     backgroundColor: 'rgba(255, 99, 132, 0.6)',
                     borderColor: 'rgba(255, 99, 132, 1)',
@@ -352,7 +512,10 @@ function updateResourcesChart(data) {
                 tooltip: {
                     callbacks: {
                         label: function(context) {
-                            return context.dataset.label + ': ' + context.raw.toFixed(1) + '%';
+                            // Live sampler data also carries the 5-minute peak
+                            const peaks = context.datasetIndex === 0 ? data.cpuPeak : data.memoryPeak;
+                            const peak = peaks ? ` (5m peak ${peaks[context.dataIndex].toFixed(1)}%)` : '';
+                            return context.dataset.label + ': ' + context.raw.toFixed(1) + '%' + peak;
                         }
                     }
                 }
@@ -361,6 +524,159 @@ function updateResourcesChart(data) {
     });
 }
 
+// Load the cached /system/df summary; reclaimable space is highlighted
+function loadDiskUsage() {
+    const content = document.getElementById('disk-usage-content');
+    const disabled = document.getElementById('disk-usage-disabled');
+    const ageLabel = document.getElementById('disk-usage-age');
+    
+    fetch('/api/docker/disk')
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Failed to fetch disk usage');
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (!data.enabled) {
+                content.innerHTML = '';
+                disabled.style.display = 'block';
+                document.getElementById('refresh-disk-usage').disabled = true;
+                return;
+            }
+            disabled.style.display = 'none';
+            
+            const hosts = Object.entries(data.hosts);
+            if (hosts.length === 0) {
+                content.innerHTML = '<p class="text-muted mb-0">The first disk usage scan is still running...</p>';
+                return;
+            }
+            
+            const ages = hosts.filter(([, host]) => host.age !== null).map(([, host]) => host.age);
+            ageLabel.textContent = ages.length > 0 ? `Scanned ${formatAge(Math.max(...ages))} ago` : '';
+            
+            content.innerHTML = hosts.map(([name, host]) => renderDiskUsageHost(name, host, hosts.length > 1)).join('');
+        })
+        .catch(error => {
+            console.error('Error loading disk usage:', error);
+            content.innerHTML = `<div class="alert alert-warning mb-0">Cannot load disk usage: ${error.message}</div>`;
+        });
+}
+
+function renderDiskUsageHost(name, host, showName) {
+    let html = showName ? `<h6 class="mt-2">${name}</h6>` : '';
+    
+    if (host.error) {
+        html += `<div class="alert alert-warning py-1">Last scan failed: ${host.error}</div>`;
+    }
+    if (!host.summary) {
+        return html;
+    }
+    
+    const totals = host.summary.totals;
+    const rows = [
+        ['Images', totals.images, `${formatBytes(totals.images.unique_size)} unique, ${formatBytes(totals.images.shared_size)} shared`],
+        ['Containers', totals.containers, 'writable layers'],
+        ['Volumes', totals.volumes, ''],
+        ['Build Cache', totals.build_cache, '']
+    ];
+    
+    html += `
+        <div class="table-responsive">
+            <table class="table table-sm mb-2">
+                <thead>
+                    <tr><th>Type</th><th>Total</th><th>Active</th><th>Size</th><th>Reclaimable</th></tr>
+                </thead>
+                <tbody>
+                    ${rows.map(([label, t, note]) => `
+                        <tr>
+                            <td>${label}</td>
+                            <td>${t.count}</td>
+                            <td>${t.active}</td>
+                            <td>${formatBytes(t.size)} ${note ? `<small class="text-muted">(${note})</small>` : ''}</td>
+                            <td>${reclaimableBadge(t.reclaimable, t.size)}</td>
+                        </tr>
+                    `).join('')}
+                </tbody>
+                <tfoot>
+                    <tr>
+                        <th colspan="4">Total reclaimable</th>
+                        <th>${reclaimableBadge(totals.reclaimable, 0)}</th>
+                    </tr>
+                </tfoot>
+            </table>
+        </div>
+    `;
+    
+    // Largest images, with unused ones flagged
+    const images = host.summary.images.slice(0, 10);
+    if (images.length > 0) {
+        html += `
+            <details>
+                <summary class="mb-2">Largest images</summary>
+                <table class="table table-sm table-striped">
+                    <thead>
+                        <tr><th>Image</th><th>Size</th><th>Unique</th><th>Shared</th><th>Containers</th></tr>
+                    </thead>
+                    <tbody>
+                        ${images.map(image => `
+                            <tr class="${image.in_use ? '' : 'table-warning'}">
+                                <td>${image.tags.length > 0 ? image.tags.join(', ') : image.id}</td>
+                                <td>${formatBytes(image.size)}</td>
+                                <td>${formatBytes(image.unique_size)}</td>
+                                <td>${formatBytes(image.shared_size)}</td>
+                                <td>${image.in_use ? image.containers : '<span class="badge bg-warning text-dark">unused</span>'}</td>
+                            </tr>
+                        `).join('')}
+                    </tbody>
+                </table>
+            </details>
+        `;
+    }
+    return html;
+}
+
+function reclaimableBadge(reclaimable, size) {
+    if (!reclaimable) {
+        return '<span class="text-muted">0 Bytes</span>';
+    }
+    const percent = size > 0 ? ` (${Math.round(reclaimable / size * 100)}%)` : '';
+    return `<span class="badge bg-warning text-dark">${formatBytes(reclaimable)}${percent}</span>`;
+}
+
+function refreshDiskUsage() {
+    fetch('/api/docker/disk/refresh', { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            showToast('Disk usage scan started; results appear when it finishes', 'info');
+            // /system/df can take a while on large hosts
+            setTimeout(loadDiskUsage, 15000);
+        })
+        .catch(error => showToast(`Cannot refresh disk usage: ${error.message}`, 'danger'));
+}
+
+// Format bytes to human-readable format
+function formatBytes(bytes, decimals = 2) {
+    if (bytes === 0) return '0 Bytes';
+    
+    const k = 1024;
+    const dm = decimals < 0 ? 0 : decimals;
+    const sizes = ['Bytes', 'KB', 'MB', 'GB', 'TB', 'PB', 'EB', 'ZB', 'YB'];
+    
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+    
+    return parseFloat((bytes / Math.pow(k, i)).toFixed(dm)) + ' ' + sizes[i];
+}
+
+function formatAge(seconds) {
+    if (seconds < 60) return `${Math.round(seconds)}s`;
+    if (seconds < 3600) return `${Math.round(seconds / 60)}m`;
+    return `${Math.round(seconds / 3600)}h`;
+}
+
 // Show a toast message
 function showToast(message, type = 'info') {
     // Create toast container if it doesn't exist
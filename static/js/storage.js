@@ -12,7 +12,7 @@ document.addEventListener('DOMContentLoaded', function() {
     });
     
     document.getElementById('refresh-zpools').addEventListener('click', function() {
-        loadZFSPools();
+        loadZFSPools(true);
     });
     
     // Setup ZFS pool deletion modal
@@ -141,6 +141,17 @@ function updateStorageSummaryTable(storageData) {
                     </td>
                 </tr>
             `;
+        } else if (storage.stale) {
+            // The mount didn't answer in time; it's usually a dead NFS/CIFS server
+            html += `
+                <tr class="table-warning">
+                    <td>${storage.path}</td>
+                    <td colspan="4">
+                        <span class="badge bg-warning text-dark me-1">stale</span>
+                        ${storage.filesystem} mount at ${storage.mount_point} is not responding
+                    </td>
+                </tr>
+            `;
         } else {
             // Display error for this storage path
             html += `
@@ -317,12 +328,16 @@ function loadStorageDetails() {
                                                 <div class="fw-bold">${storage.free_gb} GB</div>
                                             </div>
                                         </div>
-                                        <div class="mt-3">
+                                        <div class="mt-3 d-flex justify-content-between align-items-center">
                                             <small class="text-muted">
                                                 <i class="fas fa-info-circle me-1"></i>
                                                 Filesystem: ${storage.filesystem || 'Unknown'}
                                             </small>
+                                            <button class="btn btn-sm btn-outline-secondary scan-dirs-btn" data-path="${storage.path}">
+                                                <i class="fas fa-folder-open me-1"></i> Largest directories
+                                            </button>
                                         </div>
+                                        <ul class="list-group list-group-flush mt-2 dir-sizes"></ul>
                                     </div>
                                 </div>
                             </div>
@@ -350,6 +365,10 @@ function loadStorageDetails() {
             
             storageCards.innerHTML = html;
             
+            storageCards.querySelectorAll('.scan-dirs-btn').forEach(button => {
+                button.addEventListener('click', () => scanDirectorySizes(button));
+            });
+            
             // Hide loading, show content
             loadingDiv.style.display = 'none';
             storageDetails.style.display = 'block';
@@ -374,8 +393,56 @@ function loadStorageDetails() {
 
 // Initialize storage trends chart with placeholder data
 // In a real implementation, you would fetch historical data from a database
+// Stream top-level directory sizes for a storage path; each directory
+// appears as soon as its subtree has been walked
+function scanDirectorySizes(button) {
+    const list = button.closest('.card-body').querySelector('.dir-sizes');
+    const dirs = [];
+    
+    button.disabled = true;
+    list.innerHTML = '<li class="list-group-item text-muted small">Scanning...</li>';
+    
+    const render = (done) => {
+        const rows = dirs
+            .sort((a, b) => b.size - a.size)
+            .slice(0, 10)
+            .map(dir => `
+                <li class="list-group-item d-flex justify-content-between align-items-center px-0">
+                    <span>${dir.name}${dir.partial ? ' <span class="badge bg-warning text-dark">partial</span>' : ''}</span>
+                    <span class="text-muted">${formatBytes(dir.size)}</span>
+                </li>
+            `)
+            .join('');
+        const status = done ? '' : '<li class="list-group-item text-muted small px-0">Scanning...</li>';
+        list.innerHTML = rows + status;
+    };
+    
+    const source = new EventSource(`/api/storage/details?stream=1&path=${encodeURIComponent(button.dataset.path)}`);
+    source.addEventListener('dir', event => {
+        dirs.push(JSON.parse(event.data));
+        render(false);
+    });
+    source.addEventListener('end', () => {
+        source.close();
+        button.disabled = false;
+        if (dirs.length === 0) {
+            list.innerHTML = '<li class="list-group-item text-muted small px-0">No subdirectories</li>';
+        } else {
+            render(true);
+        }
+    });
+    const fail = event => {
+        source.close();
+        button.disabled = false;
+        const message = event.data ? JSON.parse(event.data).error : 'Scan failed';
+        list.innerHTML = `<li class="list-group-item text-danger small px-0">${message}</li>`;
+    };
+    source.addEventListener('failed', fail);
+    source.onerror = fail;
+}
+
 // Load ZFS pools
-function loadZFSPools() {
+function loadZFSPools(refresh = false) {
     const loadingDiv = document.getElementById('zpools-loading');
     const zpoolsContent = document.getElementById('zpools-content');
     const zpoolsError = document.getElementById('zpools-error');
@@ -386,7 +453,8 @@ function loadZFSPools() {
     zpoolsContent.style.display = 'none';
     zpoolsError.style.display = 'none';
     
-    fetch('/api/storage/zpool/list')
+    // Pools, vdevs and datasets all come from one batched ZFS listing
+    fetch(`/api/storage/zfs${refresh ? '?refresh=1' : ''}`)
         .then(response => {
             if (!response.ok) {
                 return response.json().then(err => { throw new Error(err.error || 'Failed to load ZFS pool information'); });
@@ -406,6 +474,7 @@ function loadZFSPools() {
             
             if (!data.pools || data.pools.length === 0) {
                 poolsTable.innerHTML = '';
+                renderZFSDatasets([]);
                 noZpools.style.display = 'block';
                 return;
             }
@@ -421,13 +490,26 @@ function loadZFSPools() {
                     healthClass = pool.health === 'DEGRADED' ? 'warning' : 'danger';
                 }
                 
+                // Leaf devices that aren't healthy, for the health tooltip
+                const problems = [];
+                const walk = vdevs => vdevs.forEach(vdev => {
+                    if (vdev.children.length === 0 && !['ONLINE', 'AVAIL'].includes(vdev.state)) {
+                        problems.push(`${vdev.name}: ${vdev.state}`);
+                    }
+                    walk(vdev.children);
+                });
+                walk(pool.vdevs);
+                
                 html += `
                     <tr>
-                        <td>${pool.name}</td>
-                        <td>${pool.size}</td>
-                        <td>${pool.allocated}</td>
-                        <td>${pool.free}</td>
-                        <td><span class="badge bg-${healthClass}">${pool.health}</span></td>
+                        <td>
+                            ${pool.name}
+                            <br><small class="text-muted">${pool.vdevs.filter(vdev => vdev.class === 'data').map(vdev => vdev.name).join(', ')}</small>
+                        </td>
+                        <td>${formatBytes(pool.size)}</td>
+                        <td>${formatBytes(pool.allocated)} <small class="text-muted">(${pool.capacity}%)</small></td>
+                        <td>${formatBytes(pool.free)}</td>
+                        <td><span class="badge bg-${healthClass}" title="${problems.join('\n') || pool.scan || ''}">${pool.health}</span></td>
                         <td>
                             <button class="btn btn-sm btn-danger delete-pool-btn" data-pool="${pool.name}">
                                 <i class="fas fa-trash-alt me-1"></i> Delete
@@ -438,6 +520,7 @@ function loadZFSPools() {
             });
             
             poolsTable.innerHTML = html;
+            renderZFSDatasets(data.datasets);
         })
         .catch(error => {
             console.error('Error loading ZFS pools:', error);
@@ -447,6 +530,45 @@ function loadZFSPools() {
         });
 }
 
+// Render the datasets table from the ZFS inventory
+function renderZFSDatasets(datasets) {
+    const wrapper = document.getElementById('zfs-datasets');
+    const table = document.getElementById('zfs-datasets-table').querySelector('tbody');
+    
+    if (!datasets || datasets.length === 0) {
+        wrapper.style.display = 'none';
+        table.innerHTML = '';
+        return;
+    }
+    
+    table.innerHTML = datasets.map(dataset => `
+        <tr>
+            <td>${dataset.name}</td>
+            <td>${dataset.type}</td>
+            <td>${formatBytes(dataset.used)}</td>
+            <td>${formatBytes(dataset.available)}</td>
+            <td>${formatBytes(dataset.referenced)}</td>
+            <td>${dataset.properties.compression || '-'}${dataset.properties.compressratio ? ` (${dataset.properties.compressratio}x)` : ''}</td>
+            <td>${dataset.mountpoint || '-'}</td>
+        </tr>
+    `).join('');
+    wrapper.style.display = 'block';
+}
+
+// Format bytes to human-readable format
+function formatBytes(bytes, decimals = 2) {
+    if (bytes === null || bytes === undefined) return '-';
+    if (bytes === 0) return '0 Bytes';
+    
+    const k = 1024;
+    const dm = decimals < 0 ? 0 : decimals;
+    const sizes = ['Bytes', 'KB', 'MB', 'GB', 'TB', 'PB', 'EB', 'ZB', 'YB'];
+    
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+    
+    return parseFloat((bytes / Math.pow(k, i)).toFixed(dm)) + ' ' + sizes[i];
+}
+
 // Delete a ZFS pool
 function deleteZFSPool(poolName) {
     // Show a toast notification that deletion is in progress
@@ -0,0 +1,132 @@
+import threading
+import time
+
+# Every cache created registers itself here so stats can be scraped from one place
+_registry = {}
+_registry_lock = threading.Lock()
+
+class _Flight:
+    """An in-progress upstream fetch that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with single-flight request coalescing
+
+    When several callers ask for the same missing or expired key at once,
+    only the first one runs the loader; the others wait for its result.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, name, ttl):
+        self.name = name
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+        with _registry_lock:
+            _registry[name] = self
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for key, calling loader() on a miss
+
+        Args:
+            key: Hashable cache key
+            loader: Zero-argument callable that fetches the value
+
+        Returns:
+            The cached or freshly loaded value
+
+        Raises:
+            Whatever the loader raised, for the leader and all waiters
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._stats['hits'] += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            if flight:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                self._stats['misses'] += 1
+                flight = _Flight()
+                self._inflight[key] = flight
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        else:
+            flight.value = value
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def set(self, key, value):
+        """Store a value fetched outside get_or_load (e.g. by a background poller)"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key if none is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self):
+        """
+        Get a snapshot of cache counters
+
+        Returns:
+            dict: Hit/miss/coalesced/error counts plus size and TTL
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['inflight'] = len(self._inflight)
+        stats['ttl'] = self.ttl
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0
+        return stats
+
+def get_all_stats():
+    """
+    Get stats for every registered cache
+
+    Returns:
+        dict: Cache name -> stats dict
+    """
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.get_stats() for cache in caches}
@@ -0,0 +1,147 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+# Directory sizing configuration
+STORAGE_DU_WORKERS = int(os.environ.get("STORAGE_DU_WORKERS", 8))
+STORAGE_DU_DEADLINE = float(os.environ.get("STORAGE_DU_DEADLINE", 120))
+
+def iter_directory_sizes(root, max_workers=STORAGE_DU_WORKERS, deadline=STORAGE_DU_DEADLINE):
+    """
+    Size every top-level directory under root in parallel, yielding each as it finishes
+
+    Worker threads share one LIFO stack of directories to scan, so they tend
+    to dig into the same subtree together and finish it early instead of
+    spreading breadth-first across all of them. Sizes are allocated blocks,
+    like `du -s`; a file with several hardlinks is counted once, against
+    whichever subtree reaches it first. Symlinks are not followed.
+
+    Subtrees still being walked when the deadline passes are yielded with
+    'partial': True and the bytes counted so far, rather than dropped.
+    Closing the generator early stops the workers.
+
+    Args:
+        root: Directory whose children are sized
+        max_workers: Scanner threads
+        deadline: Overall time budget in seconds
+
+    Yields:
+        dict: {'name', 'path', 'size', 'size_gb', 'apparent_size', 'files',
+               'dirs', 'errors', 'partial', 'elapsed'} per top-level directory
+    """
+    started = time.monotonic()
+    totals = {}
+    with os.scandir(root) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    own = entry.stat(follow_symlinks=False).st_blocks * 512
+                    totals[entry.name] = {
+                        'name': entry.name, 'path': entry.path, 'size': own, 'apparent_size': 0,
+                        'files': 0, 'dirs': 1, 'errors': 0
+                    }
+            except OSError as e:
+                logging.warning(f"Error reading {entry.path}: {str(e)}")
+    if not totals:
+        return
+
+    lock = threading.Lock()
+    stop = threading.Event()
+    work = queue.LifoQueue()
+    finished = queue.Queue()
+    # Directories queued or being scanned, per subtree
+    pending = {name: 1 for name in totals}
+    seen_inodes = set()
+
+    for name in sorted(totals, reverse=True):
+        work.put((name, totals[name]['path']))
+
+    def scan(name, dirpath):
+        subdirs = []
+        size = apparent = files = errors = 0
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if stop.is_set():
+                        break
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    elif st.st_nlink > 1:
+                        key = (st.st_dev, st.st_ino)
+                        with lock:
+                            if key in seen_inodes:
+                                continue
+                            seen_inodes.add(key)
+                    size += st.st_blocks * 512
+                    if not is_dir:
+                        apparent += st.st_size
+                        files += 1
+        except OSError:
+            errors += 1
+
+        with lock:
+            total = totals[name]
+            total['size'] += size
+            total['apparent_size'] += apparent
+            total['files'] += files
+            total['dirs'] += len(subdirs)
+            total['errors'] += errors
+            if not stop.is_set():
+                pending[name] += len(subdirs)
+                for subdir in subdirs:
+                    work.put((name, subdir))
+            pending[name] -= 1
+            done = pending[name] == 0
+        if done:
+            finished.put(name)
+
+    def worker():
+        while not stop.is_set():
+            try:
+                name, dirpath = work.get(timeout=0.2)
+            except queue.Empty:
+                with lock:
+                    if not any(pending.values()):
+                        return
+                continue
+            scan(name, dirpath)
+
+    # Daemon threads: a scan stuck on a dead mount must not hold up shutdown
+    for i in range(max(1, min(max_workers, len(totals) * 4))):
+        threading.Thread(target=worker, name=f"dirsize-{i}", daemon=True).start()
+
+    def report(name, partial):
+        with lock:
+            entry = dict(totals[name])
+        entry['size_gb'] = round(entry['size'] / (1024**3), 2)
+        entry['partial'] = partial
+        entry['elapsed'] = round(time.monotonic() - started, 3)
+        return entry
+
+    reported = set()
+    try:
+        while len(reported) < len(totals):
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            try:
+                name = finished.get(timeout=remaining)
+            except queue.Empty:
+                break
+            reported.add(name)
+            yield report(name, False)
+
+        stop.set()
+        for name in sorted(set(totals) - reported):
+            logging.warning(f"Directory sizing of {totals[name]['path']} hit the {deadline}s deadline")
+            yield report(name, True)
+    finally:
+        stop.set()
@@ -1,8 +1,46 @@
 import requests
 import logging
 import json
+import base64
 import os
+import time
+import threading
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from utils.fanout import fan_out
+from utils.unixsocket import UnixSocketAdapter
+from utils.upstream import get_breaker
+
+# Fail fast when the Docker host is unreachable instead of waiting on the OS TCP timeout
+DOCKER_CONNECT_TIMEOUT = float(os.environ.get("DOCKER_CONNECT_TIMEOUT", 3.05))
+
+# Local Engine socket, used when DOCKER_HOST is unset or set to unix://<path>
+DOCKER_SOCKET = os.environ.get("DOCKER_SOCKET", "/var/run/docker.sock")
+
+# Keep-alive connections held open per Docker host
+DOCKER_POOL_MAXSIZE = int(os.environ.get("DOCKER_POOL_MAXSIZE", 16))
+
+# Bounded fan-out for batched container stats
+DOCKER_STATS_WORKERS = int(os.environ.get("DOCKER_STATS_WORKERS", 16))
+DOCKER_STATS_DEADLINE = float(os.environ.get("DOCKER_STATS_DEADLINE", 8))
+
+# URL prefix the Unix socket adapter is mounted on; the host part is ignored
+UNIX_SOCKET_PREFIX = "http+unix://docker"
+
+# Multi-host fleet: JSON list of {"name", "host"} objects, where host takes
+# the same forms as DOCKER_HOST. When unset, the single DOCKER_HOST is used
+# under DOCKER_HOST_NAME.
+DOCKER_HOST_NAME = os.environ.get("DOCKER_HOST_NAME", "default")
+DOCKER_HOST_DEADLINE = float(os.environ.get("DOCKER_HOST_DEADLINE", 6))
+
+_clients = {}
+_client_lock = threading.Lock()
+
+_host_status = {}
+_host_status_lock = threading.Lock()
+
+# Container ID -> host name, learned from listings so actions can be routed
+_container_hosts = {}
 
 # Function to generate mock container data for development/testing
 def get_mock_containers(all_containers=True):
@@ -77,21 +115,91 @@ def get_mock_containers(all_containers=True):
         return [c for c in mock_containers if 'up' in c['Status'].lower()]
     return mock_containers
 
-def get_docker_url(settings=None):
+def get_host_configs():
+    """
+    Parse the DOCKER_HOSTS fleet config
+    
+    Returns:
+        dict: Host name -> config dict, empty when no fleet is configured
+    """
+    raw = os.environ.get("DOCKER_HOSTS")
+    if not raw:
+        return {}
+    try:
+        hosts = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid DOCKER_HOSTS JSON: {str(e)}")
+    configs = {}
+    for entry in hosts:
+        if not entry.get('name') or not entry.get('host'):
+            raise ValueError("Each DOCKER_HOSTS entry needs a name and host")
+        configs[entry['name']] = entry
+    return configs
+
+def is_fleet():
+    """Whether more than the single DOCKER_HOST is configured"""
+    return bool(os.environ.get("DOCKER_HOSTS"))
+
+def get_host_names():
+    """
+    Names of every configured Docker host
+    
+    Returns:
+        list: Host names (just DOCKER_HOST_NAME when no fleet is configured)
+    """
+    configs = get_host_configs()
+    return list(configs) if configs else [DOCKER_HOST_NAME]
+
+def normalize_docker_url(docker_host, docker_port=2375):
+    """
+    Turn a DOCKER_HOST style address into an API base URL
+    
+    Returns:
+        str: http(s)://host:port, or unix://<path> for a local socket
+    """
+    if docker_host.startswith('unix://'):
+        return docker_host
+    
+    base_url = docker_host
+    if base_url.startswith('tcp://'):
+        base_url = base_url.replace('tcp://', 'http://')
+    
+    if not base_url.startswith('http'):
+        base_url = f"http://{base_url}"
+    
+    # Add port if not in URL
+    if ':' not in base_url.split('//')[-1]:
+        base_url = f"{base_url}:{docker_port}"
+    
+    return base_url
+
+def get_docker_url(settings=None, host=None):
     """
     Build the Docker API URL using hardcoded values
     
+    DOCKER_HOST may be a TCP address or unix:///path/to/docker.sock. When it
+    is unset and the local Engine socket exists, the socket is used.
+    
     Args:
         settings: Ignored - maintained for backward compatibility
+        host: Optional fleet host name (defaults to the first/only host)
         
     Returns:
-        str: Docker API base URL
+        str: Docker API base URL (unix://<path> for the local socket)
     """
     # When running on Replit, we're in development mode
     import os
     if os.environ.get("REPLIT_DB_URL"):
         # This is a development environment, return a placeholder URL
         return "http://localhost:2375"
+    
+    configs = get_host_configs()
+    if configs:
+        config = configs.get(host) if host else next(iter(configs.values()))
+        if config is None:
+            raise ValueError(f"Unknown Docker host: {host}")
+        return normalize_docker_url(config['host'], int(config.get('port', 2375)))
+    
     # Hardcoded Docker credentials
     docker_host = os.environ.get("DOCKER_HOST")
     docker_port = int(os.environ.get("DOCKER_PORT", 2375))
@@ -101,24 +209,110 @@ def get_docker_url(settings=None):
     
     # Format Docker URL
     if not docker_host:
+        if os.path.exists(DOCKER_SOCKET):
+            return f"unix://{DOCKER_SOCKET}"
         if development_mode:
             logging.warning("Development mode enabled - using mock Docker host")
             docker_host = "localhost"
         else:
             raise ValueError("Docker host not configured")
-        
-    base_url = docker_host
-    if base_url.startswith('tcp://'):
-        base_url = base_url.replace('tcp://', 'http://')
     
-    if not base_url.startswith('http'):
-        base_url = f"http://{base_url}"
+    return normalize_docker_url(docker_host, docker_port)
+
+class DockerClient:
+    """
+    Pooled, keep-alive requests.Session for one Docker Engine
     
-    # Add port if not in URL
-    if ':' not in base_url.split('//')[-1]:
-        base_url = f"{base_url}:{docker_port}"
+    Speaks HTTP over TCP or over the Engine's Unix socket; either way the
+    connections stay open between calls instead of being re-dialled for
+    every list, action and stats request.
+    """
+
+    def __init__(self, base_url, pool_maxsize=DOCKER_POOL_MAXSIZE,
+                 connect_timeout=DOCKER_CONNECT_TIMEOUT):
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.breaker = get_breaker(f"docker:{base_url}")
+        self.session = requests.Session()
+
+        if base_url.startswith('unix://'):
+            self.url_prefix = UNIX_SOCKET_PREFIX
+            self.session.mount(
+                UNIX_SOCKET_PREFIX,
+                UnixSocketAdapter(base_url[len('unix://'):], timeout=connect_timeout,
+                                  pool_maxsize=pool_maxsize)
+            )
+        else:
+            self.url_prefix = base_url
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, pool_block=False)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def request(self, method, path, timeout, breaker=None, **kwargs):
+        """
+        Send a request through the host's circuit breaker
+        
+        Args:
+            method: HTTP method
+            path: API path such as "/containers/json"
+            timeout: Read timeout in seconds
+            breaker: Optional breaker to record on instead of the host's, for
+                calls whose slowness says nothing about the host's health
+            **kwargs: Passed through to requests (params, stream, ...)
+            
+        Returns:
+            requests.Response: Response with a successful status
+        """
+        return (breaker or self.breaker).call(self._request, method, path, timeout, kwargs)
+
+    def _request(self, method, path, timeout, kwargs):
+        response = self.session.request(
+            method,
+            f"{self.url_prefix}{path}",
+            timeout=(self.connect_timeout, timeout),
+            **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+def get_docker_client(settings=None, host=None):
+    """
+    Get the shared client for a Docker host, creating it on first use
     
-    return base_url
+    Args:
+        settings: Ignored - maintained for backward compatibility
+        host: Optional fleet host name (defaults to the first/only host)
+        
+    Returns:
+        DockerClient: Shared client instance
+    """
+    base_url = get_docker_url(settings, host)
+    with _client_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = DockerClient(base_url)
+        return client
+
+def docker_request(settings, method, path, timeout, host=None, **kwargs):
+    """
+    Send a request to the Docker API over the shared pooled client
+    
+    Args:
+        settings: UserSettings object with Docker config
+        method: HTTP method
+        path: API path such as "/containers/json"
+        timeout: Read timeout in seconds (connect timeout is DOCKER_CONNECT_TIMEOUT)
+        host: Optional fleet host name (defaults to the first/only host)
+        **kwargs: Passed through to requests (params, stream, ...)
+        
+    Returns:
+        requests.Response: Response with a successful status
+    """
+    return get_docker_client(settings, host).request(method, path, timeout, **kwargs)
 
 def get_containers(settings, all_containers=True):
     """
@@ -202,183 +396,470 @@ def get_containers(settings, all_containers=True):
         return mock_containers
     
     # Normal production mode
-    base_url = get_docker_url(settings)
+    try:
+        return fetch_fleet_containers(settings, all_containers)
+        
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error connecting to Docker API: {str(e)}")
+        raise Exception(f"Error connecting to Docker: {str(e)}")
+
+def format_container(container):
+    """
+    Add the display fields the dashboard uses to a /containers/json entry
     
+    Args:
+        container: Container dict from the Docker API (modified in place)
+        
+    Returns:
+        dict: The same container
+    """
+    # Convert created timestamp to readable date
+    created = container.get('Created', 0)
+    container['CreatedFormatted'] = datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Format port mappings
+    container['PortsFormatted'] = []
+    for port in container.get('Ports', []):
+        if 'PublicPort' in port and 'PrivatePort' in port:
+            container['PortsFormatted'].append(
+                f"{port.get('PublicPort', '')}:{port.get('PrivatePort', '')}/{port.get('Type', 'tcp')}"
+            )
+    
+    # Extract name without leading slash
+    container['Names'] = [name.lstrip('/') for name in container.get('Names', [])]
+    
+    # Get first name as primary name
+    if container['Names']:
+        container['Name'] = container['Names'][0]
+    else:
+        container['Name'] = 'Unnamed'
+        
+    # Format status
+    status = container.get('Status', '').lower()
+    if 'up' in status:
+        container['StatusClass'] = 'success'
+    elif 'exited' in status:
+        container['StatusClass'] = 'danger'
+    elif 'paused' in status:
+        container['StatusClass'] = 'warning'
+    else:
+        container['StatusClass'] = 'secondary'
+    return container
+
+# ?sort= names accepted by query_containers, mapped to (container key, type).
+# Matching is case-insensitive, so the raw key ("SizeRw") works as well.
+SORT_KEYS = {
+    'name': ('Name', str),
+    'id': ('Id', str),
+    'image': ('Image', str),
+    'imageid': ('ImageID', str),
+    'command': ('Command', str),
+    'created': ('Created', int),
+    'status': ('Status', str),
+    'state': ('State', str),
+    'host': ('Host', str),
+    'sizerw': ('SizeRw', int),
+    'sizerootfs': ('SizeRootFs', int)
+}
+
+def container_state(container):
+    """
+    Docker's State for a container ("running", "exited", ...)
+    
+    Mock data only carries a Status string, so fall back to parsing it.
+    """
+    if container.get('State'):
+        return container['State']
+    status = container.get('Status', '').lower()
+    if status.startswith('up'):
+        return 'paused' if 'paused' in status else 'running'
+    if status.startswith('exited'):
+        return 'exited'
+    return status.split(' ')[0] if status else 'unknown'
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
     try:
-        response = requests.get(
-            f"{base_url}/containers/json?all={'true' if all_containers else 'false'}",
-            timeout=5
-        )
-        response.raise_for_status()
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 3:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+def query_containers(containers, fields=None, states=None, sort=None, limit=None, cursor=None):
+    """
+    Filter, sort, paginate and project a container list
+    
+    Pagination is keyset-based: the cursor encodes the sort value and ID of
+    the last container returned, so pages stay consistent when containers
+    come and go between requests.
+    
+    Args:
+        containers: Formatted container list
+        fields: Optional list of keys to keep ('Id' is always kept)
+        states: Optional list of states to include (running, exited, ...)
+        sort: Optional sort name or key, '-' prefix for descending (default "name")
+        limit: Optional page size
+        cursor: Optional cursor from a previous page
         
-        containers = response.json()
+    Returns:
+        tuple: (page list, next cursor or None, total matching containers)
         
-        # Format container data
-        for container in containers:
-            # Convert created timestamp to readable date
-            created = container.get('Created', 0)
-            container['CreatedFormatted'] = datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Format port mappings
-            container['PortsFormatted'] = []
-            for port in container.get('Ports', []):
-                if 'PublicPort' in port and 'PrivatePort' in port:
-                    container['PortsFormatted'].append(
-                        f"{port.get('PublicPort', '')}:{port.get('PrivatePort', '')}/{port.get('Type', 'tcp')}"
-                    )
-            
-            # Extract name without leading slash
-            container['Names'] = [name.lstrip('/') for name in container.get('Names', [])]
-            
-            # Get first name as primary name
-            if container['Names']:
-                container['Name'] = container['Names'][0]
-            else:
-                container['Name'] = 'Unnamed'
-                
-            # Format status
-            status = container.get('Status', '').lower()
-            if 'up' in status:
-                container['StatusClass'] = 'success'
-            elif 'exited' in status:
-                container['StatusClass'] = 'danger'
-            elif 'paused' in status:
-                container['StatusClass'] = 'warning'
-            else:
-                container['StatusClass'] = 'secondary'
+    Raises:
+        ValueError: For an unknown sort field or an invalid cursor
+    """
+    if states:
+        wanted = {state.lower() for state in states}
+        containers = [c for c in containers if container_state(c) in wanted]
+    
+    sort = sort or 'name'
+    descending = sort.startswith('-')
+    sort_field = sort.lstrip('-')
+    if sort_field.lower() not in SORT_KEYS:
+        raise ValueError(f"Cannot sort by '{sort_field}'; use one of: {', '.join(SORT_KEYS)}")
+    key_name, kind = SORT_KEYS[sort_field.lower()]
+    
+    def sort_key(container):
+        value = container_state(container) if key_name == 'State' else container.get(key_name)
+        # Coerce to the field's type so values always compare; containers
+        # missing the field (SizeRw without ?size=1) sort after the rest in
+        # either direction
+        if value is not None:
+            try:
+                value = kind(value)
+            except (TypeError, ValueError):
+                value = None
+        missing = (value is None) != descending
+        return (missing, kind() if value is None else value, container.get('Id', ''))
+    
+    keyed = sorted(((sort_key(c), c) for c in containers), key=lambda item: item[0], reverse=descending)
+    total = len(keyed)
+    
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            keyed = [item for item in keyed if (item[0] < after if descending else item[0] > after)]
+        except TypeError:
+            raise ValueError("Cursor does not match the sort order")
+    
+    next_cursor = None
+    if limit is not None and len(keyed) > limit:
+        keyed = keyed[:limit]
+        next_cursor = encode_cursor(list(keyed[-1][0]))
+    
+    page = [c for _, c in keyed]
+    if fields:
+        keep = set(fields) | {'Id'}
+        page = [{k: v for k, v in c.items() if k in keep} for c in page]
+    return page, next_cursor, total
+
+def fetch_containers(settings, all_containers=True, filters=None, host=None):
+    """
+    Query /containers/json on one host and format the result (no mock data, no error wrapping)
+    
+    Args:
+        settings: UserSettings object with Docker config
+        all_containers: Whether to include stopped containers
+        filters: Optional Docker filters dict, e.g. {"id": [container_id]}
+        host: Optional fleet host name (defaults to the first/only host)
         
-        return containers
+    Returns:
+        list: Formatted container objects, each tagged with its 'Host'
         
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error connecting to Docker API: {str(e)}")
-        raise Exception(f"Error connecting to Docker: {str(e)}")
+    Raises:
+        requests.exceptions.RequestException: If the Docker API call fails
+    """
+    host = host or get_host_names()[0]
+    params = {'all': 'true' if all_containers else 'false'}
+    if filters:
+        params['filters'] = json.dumps(filters)
+    response = docker_request(settings, "GET", "/containers/json", timeout=5, host=host, params=params)
+    
+    containers = [format_container(container) for container in response.json()]
+    for container in containers:
+        container['Host'] = host
+        _container_hosts[container['Id']] = host
+    return containers
+
+def _query_host(settings, host, all_containers, filters):
+    started = time.monotonic()
+    try:
+        containers = fetch_containers(settings, all_containers, filters, host)
+    except Exception as e:
+        _record_host_status(host, time.monotonic() - started, str(e))
+        raise
+    _record_host_status(host, time.monotonic() - started, None, len(containers))
+    return containers
+
+def fetch_fleet_containers(settings, all_containers=True, filters=None):
+    """
+    Query /containers/json on every host concurrently and merge the results
+    
+    A slow or unreachable host only costs its own DOCKER_HOST_DEADLINE and
+    is left out of the merged list; an error is raised only if every host fails.
+    
+    Args:
+        settings: UserSettings object with Docker config
+        all_containers: Whether to include stopped containers
+        filters: Optional Docker filters dict
+        
+    Returns:
+        list: Formatted containers from all reachable hosts, tagged with 'Host'
+    """
+    names = get_host_names()
+    
+    if len(names) == 1:
+        # Nothing to isolate; skip the thread hop
+        return _query_host(settings, names[0], all_containers, filters)
+    
+    tasks = {name: (_query_host, (settings, name, all_containers, filters)) for name in names}
+    outcome = fan_out(tasks, len(tasks), DOCKER_HOST_DEADLINE, "docker-host")
+    for name in outcome['timed_out']:
+        _record_host_status(name, DOCKER_HOST_DEADLINE, outcome['errors'][name])
+    for name, message in outcome['errors'].items():
+        logging.warning(f"Docker host '{name}' failed to list containers: {message}")
+    if not outcome['results']:
+        raise requests.exceptions.RequestException(
+            "; ".join(f"{name}: {message}" for name, message in outcome['errors'].items())
+        )
+    
+    merged = []
+    for name in names:
+        merged.extend(outcome['results'].get(name, []))
+    return merged
+
+def _record_host_status(name, elapsed, error, containers=None):
+    with _host_status_lock:
+        _host_status[name] = {
+            'ok': error is None,
+            'error': error,
+            'containers': containers,
+            'elapsed': round(elapsed, 3),
+            'checked_at': time.time()
+        }
+
+def get_host_status():
+    """
+    Last listing outcome for each configured Docker host
+    
+    Returns:
+        dict: Host name -> {'ok', 'error', 'containers', 'elapsed', 'checked_at'}
+    """
+    with _host_status_lock:
+        status = {name: dict(info) for name, info in _host_status.items()}
+    for name in get_host_names():
+        status.setdefault(name, {'ok': None, 'error': None, 'containers': None,
+                                 'elapsed': None, 'checked_at': None})
+    return status
+
+def resolve_host(settings, container_id):
+    """
+    Find the fleet host a container lives on
+    
+    Uses the ID -> host map learned from listings, refreshing it once on a
+    miss. Short IDs and container names are matched too.
+    
+    Args:
+        settings: UserSettings object with Docker config
+        container_id: Full or short container ID, or name
+        
+    Returns:
+        str or None: Host name (None when no fleet is configured)
+    """
+    if not is_fleet():
+        return None
+    
+    def lookup():
+        host = _container_hosts.get(container_id)
+        if host:
+            return host
+        for cid, cid_host in list(_container_hosts.items()):
+            if cid.startswith(container_id):
+                return cid_host
+        return None
+    
+    host = lookup()
+    if host is None:
+        containers = fetch_fleet_containers(settings, all_containers=True)
+        host = lookup()
+        if host is None:
+            for container in containers:
+                if container_id in container.get('Names', []):
+                    return container['Host']
+            raise ValueError(f"Container {container_id} not found on any Docker host")
+    return host
 
-def start_container(settings, container_id):
+def start_container(settings, container_id, host=None):
     """
     Start a Docker container
     
     Args:
         settings: UserSettings object with Docker config
         container_id: Container ID to start
+        host: Optional fleet host name (looked up from the ID if omitted)
         
     Returns:
         bool: Success status
     """
-    base_url = get_docker_url(settings)
-    
     try:
-        response = requests.post(
-            f"{base_url}/containers/{container_id}/start",
-            timeout=10
+        docker_request(
+            settings, "POST", f"/containers/{container_id}/start", timeout=10,
+            host=host or resolve_host(settings, container_id)
         )
-        response.raise_for_status()
         return True
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error starting container: {str(e)}")
         raise Exception(f"Error starting container: {str(e)}")
 
-def stop_container(settings, container_id):
+def stop_container(settings, container_id, host=None):
     """
     Stop a Docker container
     
     Args:
         settings: UserSettings object with Docker config
         container_id: Container ID to stop
+        host: Optional fleet host name (looked up from the ID if omitted)
         
     Returns:
         bool: Success status
     """
-    base_url = get_docker_url(settings)
-    
     try:
-        response = requests.post(
-            f"{base_url}/containers/{container_id}/stop",
-            timeout=30  # Longer timeout for stop operation
+        # Longer timeout for stop operation
+        docker_request(
+            settings, "POST", f"/containers/{container_id}/stop", timeout=30,
+            host=host or resolve_host(settings, container_id)
         )
-        response.raise_for_status()
         return True
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error stopping container: {str(e)}")
         raise Exception(f"Error stopping container: {str(e)}")
 
-def restart_container(settings, container_id):
+def restart_container(settings, container_id, host=None):
     """
     Restart a Docker container
     
     Args:
         settings: UserSettings object with Docker config
         container_id: Container ID to restart
+        host: Optional fleet host name (looked up from the ID if omitted)
         
     Returns:
         bool: Success status
     """
-    base_url = get_docker_url(settings)
-    
     try:
-        response = requests.post(
-            f"{base_url}/containers/{container_id}/restart",
-            timeout=30  # Longer timeout for restart operation
+        # Longer timeout for restart operation
+        docker_request(
+            settings, "POST", f"/containers/{container_id}/restart", timeout=30,
+            host=host or resolve_host(settings, container_id)
         )
-        response.raise_for_status()
         return True
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error restarting container: {str(e)}")
         raise Exception(f"Error restarting container: {str(e)}")
 
-def get_container_stats(settings, container_id):
+def get_container_stats(settings, container_id, host=None):
     """
     Get container runtime statistics
     
     Args:
         settings: UserSettings object with Docker config
         container_id: Container ID to get stats for
+        host: Optional fleet host name (looked up from the ID if omitted)
         
     Returns:
         dict: Container statistics
     """
-    base_url = get_docker_url(settings)
-    
     try:
         # Get one-time stats snapshot
-        response = requests.get(
-            f"{base_url}/containers/{container_id}/stats?stream=false",
-            timeout=5
+        response = docker_request(
+            settings, "GET", f"/containers/{container_id}/stats?stream=false", timeout=5,
+            host=host or resolve_host(settings, container_id)
         )
-        response.raise_for_status()
-        
-        stats = response.json()
-        
-        # Calculate CPU percentage
-        cpu_delta = stats.get('cpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0) - \
-                   stats.get('precpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0)
         
-        system_delta = stats.get('cpu_stats', {}).get('system_cpu_usage', 0) - \
-                       stats.get('precpu_stats', {}).get('system_cpu_usage', 0)
-        
-        cpu_percent = 0
-        if system_delta > 0 and cpu_delta > 0:
-            num_cpus = len(stats.get('cpu_stats', {}).get('cpu_usage', {}).get('percpu_usage', []))
-            if num_cpus == 0:
-                num_cpus = 1
-            cpu_percent = (cpu_delta / system_delta) * num_cpus * 100
-        
-        # Calculate memory usage
-        memory_usage = stats.get('memory_stats', {}).get('usage', 0)
-        memory_limit = stats.get('memory_stats', {}).get('limit', 1)
-        memory_percent = (memory_usage / memory_limit) * 100
-        
-        return {
-            'id': container_id,
-            'cpu_percent': round(cpu_percent, 2),
-            'memory_percent': round(memory_percent, 2),
-            'memory_usage': memory_usage,
-            'memory_limit': memory_limit,
-            'networks': stats.get('networks', {})
-        }
+        return summarize_stats(container_id, response.json())
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error getting container stats: {str(e)}")
         raise Exception(f"Error getting container stats: {str(e)}")
+
+def summarize_stats(container_id, stats):
+    """
+    Reduce a raw Docker stats sample to the fields the dashboard shows
+    
+    Args:
+        container_id: Container ID the sample belongs to
+        stats: One decoded sample from /containers/{id}/stats
+        
+    Returns:
+        dict: Container statistics
+    """
+    # Calculate CPU percentage
+    cpu_delta = stats.get('cpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0) - \
+               stats.get('precpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0)
+    
+    system_delta = stats.get('cpu_stats', {}).get('system_cpu_usage', 0) - \
+                   stats.get('precpu_stats', {}).get('system_cpu_usage', 0)
+    
+    cpu_percent = 0
+    if system_delta > 0 and cpu_delta > 0:
+        num_cpus = len(stats.get('cpu_stats', {}).get('cpu_usage', {}).get('percpu_usage', []))
+        if num_cpus == 0:
+            num_cpus = 1
+        cpu_percent = (cpu_delta / system_delta) * num_cpus * 100
+    
+    # Calculate memory usage
+    memory_usage = stats.get('memory_stats', {}).get('usage', 0)
+    memory_limit = stats.get('memory_stats', {}).get('limit') or 1
+    memory_percent = (memory_usage / memory_limit) * 100
+    
+    return {
+        'id': container_id,
+        'cpu_percent': round(cpu_percent, 2),
+        'memory_percent': round(memory_percent, 2),
+        'memory_usage': memory_usage,
+        'memory_limit': memory_limit,
+        'networks': stats.get('networks', {})
+    }
+
+def get_all_container_stats(settings, container_ids=None, max_workers=None, deadline=None):
+    """
+    Fetch stats for many containers concurrently
+    
+    Each stats?stream=false call blocks for about a second while Docker
+    fills in precpu_stats, so calls run on a bounded thread pool under one
+    overall deadline; stragglers are reported as timeouts.
+    
+    Args:
+        settings: UserSettings object with Docker config
+        container_ids: Optional list of IDs; defaults to all running containers
+        max_workers: Maximum concurrent stats requests
+        deadline: Overall time budget in seconds
+        
+    Returns:
+        dict: {'stats': {id: stats}, 'errors': {id: message},
+               'timed_out': [ids], 'elapsed': seconds}
+    """
+    max_workers = max_workers or DOCKER_STATS_WORKERS
+    deadline = DOCKER_STATS_DEADLINE if deadline is None else deadline
+    
+    if container_ids is None:
+        targets = {c['Id']: c['Host'] for c in fetch_fleet_containers(settings, all_containers=False)}
+    else:
+        targets = {cid: None for cid in container_ids}
+    
+    tasks = {cid: (get_container_stats, (settings, cid, host)) for cid, host in targets.items()}
+    outcome = fan_out(tasks, max_workers, deadline, "docker-stats")
+    
+    return {
+        'stats': outcome['results'],
+        'errors': outcome['errors'],
+        'timed_out': outcome['timed_out'],
+        'elapsed': outcome['elapsed']
+    }
@@ -0,0 +1,319 @@
+import os
+import time
+import logging
+import threading
+
+from utils import docker
+from utils.fanout import fan_out
+from utils.upstream import get_breaker
+
+# Background disk usage inventory configuration
+DOCKER_DF_ENABLED = os.environ.get("DOCKER_DF_ENABLED", "false").lower() == "true"
+DOCKER_DF_INTERVAL = float(os.environ.get("DOCKER_DF_INTERVAL", 900))
+# /system/df walks every layer and volume; allow it far longer than a normal call
+DOCKER_DF_TIMEOUT = float(os.environ.get("DOCKER_DF_TIMEOUT", 300))
+
+_inventory = None
+_inventory_lock = threading.Lock()
+
+def fetch_disk_usage(settings, host=None):
+    """
+    Get the raw /system/df report for one Docker host
+
+    Args:
+        settings: UserSettings object with Docker config
+        host: Optional fleet host name
+
+    Returns:
+        dict: Docker's disk usage response
+    """
+    client = docker.get_docker_client(settings, host)
+    # A df that takes minutes is expected on a big host, so it gets its own
+    # breaker rather than counting against every other call to the host
+    breaker = get_breaker(f"docker-df:{client.base_url}")
+    response = client.request("GET", "/system/df", timeout=DOCKER_DF_TIMEOUT, breaker=breaker)
+    return response.json()
+
+def summarize_disk_usage(df):
+    """
+    Reduce a /system/df report to per-category totals and reclaimable bytes
+
+    Reclaimable space follows the Docker CLI's `docker system df`: image
+    layers not referenced by any container, writable layers of stopped
+    containers, volumes with no references and build cache not in use.
+    Image sizes are split into bytes unique to the image and bytes shared
+    with other images, so the shared layers are only counted once in the total.
+
+    Args:
+        df: Raw /system/df response
+
+    Returns:
+        dict: 'images', 'containers', 'volumes', 'build_cache' lists and a
+            'totals' dict of {count, active, size, reclaimable} per category
+    """
+    images = []
+    images_in_use = 0
+    for image in df.get('Images') or []:
+        size = image.get('Size', 0)
+        # SharedSize is -1 when the daemon didn't compute it
+        shared = max(0, image.get('SharedSize', 0))
+        containers = max(0, image.get('Containers', 0))
+        if containers:
+            images_in_use += size - shared
+        images.append({
+            'id': image.get('Id', '').replace('sha256:', '')[:12],
+            'tags': [t for t in image.get('RepoTags') or [] if t != '<none>:<none>'],
+            'created': image.get('Created'),
+            'size': size,
+            'shared_size': shared,
+            'unique_size': size - shared,
+            'containers': containers,
+            'in_use': containers > 0
+        })
+    layers_size = df.get('LayersSize', 0)
+
+    containers = []
+    for container in df.get('Containers') or []:
+        containers.append({
+            'id': container.get('Id', '')[:12],
+            'name': (container.get('Names') or ['/'])[0].lstrip('/'),
+            'image': container.get('Image'),
+            'state': container.get('State'),
+            'size_rw': container.get('SizeRw', 0),
+            'size_root_fs': container.get('SizeRootFs', 0)
+        })
+
+    volumes = []
+    for volume in df.get('Volumes') or []:
+        usage = volume.get('UsageData') or {}
+        volumes.append({
+            'name': volume.get('Name'),
+            'driver': volume.get('Driver'),
+            'mountpoint': volume.get('Mountpoint'),
+            # -1 means the size couldn't be measured (e.g. a remote driver)
+            'size': usage.get('Size', -1),
+            'ref_count': usage.get('RefCount', 0)
+        })
+
+    build_cache = []
+    for record in df.get('BuildCache') or []:
+        build_cache.append({
+            'id': record.get('ID', '')[:12],
+            'type': record.get('Type'),
+            'description': record.get('Description'),
+            'size': record.get('Size', 0),
+            'in_use': bool(record.get('InUse')),
+            'shared': bool(record.get('Shared')),
+            'last_used': record.get('LastUsedAt')
+        })
+
+    totals = {
+        'images': {
+            'count': len(images),
+            'active': sum(1 for i in images if i['in_use']),
+            'size': layers_size,
+            'unique_size': sum(i['unique_size'] for i in images),
+            'shared_size': max(0, layers_size - sum(i['unique_size'] for i in images)),
+            'reclaimable': max(0, layers_size - images_in_use)
+        },
+        'containers': {
+            'count': len(containers),
+            'active': sum(1 for c in containers if c['state'] == 'running'),
+            'size': sum(c['size_rw'] for c in containers),
+            'reclaimable': sum(c['size_rw'] for c in containers if c['state'] != 'running')
+        },
+        'volumes': {
+            'count': len(volumes),
+            'active': sum(1 for v in volumes if v['ref_count'] > 0),
+            'size': sum(v['size'] for v in volumes if v['size'] > 0),
+            'reclaimable': sum(v['size'] for v in volumes if v['size'] > 0 and v['ref_count'] == 0)
+        },
+        'build_cache': {
+            'count': len(build_cache),
+            'active': sum(1 for b in build_cache if b['in_use']),
+            'size': sum(b['size'] for b in build_cache),
+            'reclaimable': sum(b['size'] for b in build_cache if not b['in_use'] and not b['shared'])
+        }
+    }
+    totals['reclaimable'] = sum(t['reclaimable'] for t in totals.values())
+
+    images.sort(key=lambda i: i['size'], reverse=True)
+    volumes.sort(key=lambda v: v['size'], reverse=True)
+    return {
+        'images': images,
+        'containers': containers,
+        'volumes': volumes,
+        'build_cache': build_cache,
+        'totals': totals
+    }
+
+class DiskUsageInventory:
+    """
+    Periodically refreshed /system/df summary per Docker host
+
+    The daemon computes disk usage by walking every layer and volume, which
+    can take minutes on a large host, so it is only ever called from this
+    background thread. Routes read the last good summary from memory; a
+    failed refresh keeps the previous one and records the error per host.
+    """
+
+    def __init__(self, settings=None, interval=DOCKER_DF_INTERVAL):
+        self.settings = settings
+        self.interval = interval
+        # host name -> {'taken_at', 'duration', 'summary'}
+        self._hosts = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+        self.last_refresh_at = None
+
+    def start(self):
+        """Start the refresh thread (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-df", daemon=True)
+        self._thread.start()
+        logging.info(f"Docker disk usage inventory started (interval {self.interval}s)")
+
+    def stop(self):
+        """Stop the refresh thread"""
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def request_refresh(self):
+        """Ask the background thread to refresh now instead of waiting for the next tick"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.refresh()
+            self._wake.wait(self.interval)
+
+    def refresh(self):
+        """
+        Fetch /system/df from every host concurrently and replace their summaries
+
+        Returns:
+            dict: fan_out outcome keyed by host name
+        """
+        # A manual refresh and the scheduled one must not stack up on the daemon
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.monotonic()
+            self.runs += 1
+            hosts = docker.get_host_names()
+            outcome = fan_out(
+                {host: (self._refresh_host, (host,)) for host in hosts},
+                max_workers=len(hosts),
+                deadline=DOCKER_DF_TIMEOUT + 5,
+                thread_name_prefix="docker-df"
+            )
+
+            with self._lock:
+                for host in outcome['results']:
+                    self._errors.pop(host, None)
+                for host, error in outcome['errors'].items():
+                    self._errors[host] = {'error': error, 'at': time.time()}
+                for host in outcome['timed_out']:
+                    self._errors[host] = {'error': 'Timed out', 'at': time.time()}
+                # Hosts removed from the fleet config
+                for host in set(self._hosts) - set(hosts):
+                    del self._hosts[host]
+
+            if outcome['errors'] or outcome['timed_out']:
+                self.failures += 1
+                logging.warning(f"Docker disk usage refresh failed for: "
+                                f"{', '.join(list(outcome['errors']) + outcome['timed_out'])}")
+            self.last_duration = round(time.monotonic() - started, 3)
+            self.last_refresh_at = time.time()
+            return outcome
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_host(self, host):
+        started = time.monotonic()
+        taken_at = time.time()
+        summary = summarize_disk_usage(fetch_disk_usage(self.settings, host))
+        with self._lock:
+            self._hosts[host] = {
+                'taken_at': taken_at,
+                'duration': round(time.monotonic() - started, 3),
+                'summary': summary
+            }
+        return True
+
+    def hosts(self):
+        """
+        Latest summary per host, with its age and any error from the last refresh
+
+        Returns:
+            dict: host name -> {'taken_at', 'age', 'duration', 'error', 'summary'}
+        """
+        now = time.time()
+        with self._lock:
+            names = list(dict.fromkeys(list(self._hosts) + list(self._errors)))
+            return {
+                host: {
+                    'taken_at': self._hosts.get(host, {}).get('taken_at'),
+                    'age': round(now - self._hosts[host]['taken_at'], 1) if host in self._hosts else None,
+                    'duration': self._hosts.get(host, {}).get('duration'),
+                    'error': (self._errors.get(host) or {}).get('error'),
+                    'summary': self._hosts.get(host, {}).get('summary')
+                }
+                for host in names
+            }
+
+    def get_status(self):
+        """
+        Get inventory health information
+
+        Returns:
+            dict: Running state, refresh timing and failure counters
+        """
+        with self._lock:
+            errors = dict(self._errors)
+            cached = len(self._hosts)
+        return {
+            'running': self.is_running(),
+            'interval': self.interval,
+            'hosts_cached': cached,
+            'runs': self.runs,
+            'failures': self.failures,
+            'refreshing': self._refresh_lock.locked(),
+            'last_duration': self.last_duration,
+            'last_refresh_at': self.last_refresh_at,
+            'errors': errors
+        }
+
+def start_inventory(settings=None):
+    """
+    Start the shared disk usage inventory if it isn't running yet
+
+    Returns:
+        DiskUsageInventory: The shared inventory
+    """
+    global _inventory
+
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = DiskUsageInventory(settings)
+        _inventory.start()
+        return _inventory
+
+def get_inventory():
+    """Return the shared inventory, or None if it was never started"""
+    return _inventory
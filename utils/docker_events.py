@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from utils import docker
+
+# Event-driven container table configuration
+DOCKER_EVENTS_ENABLED = os.environ.get("DOCKER_EVENTS_ENABLED", "false").lower() == "true"
+DOCKER_EVENTS_RESYNC = float(os.environ.get("DOCKER_EVENTS_RESYNC", 300))
+DOCKER_EVENTS_RETRY = float(os.environ.get("DOCKER_EVENTS_RETRY", 5))
+
+# Container actions that change what /containers/json reports
+STATE_ACTIONS = {
+    'create', 'start', 'restart', 'stop', 'die', 'kill', 'pause', 'unpause',
+    'rename', 'update', 'oom', 'health_status'
+}
+
+# Host name -> ContainerWatcher, one per Docker host
+_watchers = {}
+_watcher_lock = threading.Lock()
+
+class ContainerWatcher:
+    """
+    In-memory container table kept current by Docker's /events stream
+
+    A full /containers/json resync seeds the table; container events then
+    refresh or drop single entries. The events request is opened with an
+    `until` one resync interval ahead, so the daemon ends the stream on
+    schedule and the loop resyncs before resubscribing from where it left off.
+    """
+
+    def __init__(self, settings=None, host=None, resync_interval=DOCKER_EVENTS_RESYNC,
+                 retry_interval=DOCKER_EVENTS_RETRY):
+        self.settings = settings
+        self.host = host or docker.get_host_names()[0]
+        self.resync_interval = resync_interval
+        self.retry_interval = retry_interval
+        self._containers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.connected = False
+        self.version = 0
+        self.synced_at = None
+        self.updated_at = None
+        self.last_event_at = None
+        self.events = 0
+        self.resyncs = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_error_at = None
+
+    def start(self):
+        """Start the watcher thread (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"docker-events-{self.host}", daemon=True)
+        self._thread.start()
+        logging.info(f"Docker event watcher for '{self.host}' started (resync every {self.resync_interval}s)")
+
+    def stop(self):
+        """
+        Stop the watcher thread
+
+        The thread notices at the next event or when the current stream ends.
+        """
+        self._stop.set()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_current(self):
+        """True while the table is seeded and the events stream is attached"""
+        return self.is_running() and self.connected and self.synced_at is not None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                since = self.resync()
+                self._follow(since, time.time() + self.resync_interval)
+            except Exception as e:
+                self.connected = False
+                self.failures += 1
+                self.last_error = str(e)
+                self.last_error_at = time.time()
+                logging.error(f"Docker event watcher for '{self.host}' error: {str(e)}")
+                self._stop.wait(self.retry_interval)
+
+    def resync(self):
+        """
+        Replace the table with a full /containers/json listing
+
+        Returns:
+            int: Unix time to resume the events stream from
+        """
+        # Start the next subscription slightly before the listing so no event is missed
+        since = int(time.time()) - 1
+        containers = docker.fetch_containers(self.settings, all_containers=True, host=self.host)
+        with self._lock:
+            self._containers = {c['Id']: c for c in containers}
+            self.version += 1
+            self.synced_at = self.updated_at = time.time()
+        self.resyncs += 1
+        return since
+
+    def _follow(self, since, until):
+        filters = json.dumps({'type': ['container']})
+        response = docker.docker_request(
+            self.settings,
+            "GET",
+            "/events",
+            # The daemon closes the stream at `until`; allow some slack before giving up
+            timeout=self.resync_interval + 30,
+            host=self.host,
+            params={'since': since, 'until': int(until), 'filters': filters},
+            stream=True
+        )
+        self.connected = True
+        try:
+            for line in response.iter_lines():
+                if self._stop.is_set():
+                    break
+                if line:
+                    self.apply_event(json.loads(line))
+        finally:
+            self.connected = False
+            response.close()
+
+    def apply_event(self, event):
+        """
+        Update the table for one container event
+
+        Args:
+            event: Decoded event from the /events stream
+        """
+        action = (event.get('Action') or event.get('status') or '').split(':')[0]
+        container_id = (event.get('Actor') or {}).get('ID') or event.get('id')
+        self.events += 1
+        self.last_event_at = time.time()
+        if not container_id:
+            return
+
+        if action == 'destroy':
+            with self._lock:
+                if self._containers.pop(container_id, None) is not None:
+                    self.version += 1
+                    self.updated_at = time.time()
+        elif action in STATE_ACTIONS:
+            self.refresh_container(container_id)
+
+    def refresh_container(self, container_id):
+        """Re-read a single container from the daemon and update its entry"""
+        containers = docker.fetch_containers(
+            self.settings, all_containers=True, filters={'id': [container_id]}, host=self.host
+        )
+        with self._lock:
+            found = [c for c in containers if c['Id'] == container_id]
+            if found:
+                self._containers[container_id] = found[0]
+            else:
+                self._containers.pop(container_id, None)
+            self.version += 1
+            self.updated_at = time.time()
+
+    def containers(self, all_containers=True):
+        """
+        Current container list, as get_containers would return it
+
+        Args:
+            all_containers: Whether to include stopped containers
+        """
+        with self._lock:
+            containers = list(self._containers.values())
+        if not all_containers:
+            containers = [c for c in containers if c.get('State') == 'running']
+        return containers
+
+    def get_status(self):
+        """
+        Get watcher health information
+
+        Returns:
+            dict: Connection state, table size and event counters
+        """
+        return {
+            'host': self.host,
+            'running': self.is_running(),
+            'connected': self.connected,
+            'current': self.is_current(),
+            'containers': len(self._containers),
+            'version': self.version,
+            'resync_interval': self.resync_interval,
+            'synced_at': self.synced_at,
+            'updated_at': self.updated_at,
+            'last_event_at': self.last_event_at,
+            'events': self.events,
+            'resyncs': self.resyncs,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_error_at': self.last_error_at
+        }
+
+def start_watcher(settings=None):
+    """
+    Start a watcher for every Docker host that doesn't have one running yet
+
+    Returns:
+        dict: Host name -> ContainerWatcher
+    """
+    with _watcher_lock:
+        for host in docker.get_host_names():
+            if host not in _watchers:
+                _watchers[host] = ContainerWatcher(settings, host)
+            _watchers[host].start()
+        return dict(_watchers)
+
+def get_watchers():
+    """Return the running watchers by host (empty if never started)"""
+    with _watcher_lock:
+        return dict(_watchers)
+
+def get_current_containers(all_containers=True):
+    """
+    Container list from memory if every host's watcher is attached and seeded
+
+    Returns:
+        list or None: None means callers should query Docker directly
+    """
+    watchers = get_watchers()
+    if not watchers or not all(w.is_current() for w in watchers.values()):
+        return None
+    containers = []
+    for host in docker.get_host_names():
+        watcher = watchers.get(host)
+        if watcher is None:
+            return None
+        containers.extend(watcher.containers(all_containers))
+    return containers
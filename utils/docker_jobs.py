@@ -0,0 +1,170 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import docker, docker_events
+
+# Bulk container action configuration
+DOCKER_BULK_CONCURRENCY = int(os.environ.get("DOCKER_BULK_CONCURRENCY", 4))
+DOCKER_JOBS_HISTORY = int(os.environ.get("DOCKER_JOBS_HISTORY", 50))
+
+ACTIONS = {
+    'start': docker.start_container,
+    'stop': docker.stop_container,
+    'restart': docker.restart_container
+}
+
+class BulkJob:
+    """One bulk action over a set of containers, with per-container progress"""
+
+    def __init__(self, action, targets, concurrency):
+        self.id = uuid.uuid4().hex[:12]
+        self.action = action
+        self.concurrency = concurrency
+        self.state = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        # container_id -> progress entry, in request order
+        self.targets = OrderedDict(
+            (cid, {'id': cid, 'name': name, 'host': host, 'state': 'pending', 'error': None,
+                   'started_at': None, 'finished_at': None})
+            for cid, name, host in targets
+        )
+
+    def _update(self, container_id, **fields):
+        with self._lock:
+            self.targets[container_id].update(fields)
+
+    def run(self, settings):
+        """Run the action on every target with at most `concurrency` in flight"""
+        self.state = 'running'
+        self.started_at = time.time()
+        fn = ACTIONS[self.action]
+
+        def act(container_id):
+            self._update(container_id, state='running', started_at=time.time())
+            try:
+                fn(settings, container_id, self.targets[container_id]['host'])
+            except Exception as e:
+                self._update(container_id, state='failed', error=str(e), finished_at=time.time())
+            else:
+                self._update(container_id, state='done', finished_at=time.time())
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(self.targets))),
+                                thread_name_prefix=f"docker-bulk-{self.id}") as executor:
+            list(executor.map(act, list(self.targets)))
+
+        failed = sum(1 for t in self.targets.values() if t['state'] == 'failed')
+        self.state = 'completed' if not failed else ('failed' if failed == len(self.targets) else 'partial')
+        self.finished_at = time.time()
+        logging.info(f"Bulk {self.action} job {self.id} finished: {self.state}")
+
+    def to_dict(self):
+        with self._lock:
+            targets = [dict(t) for t in self.targets.values()]
+        counts = {}
+        for t in targets:
+            counts[t['state']] = counts.get(t['state'], 0) + 1
+        return {
+            'id': self.id,
+            'action': self.action,
+            'state': self.state,
+            'concurrency': self.concurrency,
+            'total': len(targets),
+            'counts': counts,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'containers': targets
+        }
+
+class JobRegistry:
+    """Runs bulk jobs in the background and keeps the most recent ones for status queries"""
+
+    def __init__(self, history=DOCKER_JOBS_HISTORY):
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, settings, action, targets, concurrency=None):
+        """
+        Start a bulk job and return immediately
+
+        Args:
+            settings: UserSettings object with Docker config
+            action: "start", "stop" or "restart"
+            targets: list of (container_id, name, host) tuples
+            concurrency: Maximum actions in flight
+
+        Returns:
+            BulkJob: The queued job
+        """
+        job = BulkJob(action, targets, concurrency or DOCKER_BULK_CONCURRENCY)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Drop the oldest finished jobs beyond the history limit
+            for job_id in list(self._jobs):
+                if len(self._jobs) <= self.history:
+                    break
+                if self._jobs[job_id].finished_at is not None:
+                    del self._jobs[job_id]
+
+        threading.Thread(target=self._run, args=(job, settings),
+                         name=f"docker-job-{job.id}", daemon=True).start()
+        return job
+
+    def _run(self, job, settings):
+        try:
+            job.run(settings)
+        except Exception as e:
+            job.state = 'failed'
+            job.finished_at = time.time()
+            logging.error(f"Bulk job {job.id} crashed: {str(e)}")
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """Summaries of retained jobs, newest first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [{k: v for k, v in job.to_dict().items() if k != 'containers'}
+                for job in reversed(jobs)]
+
+def resolve_targets(settings, ids=None, label=None):
+    """
+    Turn a list of IDs or a label selector into (container_id, name, host) targets
+
+    Args:
+        settings: UserSettings object with Docker config
+        ids: Optional list of container IDs (or names)
+        label: Optional label selector, "key" or "key=value"
+
+    Returns:
+        list: (container_id, name, host) tuples; host is None when it is
+            left for the action to look up
+
+    Raises:
+        ValueError: If ids is not a list of non-empty strings
+    """
+    if ids is not None and (not isinstance(ids, list)
+                            or not all(isinstance(cid, str) and cid for cid in ids)):
+        # A bare string would otherwise become one target per character
+        raise ValueError("'ids' must be a list of container IDs or names")
+    if label:
+        containers = docker.fetch_fleet_containers(settings, all_containers=True, filters={'label': [label]})
+        return [(c['Id'], c.get('Name'), c.get('Host')) for c in containers]
+    # Names and hosts are only known for free when the event-driven table is current
+    known = {c['Id']: c for c in docker_events.get_current_containers() or []}
+    return [(cid, known.get(cid, {}).get('Name'), known.get(cid, {}).get('Host'))
+            for cid in dict.fromkeys(ids or [])]
+
+# Shared registry for /api/docker/bulk
+jobs = JobRegistry()
@@ -0,0 +1,203 @@
+import os
+import struct
+import logging
+import threading
+import requests
+
+from utils import docker
+
+# Log tail limits
+DOCKER_LOGS_DEFAULT_TAIL = int(os.environ.get("DOCKER_LOGS_DEFAULT_TAIL", 200))
+DOCKER_LOGS_MAX_TAIL = int(os.environ.get("DOCKER_LOGS_MAX_TAIL", 5000))
+DOCKER_LOGS_MAX_LINE = int(os.environ.get("DOCKER_LOGS_MAX_LINE", 16384))
+# A follow stream with no output for this long is ended; the client reconnects
+DOCKER_LOGS_IDLE_TIMEOUT = float(os.environ.get("DOCKER_LOGS_IDLE_TIMEOUT", 60))
+# Each open stream holds a server thread (gunicorn runs 8), so leave room for other requests
+DOCKER_LOGS_MAX_STREAMS = int(os.environ.get("DOCKER_LOGS_MAX_STREAMS", 4))
+
+STREAM_NAMES = {0: 'stdin', 1: 'stdout', 2: 'stderr'}
+HEADER = struct.Struct('>BxxxL')
+
+_stream_slots = threading.BoundedSemaphore(DOCKER_LOGS_MAX_STREAMS)
+
+class StreamLimitError(Exception):
+    """Raised instead of opening a log stream when DOCKER_LOGS_MAX_STREAMS are already open"""
+
+class LogDemuxer:
+    """
+    Incremental parser for Docker's multiplexed log stream
+
+    Non-TTY containers prefix every frame with an 8-byte header: stream type
+    (1 = stdout, 2 = stderr), three padding bytes and a big-endian payload
+    length. Frames can be split across reads, so input is buffered until a
+    whole frame is available. TTY containers send raw bytes, reported as stdout.
+    """
+
+    def __init__(self, tty=False):
+        self.tty = tty
+        self._buffer = b''
+
+    def feed(self, data):
+        """
+        Add raw bytes and return the complete frames they finish
+
+        Returns:
+            list: (stream name, payload bytes) tuples
+        """
+        if self.tty:
+            return [('stdout', data)] if data else []
+
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= HEADER.size:
+            stream_type, length = HEADER.unpack_from(self._buffer)
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            frames.append((STREAM_NAMES.get(stream_type, 'stdout'), self._buffer[HEADER.size:end]))
+            self._buffer = self._buffer[end:]
+        return frames
+
+class LineSplitter:
+    """
+    Turns frame payloads into complete lines, per stream
+
+    A partial line is held until its newline arrives; one longer than
+    max_line is emitted early so a runaway writer can't grow the buffer.
+    """
+
+    def __init__(self, max_line=DOCKER_LOGS_MAX_LINE):
+        self.max_line = max_line
+        self._partial = {}
+
+    def feed(self, stream, payload):
+        """
+        Returns:
+            list: (stream name, line str) tuples
+        """
+        data = self._partial.pop(stream, b'') + payload
+        *lines, rest = data.split(b'\n')
+        while len(rest) > self.max_line:
+            lines.append(rest[:self.max_line])
+            rest = rest[self.max_line:]
+        if rest:
+            self._partial[stream] = rest
+        return [(stream, line.rstrip(b'\r').decode('utf-8', errors='replace')) for line in lines]
+
+    def flush(self):
+        """Emit whatever partial lines are left when the stream ends"""
+        lines = [(stream, rest.decode('utf-8', errors='replace'))
+                 for stream, rest in self._partial.items()]
+        self._partial = {}
+        return lines
+
+class LogStream:
+    """
+    Iterator over a container's log lines that owns the Docker response
+
+    close() releases the connection and the stream slot even if iteration
+    never started, where a generator's finally block would never run. It is
+    safe to call more than once.
+    """
+
+    def __init__(self, response, lines):
+        self._response = response
+        self._lines = lines
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self._lines
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._lines.close()
+        self._response.close()
+        _stream_slots.release()
+
+def is_tty(settings, container_id, host=None):
+    """Whether the container was started with a TTY (logs are then not multiplexed)"""
+    response = docker.docker_request(
+        settings, "GET", f"/containers/{container_id}/json", timeout=5, host=host
+    )
+    return bool((response.json().get('Config') or {}).get('Tty'))
+
+def follow_logs(settings, container_id, host=None, follow=True, tail=None,
+                streams=('stdout', 'stderr'), pattern=None, timestamps=False):
+    """
+    Open a container's log stream and return an iterator over its lines
+
+    The request is made up front so a missing container or unreachable
+    host raises here, before any response has been started. The returned
+    stream buffers nothing beyond the current frame and a partial line,
+    and Docker is only read as fast as the consumer pulls, so a slow
+    browser applies backpressure all the way to the daemon socket. At most
+    DOCKER_LOGS_MAX_STREAMS streams are open at once; closing one frees
+    its slot.
+
+    Args:
+        settings: UserSettings object with Docker config
+        container_id: Container ID or name
+        host: Optional fleet host name (looked up from the ID if omitted)
+        follow: Keep streaming new output after the backlog
+        tail: Number of backlog lines (capped at DOCKER_LOGS_MAX_TAIL)
+        streams: Which of stdout/stderr to include
+        pattern: Optional compiled regex; only matching lines are yielded
+        timestamps: Ask Docker to prefix lines with RFC3339 timestamps
+
+    Returns:
+        LogStream: (stream name, line) tuples; must be closed
+
+    Raises:
+        StreamLimitError: If DOCKER_LOGS_MAX_STREAMS streams are already open
+        requests.exceptions.RequestException: If the logs can't be opened
+    """
+    if not _stream_slots.acquire(blocking=False):
+        raise StreamLimitError(f"Too many open log streams (limit {DOCKER_LOGS_MAX_STREAMS})")
+    try:
+        host = host or docker.resolve_host(settings, container_id)
+        tail = DOCKER_LOGS_DEFAULT_TAIL if tail is None else max(0, min(tail, DOCKER_LOGS_MAX_TAIL))
+
+        demuxer = LogDemuxer(is_tty(settings, container_id, host))
+        splitter = LineSplitter()
+        response = docker.docker_request(
+            settings,
+            "GET",
+            f"/containers/{container_id}/logs",
+            timeout=DOCKER_LOGS_IDLE_TIMEOUT,
+            host=host,
+            params={
+                'follow': '1' if follow else '0',
+                'tail': str(tail),
+                'stdout': '1' if 'stdout' in streams else '0',
+                'stderr': '1' if 'stderr' in streams else '0',
+                'timestamps': '1' if timestamps else '0'
+            },
+            stream=True
+        )
+    except Exception:
+        _stream_slots.release()
+        raise
+
+    return LogStream(response, _iter_lines(response, demuxer, splitter, pattern, container_id))
+
+def _iter_lines(response, demuxer, splitter, pattern, container_id):
+    def matching(lines):
+        for stream, line in lines:
+            if pattern is None or pattern.search(line):
+                yield stream, line
+
+    try:
+        try:
+            for chunk in response.iter_content(chunk_size=None):
+                for stream, payload in demuxer.feed(chunk):
+                    yield from matching(splitter.feed(stream, payload))
+        except requests.exceptions.ConnectionError as e:
+            # The idle read timeout surfaces here mid-stream; end cleanly
+            logging.info(f"Log stream for {container_id[:12]} ended: {str(e)}")
+        yield from matching(splitter.flush())
+    finally:
+        response.close()
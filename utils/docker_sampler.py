@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+from utils import docker, docker_events
+
+# Streaming stats sampler configuration
+DOCKER_SAMPLER_ENABLED = os.environ.get("DOCKER_SAMPLER_ENABLED", "false").lower() == "true"
+DOCKER_SAMPLER_WINDOW = float(os.environ.get("DOCKER_SAMPLER_WINDOW", 300))
+DOCKER_SAMPLER_RECONCILE = float(os.environ.get("DOCKER_SAMPLER_RECONCILE", 10))
+DOCKER_SAMPLER_MAX_STREAMS = int(os.environ.get("DOCKER_SAMPLER_MAX_STREAMS", 64))
+
+# Averaging windows reported per metric, in seconds
+SUMMARY_WINDOWS = {'1m': 60, '5m': 300}
+
+METRICS = (
+    'cpu_percent', 'memory_usage', 'memory_percent',
+    'net_rx_rate', 'net_tx_rate', 'blk_read_rate', 'blk_write_rate'
+)
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def io_counters(stats):
+    """
+    Sum network and block I/O byte counters from a raw stats sample
+
+    Returns:
+        tuple: (rx_bytes, tx_bytes, blk_read_bytes, blk_write_bytes)
+    """
+    rx = tx = 0
+    for counters in (stats.get('networks') or {}).values():
+        rx += counters.get('rx_bytes', 0)
+        tx += counters.get('tx_bytes', 0)
+
+    blk_read = blk_write = 0
+    for entry in (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+        op = (entry.get('op') or '').lower()
+        if op == 'read':
+            blk_read += entry.get('value', 0)
+        elif op == 'write':
+            blk_write += entry.get('value', 0)
+    return rx, tx, blk_read, blk_write
+
+class ContainerWindow:
+    """Fixed-span rolling window of derived samples for one container"""
+
+    def __init__(self, container_id, span=DOCKER_SAMPLER_WINDOW):
+        self.container_id = container_id
+        self.span = span
+        # (monotonic time, {metric: value})
+        self._samples = deque()
+        self._lock = threading.Lock()
+        self._last_counters = None
+        self.started_at = time.time()
+        self.last_sample_at = None
+
+    def reset(self):
+        """Forget the previous counters so a reconnect doesn't compute a rate across the gap"""
+        self._last_counters = None
+
+    def add(self, stats, now=None):
+        """
+        Derive metrics from one streamed sample and append them
+
+        The first sample of a stream has no precpu_stats or previous counters
+        to diff against, so it only primes the window.
+        """
+        now = time.monotonic() if now is None else now
+        counters = io_counters(stats)
+        previous, self._last_counters = self._last_counters, (now, counters)
+        if previous is None or not (stats.get('precpu_stats') or {}).get('system_cpu_usage'):
+            return
+
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return
+        # Counters reset when a container restarts; clamp so rates never go negative
+        rates = [max(0, new - old) / elapsed for new, old in zip(counters, previous[1])]
+
+        summary = docker.summarize_stats(self.container_id, stats)
+        sample = {
+            'cpu_percent': summary['cpu_percent'],
+            'memory_usage': summary['memory_usage'],
+            'memory_percent': summary['memory_percent'],
+            'net_rx_rate': rates[0],
+            'net_tx_rate': rates[1],
+            'blk_read_rate': rates[2],
+            'blk_write_rate': rates[3]
+        }
+        with self._lock:
+            self._samples.append((now, sample))
+            while self._samples and now - self._samples[0][0] > self.span:
+                self._samples.popleft()
+        self.last_sample_at = time.time()
+
+    def summary(self, now=None):
+        """
+        Latest values plus average and peak per summary window
+
+        Returns:
+            dict: {'current': {...}, 'avg_1m': {...}, 'peak_1m': {...}, ...}
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            samples = list(self._samples)
+
+        result = {
+            'id': self.container_id,
+            'samples': len(samples),
+            'last_sample_at': self.last_sample_at,
+            'current': {m: round(v, 2) for m, v in samples[-1][1].items()} if samples else None
+        }
+        for label, seconds in SUMMARY_WINDOWS.items():
+            recent = [s for t, s in samples if now - t <= seconds]
+            if not recent:
+                result[f'avg_{label}'] = result[f'peak_{label}'] = None
+                continue
+            result[f'avg_{label}'] = {
+                m: round(sum(s[m] for s in recent) / len(recent), 2) for m in METRICS
+            }
+            result[f'peak_{label}'] = {m: round(max(s[m] for s in recent), 2) for m in METRICS}
+        return result
+
+class StatsSampler:
+    """
+    Keeps a stats?stream=true connection open per running container
+
+    Docker pushes roughly one sample per second on each stream; samples are
+    folded into a per-container rolling window so averages and peaks can be
+    served from memory without per-request sampling delay. A reconcile loop
+    opens streams for new containers and drops windows for stopped ones.
+
+    Streams hold their connection for as long as the container runs, so they
+    go through the sampler's own client per host, sized to max_streams,
+    rather than tying up the shared client's pool used by normal API calls.
+    """
+
+    def __init__(self, settings=None, window=DOCKER_SAMPLER_WINDOW,
+                 reconcile_interval=DOCKER_SAMPLER_RECONCILE,
+                 max_streams=DOCKER_SAMPLER_MAX_STREAMS):
+        self.settings = settings
+        self.window = window
+        self.reconcile_interval = reconcile_interval
+        self.max_streams = max_streams
+        self._windows = {}
+        # container_id -> (thread, stop event, holder for the open response)
+        self._streams = {}
+        # base_url -> DockerClient reserved for stats streams
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.reconciles = 0
+        self.stream_errors = 0
+        self.skipped = 0
+        self.last_error = None
+        self.last_error_at = None
+
+    def start(self):
+        """Start the reconcile thread (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-sampler", daemon=True)
+        self._thread.start()
+        logging.info(f"Docker stats sampler started (window {self.window}s)")
+
+    def stop(self):
+        """Stop the reconcile thread and close every stream"""
+        self._stop.set()
+        with self._lock:
+            ids = list(self._streams)
+        for container_id in ids:
+            self._close_stream(container_id)
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                self.last_error = str(e)
+                self.last_error_at = time.time()
+                logging.error(f"Docker stats sampler reconcile failed: {str(e)}")
+            self._stop.wait(self.reconcile_interval)
+
+    def reconcile(self, running=None):
+        """
+        Open streams for running containers and close the rest
+
+        Args:
+            running: Optional running container dicts (with 'Id' and 'Host');
+                listed from Docker if omitted
+        """
+        if running is None:
+            running = docker_events.get_current_containers(all_containers=False)
+            if running is None:
+                running = docker.fetch_fleet_containers(self.settings, all_containers=False)
+        self.reconciles += 1
+
+        hosts = {c['Id']: c.get('Host') for c in running[:self.max_streams]}
+        wanted = set(hosts)
+        self.skipped = max(0, len(running) - self.max_streams)
+
+        with self._lock:
+            current = set(self._streams)
+            # Restart streams whose thread ended (daemon hiccup, container restart)
+            dead = {cid for cid in current if not self._streams[cid][0].is_alive()}
+        for container_id in (current - wanted) | dead:
+            self._close_stream(container_id)
+        with self._lock:
+            for container_id in current - wanted:
+                self._windows.pop(container_id, None)
+        for container_id in (wanted - current) | (dead & wanted):
+            self._open_stream(container_id, hosts[container_id])
+
+    def _client(self, host):
+        base_url = docker.get_docker_url(self.settings, host)
+        with self._lock:
+            client = self._clients.get(base_url)
+            if client is None:
+                client = self._clients[base_url] = docker.DockerClient(
+                    base_url, pool_maxsize=self.max_streams
+                )
+            return client
+
+    def _open_stream(self, container_id, host=None):
+        stop = threading.Event()
+        holder = {}
+        thread = threading.Thread(
+            target=self._follow, args=(container_id, host, stop, holder),
+            name=f"docker-stats-{container_id[:12]}", daemon=True
+        )
+        with self._lock:
+            self._windows.setdefault(container_id, ContainerWindow(container_id, self.window))
+            self._streams[container_id] = (thread, stop, holder)
+        thread.start()
+
+    def _close_stream(self, container_id):
+        with self._lock:
+            entry = self._streams.pop(container_id, None)
+        if entry is None:
+            return
+        _, stop, holder = entry
+        stop.set()
+        response = holder.get('response')
+        if response is not None:
+            # Unblocks the reader thread mid-read
+            response.close()
+
+    def _follow(self, container_id, host, stop, holder):
+        with self._lock:
+            window = self._windows.get(container_id)
+        if window is None:
+            return
+        try:
+            response = self._client(host).request(
+                "GET",
+                f"/containers/{container_id}/stats",
+                timeout=30,
+                params={'stream': 'true'},
+                stream=True
+            )
+            holder['response'] = response
+            if stop.is_set():
+                # Closed while the request was still being opened
+                return
+            window.reset()
+            for line in response.iter_lines():
+                if stop.is_set():
+                    break
+                if line:
+                    window.add(json.loads(line))
+        except Exception as e:
+            if not stop.is_set():
+                self.stream_errors += 1
+                self.last_error = f"{container_id[:12]}: {str(e)}"
+                self.last_error_at = time.time()
+                logging.warning(f"Docker stats stream for {container_id[:12]} ended: {str(e)}")
+        finally:
+            response = holder.get('response')
+            if response is not None:
+                response.close()
+
+    def summaries(self, container_ids=None):
+        """
+        Rolling summaries for sampled containers
+
+        Args:
+            container_ids: Optional subset of IDs
+
+        Returns:
+            dict: container_id -> summary
+        """
+        with self._lock:
+            windows = dict(self._windows)
+        if container_ids is not None:
+            windows = {cid: w for cid, w in windows.items() if cid in container_ids}
+        now = time.monotonic()
+        return {cid: window.summary(now) for cid, window in windows.items()}
+
+    def get_status(self):
+        """
+        Get sampler health information
+
+        Returns:
+            dict: Stream counts and error counters
+        """
+        with self._lock:
+            streams = len(self._streams)
+            alive = sum(1 for thread, _, _ in self._streams.values() if thread.is_alive())
+        return {
+            'running': self.is_running(),
+            'window': self.window,
+            'reconcile_interval': self.reconcile_interval,
+            'max_streams': self.max_streams,
+            'streams': streams,
+            'streams_alive': alive,
+            'skipped': self.skipped,
+            'reconciles': self.reconciles,
+            'stream_errors': self.stream_errors,
+            'last_error': self.last_error,
+            'last_error_at': self.last_error_at
+        }
+
+def start_sampler(settings=None):
+    """
+    Start the shared stats sampler if it isn't running yet
+
+    Returns:
+        StatsSampler: The shared sampler
+    """
+    global _sampler
+
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StatsSampler(settings)
+        _sampler.start()
+        return _sampler
+
+def get_sampler():
+    """Return the shared sampler, or None if it was never started"""
+    return _sampler
@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+def fan_out(tasks, max_workers, deadline, thread_name_prefix="fanout"):
+    """
+    Run independent calls on a bounded thread pool under one overall deadline
+
+    Calls still running when the deadline expires are reported as timeouts;
+    the caller is never held past the deadline waiting for them.
+
+    Args:
+        tasks: dict of key -> (callable, args tuple)
+        max_workers: Maximum concurrent calls
+        deadline: Overall time budget in seconds
+        thread_name_prefix: Prefix for worker thread names
+
+    Returns:
+        dict: {'results': {key: value}, 'errors': {key: message},
+               'timed_out': [keys], 'elapsed': seconds}
+    """
+    started = time.monotonic()
+    results = {}
+    errors = {}
+    timed_out = []
+
+    if not tasks:
+        return {'results': results, 'errors': errors, 'timed_out': timed_out, 'elapsed': 0}
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(tasks))),
+        thread_name_prefix=thread_name_prefix
+    )
+    try:
+        futures = {
+            executor.submit(fn, *args): key
+            for key, (fn, args) in tasks.items()
+        }
+
+        done, not_done = wait(futures, timeout=deadline)
+
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+
+        for future in not_done:
+            key = futures[future]
+            future.cancel()
+            errors[key] = f"Timed out after {deadline}s"
+            timed_out.append(key)
+    finally:
+        # Don't hold the caller past the deadline for calls still in flight
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        'results': results,
+        'errors': errors,
+        'timed_out': timed_out,
+        'elapsed': round(time.monotonic() - started, 3)
+    }
@@ -2,18 +2,112 @@ import requests
 import logging
 import json
 import os
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from utils.cache import TTLCache
+from utils.fanout import fan_out
+from utils.upstream import get_breaker
 from urllib3.exceptions import InsecureRequestWarning
 import urllib3
 
 # Suppress only the single warning from urllib3 needed.
 urllib3.disable_warnings(InsecureRequestWarning)
 
-def get_proxmox_connection(settings=None):
+# Connection pool and timeout tuning for the shared Proxmox client
+PROXMOX_POOL_CONNECTIONS = int(os.environ.get("PROXMOX_POOL_CONNECTIONS", 4))
+PROXMOX_POOL_MAXSIZE = int(os.environ.get("PROXMOX_POOL_MAXSIZE", 16))
+PROXMOX_CONNECT_TIMEOUT = float(os.environ.get("PROXMOX_CONNECT_TIMEOUT", 3.05))
+PROXMOX_READ_TIMEOUT = float(os.environ.get("PROXMOX_READ_TIMEOUT", 10))
+
+# Bounded fan-out for per-node requests
+PROXMOX_FANOUT_WORKERS = int(os.environ.get("PROXMOX_FANOUT_WORKERS", 8))
+PROXMOX_FANOUT_DEADLINE = float(os.environ.get("PROXMOX_FANOUT_DEADLINE", 15))
+
+# How long /nodes and /cluster/resources results are reused, in seconds
+PROXMOX_CACHE_TTL = float(os.environ.get("PROXMOX_CACHE_TTL", 10))
+
+# Multi-cluster federation: JSON list of
+# {"name", "host", "user", "token_name", "token_value"} objects. When unset,
+# the single cluster from PROXMOX_HOST is used under PROXMOX_CLUSTER_NAME.
+PROXMOX_CLUSTER_NAME = os.environ.get("PROXMOX_CLUSTER_NAME", "default")
+PROXMOX_CLUSTER_DEADLINE = float(os.environ.get("PROXMOX_CLUSTER_DEADLINE", 8))
+
+_clients = {}
+_client_lock = threading.Lock()
+
+_cluster_status = {}
+_cluster_status_lock = threading.Lock()
+
+_cache = TTLCache("proxmox", PROXMOX_CACHE_TTL)
+
+def get_cluster_configs():
+    """
+    Parse the PROXMOX_CLUSTERS federation config
+    
+    Returns:
+        dict: Cluster name -> config dict, empty when federation is not configured
+    """
+    raw = os.environ.get("PROXMOX_CLUSTERS")
+    if not raw:
+        return {}
+    try:
+        clusters = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid PROXMOX_CLUSTERS JSON: {str(e)}")
+    configs = {}
+    for entry in clusters:
+        if not entry.get('name') or not entry.get('host'):
+            raise ValueError("Each PROXMOX_CLUSTERS entry needs a name and host")
+        configs[entry['name']] = entry
+    return configs
+
+def is_federated():
+    """Whether more than the single PROXMOX_HOST cluster is configured"""
+    return bool(os.environ.get("PROXMOX_CLUSTERS"))
+
+def get_cluster_names():
+    """
+    Names of every configured cluster
+    
+    Returns:
+        list: Cluster names (just PROXMOX_CLUSTER_NAME when not federated)
+    """
+    configs = get_cluster_configs()
+    return list(configs) if configs else [PROXMOX_CLUSTER_NAME]
+
+def build_connection(host, user, token_name, token_value, verify_ssl=False):
+    """
+    Build the base URL and auth headers for one Proxmox endpoint
+    
+    Returns:
+        tuple: (base_url, headers, verify_ssl)
+    """
+    base_url = host
+    if not base_url.startswith('http'):
+        base_url = f"https://{base_url}"
+    if not base_url.endswith('/api2/json'):
+        if not base_url.endswith('/'):
+            base_url = f"{base_url}/"
+        base_url = f"{base_url}api2/json"
+    
+    # API token format is USER@REALM!TOKENNAME=TOKENVALUE
+    token_id = f"{user}!{token_name}"
+    
+    # Set up API headers
+    headers = {
+        'Authorization': f'PVEAPIToken={token_id}={token_value}'
+    }
+    
+    return (base_url, headers, verify_ssl)
+
+def get_proxmox_connection(settings=None, cluster=None):
     """
     Establish a connection to the Proxmox API using hardcoded values
     
     Args:
         settings: Ignored - maintained for backward compatibility
+        cluster: Optional cluster name from PROXMOX_CLUSTERS
         
     Returns:
         tuple: (base_url, headers, verify_ssl)
@@ -23,6 +117,20 @@ def get_proxmox_connection(settings=None):
     if os.environ.get("REPLIT_DB_URL"):
         # This is a development environment (Replit), return mock values
         return ("https://example.com/api2/json", {"Authorization": "PVEAPIToken=mock:token"}, False)
+    
+    configs = get_cluster_configs()
+    if configs:
+        config = configs.get(cluster) if cluster else next(iter(configs.values()))
+        if config is None:
+            raise ValueError(f"Unknown Proxmox cluster: {cluster}")
+        return build_connection(
+            config['host'],
+            config.get('user'),
+            config.get('token_name'),
+            config.get('token_value'),
+            bool(config.get('verify_ssl', False))
+        )
+    
     # Hardcoded Proxmox credentials
     proxmox_host = os.environ.get("PROXMOX_HOST")
     proxmox_user = os.environ.get("PROXMOX_USER")
@@ -42,27 +150,176 @@ def get_proxmox_connection(settings=None):
             proxmox_token_value = "dev-value"
         else:
             raise ValueError("Proxmox host not configured")
+    
+    # For now, disable SSL verification (not recommended for production)
+    return build_connection(proxmox_host, proxmox_user, proxmox_token_name, proxmox_token_value, False)
+
+class ProxmoxClient:
+    """
+    Thin wrapper around a pooled, keep-alive requests.Session for the Proxmox API
+
+    The session keeps TCP/TLS connections to pveproxy open between calls so
+    dashboard refreshes don't pay a fresh handshake on every request. Calls
+    go through a per-cluster circuit breaker so a dead host fails fast.
+    """
+
+    def __init__(self, base_url, headers, verify_ssl, name=PROXMOX_CLUSTER_NAME,
+                 pool_connections=PROXMOX_POOL_CONNECTIONS,
+                 pool_maxsize=PROXMOX_POOL_MAXSIZE,
+                 connect_timeout=PROXMOX_CONNECT_TIMEOUT,
+                 read_timeout=PROXMOX_READ_TIMEOUT):
+        self.base_url = base_url
+        self.verify_ssl = verify_ssl
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = get_breaker(f"proxmox:{name}")
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.verify = verify_ssl
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Used to detect when the environment has changed underneath us
+        self.config_key = (base_url, tuple(sorted(headers.items())), verify_ssl)
+
+    def get(self, path, params=None, timeout=None):
+        """
+        Perform a GET against the Proxmox API and return the 'data' payload
+
+        Args:
+            path: API path relative to /api2/json (e.g. "nodes")
+            params: Optional query parameters
+            timeout: Optional (connect, read) timeout override
+
+        Returns:
+            The decoded 'data' field of the response (None if absent)
+            
+        Raises:
+            CircuitOpenError: If the cluster has been failing and is in cooldown
+        """
+        return self.breaker.call(self._get, path, params, timeout)
+
+    def _get(self, path, params, timeout):
+        response = self.session.get(
+            f"{self.base_url}/{path.lstrip('/')}",
+            params=params,
+            timeout=timeout or self.timeout
+        )
+        response.raise_for_status()
+        return response.json().get('data')
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+def get_proxmox_client(settings=None, cluster=None):
+    """
+    Get the shared Proxmox client for a cluster, creating it on first use
+    
+    The client is rebuilt if the connection details from the environment
+    change, so updated credentials are picked up without a restart.
+    
+    Args:
+        settings: Ignored - maintained for backward compatibility
+        cluster: Optional cluster name (defaults to the first/only cluster)
         
-    base_url = proxmox_host
-    if not base_url.startswith('http'):
-        base_url = f"https://{base_url}"
-    if not base_url.endswith('/api2/json'):
-        if not base_url.endswith('/'):
-            base_url = f"{base_url}/"
-        base_url = f"{base_url}api2/json"
+    Returns:
+        ProxmoxClient: Shared client instance
+    """
+    base_url, headers, verify_ssl = get_proxmox_connection(settings, cluster)
+    config_key = (base_url, tuple(sorted(headers.items())), verify_ssl)
+    name = cluster or get_cluster_names()[0]
     
-    # API token format is USER@REALM!TOKENNAME=TOKENVALUE
-    token_id = f"{proxmox_user}!{proxmox_token_name}"
+    with _client_lock:
+        client = _clients.get(name)
+        if client is None or client.config_key != config_key:
+            if client is not None:
+                client.close()
+            client = _clients[name] = ProxmoxClient(base_url, headers, verify_ssl, name)
+        return client
+
+def _query_cluster(settings, cluster, path, params):
+    started = time.monotonic()
+    try:
+        entries = get_proxmox_client(settings, cluster).get(path, params=params) or []
+    except Exception as e:
+        _record_cluster_status(cluster, time.monotonic() - started, str(e))
+        raise
+    _record_cluster_status(cluster, time.monotonic() - started, None)
+    return entries
+
+def query_all_clusters(settings, path, params=None):
+    """
+    GET a list endpoint on every cluster concurrently and merge the results
     
-    # Set up API headers
-    headers = {
-        'Authorization': f'PVEAPIToken={token_id}={proxmox_token_value}'
-    }
+    When federated, each entry is tagged with its 'cluster'. A slow or unreachable cluster
+    only costs its own PROXMOX_CLUSTER_DEADLINE and is left out of the
+    merged result; an error is raised only if every cluster fails.
     
-    # For now, disable SSL verification (not recommended for production)
-    verify_ssl = False
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        path: API path such as "cluster/resources"
+        params: Optional query parameters
+        
+    Returns:
+        list: Merged entries from all reachable clusters
+    """
+    names = get_cluster_names()
     
-    return (base_url, headers, verify_ssl)
+    if len(names) == 1:
+        # Nothing to isolate; skip the thread hop
+        results = {names[0]: _query_cluster(settings, names[0], path, params)}
+    else:
+        tasks = {name: (_query_cluster, (settings, name, path, params)) for name in names}
+        outcome = fan_out(tasks, len(tasks), PROXMOX_CLUSTER_DEADLINE, "proxmox-cluster")
+        results = outcome['results']
+        for name in outcome['timed_out']:
+            _record_cluster_status(name, PROXMOX_CLUSTER_DEADLINE, outcome['errors'][name])
+        for name, message in outcome['errors'].items():
+            logging.warning(f"Proxmox cluster '{name}' failed for {path}: {message}")
+        if not results:
+            raise requests.exceptions.RequestException(
+                "; ".join(f"{name}: {message}" for name, message in outcome['errors'].items())
+            )
+    
+    if not is_federated():
+        # Single-cluster payloads keep their plain Proxmox shape
+        return results[names[0]]
+    
+    merged = []
+    for name in names:
+        for entry in results.get(name, []):
+            entry['cluster'] = name
+            merged.append(entry)
+    return merged
+
+def _record_cluster_status(name, elapsed, error):
+    with _cluster_status_lock:
+        _cluster_status[name] = {
+            'ok': error is None,
+            'error': error,
+            'elapsed': round(elapsed, 3),
+            'checked_at': time.time()
+        }
+
+def get_cluster_status():
+    """
+    Last query outcome for each configured cluster
+    
+    Returns:
+        dict: Cluster name -> {'ok', 'error', 'elapsed', 'checked_at'}
+    """
+    with _cluster_status_lock:
+        status = {name: dict(info) for name, info in _cluster_status.items()}
+    for name in get_cluster_names():
+        status.setdefault(name, {'ok': None, 'error': None, 'elapsed': None, 'checked_at': None})
+    return status
 
 def get_mock_nodes():
     """Return mock Proxmox node data for development environment"""
@@ -71,6 +328,23 @@ def get_mock_nodes():
         {"node": "proxmox-2", "status": "online", "cpu": 0.2, "maxcpu": 8, "mem": 4096, "maxmem": 32768, "uptime": 7654321}
     ]
 
+# Keys of a /nodes list entry; cluster/resources node entries carry extras
+# such as cgroup-mode and hastate, and never the ssl_fingerprint
+NODE_LIST_FIELDS = ('node', 'status', 'cpu', 'maxcpu', 'mem', 'maxmem', 'disk', 'maxdisk',
+                    'uptime', 'level', 'id', 'type', 'ssl_fingerprint', 'cluster')
+
+def node_from_resource(resource):
+    """
+    Reshape a cluster/resources node entry into the /nodes list schema
+    
+    Args:
+        resource: cluster/resources entry of type 'node'
+        
+    Returns:
+        dict: Node entry with only the keys /nodes returns
+    """
+    return {key: resource[key] for key in NODE_LIST_FIELDS if key in resource}
+
 def get_nodes(settings):
     """
     Get a list of Proxmox nodes
@@ -95,18 +369,8 @@ def get_nodes(settings):
         return get_mock_nodes()
     
     # Normal production mode
-    base_url, headers, verify_ssl = get_proxmox_connection(settings)
-    
     try:
-        response = requests.get(
-            f"{base_url}/nodes",
-            headers=headers,
-            verify=verify_ssl
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('data', [])
+        return _cache.get_or_load(("nodes",), lambda: query_all_clusters(settings, "nodes"))
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error connecting to Proxmox API: {str(e)}")
@@ -140,13 +404,15 @@ def get_mock_resources(resource_type=None):
             {"type": "lxc", "node": "proxmox-2", "id": "lxc/201", "name": "media-server", "status": "running"}
         ]
 
-def get_resources(settings, resource_type=None):
+def get_resources(settings, resource_type=None, use_cache=True):
     """
     Get resources from Proxmox
     
     Args:
         settings: UserSettings object with Proxmox credentials
         resource_type: Optional type filter (qemu, storage, node)
+        use_cache: Set to False to force an upstream fetch (the result
+            still refreshes the cache)
         
     Returns:
         list: List of resources
@@ -190,27 +456,139 @@ def get_resources(settings, resource_type=None):
             ]
     
     # Normal production mode
-    base_url, headers, verify_ssl = get_proxmox_connection(settings)
+    params = {'type': resource_type} if resource_type else None
     
-    url = f"{base_url}/cluster/resources"
-    if resource_type:
-        url += f"?type={resource_type}"
+    key = ("resources", resource_type)
     
     try:
-        response = requests.get(
-            url,
-            headers=headers,
-            verify=verify_ssl
+        if not use_cache:
+            resources = query_all_clusters(settings, "cluster/resources", params)
+            _cache.set(key, resources)
+            return resources
+        return _cache.get_or_load(
+            key,
+            lambda: query_all_clusters(settings, "cluster/resources", params)
         )
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('data', [])
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error getting Proxmox resources: {str(e)}")
         raise Exception(f"Error getting Proxmox resources: {str(e)}")
 
+def resource_uid(resource):
+    """
+    Identifier for a resource that stays unique across federated clusters
+    
+    Returns the plain Proxmox id ("qemu/100") for a single cluster and
+    prefixes the cluster name ("lab:qemu/100") when federation is enabled.
+    """
+    rid = resource.get('id') or get_rrd_path(resource)
+    if resource.get('cluster') and is_federated():
+        return f"{resource['cluster']}:{rid}"
+    return rid
+
+def split_uid(uid):
+    """
+    Split a resource_uid back into (cluster, id)
+    
+    Returns:
+        tuple: (cluster or None, Proxmox id)
+    """
+    if ':' in uid:
+        cluster, _, rid = uid.partition(':')
+        return cluster, rid
+    return None, uid
+
+class ProxmoxInventory:
+    """
+    Indexed view over a single cluster/resources snapshot
+    
+    Resources are bucketed once by type, (node, type), vmid and status so
+    lookups for VMs, containers and storage are dictionary reads instead of
+    separate API calls and list scans. With federation, vmids and node names
+    can repeat between clusters, so lookups accept an optional cluster.
+    Returned lists are shared with the index and must not be mutated.
+    """
+    
+    def __init__(self, resources):
+        self.source = resources
+        self.fetched_at = time.time()
+        self.by_type = {}
+        self.by_node_type = {}
+        self.by_vmid = {}
+        self.by_cluster_vmid = {}
+        self.by_status = {}
+        
+        for resource in resources:
+            rtype = resource.get('type')
+            node = resource.get('node')
+            
+            self.by_type.setdefault(rtype, []).append(resource)
+            self.by_node_type.setdefault((node, rtype), []).append(resource)
+            self.by_status.setdefault(resource.get('status'), []).append(resource)
+            
+            vmid = resource.get('vmid')
+            if vmid is None and rtype in ('qemu', 'lxc'):
+                # Mock data only carries the "qemu/100" style id
+                vmid = str(resource.get('id', '')).rpartition('/')[2] or None
+            if vmid is not None:
+                self.by_vmid.setdefault(int(vmid), resource)
+                self.by_cluster_vmid[(resource.get('cluster'), int(vmid))] = resource
+    
+    def of_type(self, rtype, node=None, cluster=None):
+        """Resources of one type, optionally restricted to a node and/or cluster"""
+        if node:
+            found = self.by_node_type.get((node, rtype), [])
+        else:
+            found = self.by_type.get(rtype, [])
+        if cluster:
+            found = [r for r in found if r.get('cluster') == cluster]
+        return found
+    
+    def vms(self, node=None, cluster=None):
+        return self.of_type('qemu', node, cluster)
+    
+    def containers(self, node=None, cluster=None):
+        return self.of_type('lxc', node, cluster)
+    
+    def storage(self, node=None, cluster=None):
+        return self.of_type('storage', node, cluster)
+    
+    def nodes(self, cluster=None):
+        return self.of_type('node', cluster=cluster)
+    
+    def get_guest(self, vmid, cluster=None):
+        """Look up a VM or container by vmid (and cluster, when federated)"""
+        if cluster:
+            return self.by_cluster_vmid.get((cluster, int(vmid)))
+        return self.by_vmid.get(int(vmid))
+    
+    def with_status(self, status):
+        return self.by_status.get(status, [])
+
+_inventory = None
+
+def get_inventory(settings):
+    """
+    Get an indexed inventory built from one cluster/resources snapshot
+    
+    The index is only rebuilt when get_resources hands back a new snapshot,
+    so repeated calls within the cache TTL cost a single upstream request.
+    
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        
+    Returns:
+        ProxmoxInventory: Indexed resource snapshot
+    """
+    global _inventory
+    
+    resources = get_resources(settings)
+    inventory = _inventory
+    if inventory is None or inventory.source is not resources:
+        inventory = ProxmoxInventory(resources)
+        _inventory = inventory
+    return inventory
+
 def get_vms(settings, node=None):
     """
     Get list of VMs on a node or all nodes
@@ -222,11 +600,7 @@ def get_vms(settings, node=None):
     Returns:
         list: List of VM objects
     """
-    resources = get_resources(settings, "vm")
-    
-    if node:
-        return [vm for vm in resources if vm.get('node') == node]
-    return resources
+    return get_inventory(settings).vms(node)
 
 def get_containers(settings, node=None):
     """
@@ -239,64 +613,198 @@ def get_containers(settings, node=None):
     Returns:
         list: List of container objects
     """
-    resources = get_resources(settings, "lxc")
+    return get_inventory(settings).containers(node)
+
+def get_storage(settings, node=None):
+    """
+    Get list of Proxmox storage resources
     
-    if node:
-        return [container for container in resources if container.get('node') == node]
-    return resources
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        node: Optional node name to filter
+        
+    Returns:
+        list: List of storage objects
+    """
+    return get_inventory(settings).storage(node)
 
-def get_node_status(settings, node):
+def get_node_status(settings, node, cluster=None):
     """
     Get detailed status of a specific node
     
     Args:
         settings: UserSettings object with Proxmox credentials
         node: Node name
+        cluster: Optional cluster name when federated
         
     Returns:
         dict: Node status details
     """
-    base_url, headers, verify_ssl = get_proxmox_connection(settings)
+    client = get_proxmox_client(settings, cluster)
     
     try:
-        response = requests.get(
-            f"{base_url}/nodes/{node}/status",
-            headers=headers,
-            verify=verify_ssl
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('data', {})
+        return client.get(f"nodes/{node}/status") or {}
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error getting node status: {str(e)}")
         raise Exception(f"Error getting node status: {str(e)}")
 
-def get_node_storage(settings, node):
+def get_node_storage(settings, node, cluster=None):
     """
     Get storage status on a specific node
     
     Args:
         settings: UserSettings object with Proxmox credentials
         node: Node name
+        cluster: Optional cluster name when federated
         
     Returns:
         list: List of storage details
     """
-    base_url, headers, verify_ssl = get_proxmox_connection(settings)
+    client = get_proxmox_client(settings, cluster)
     
     try:
-        response = requests.get(
-            f"{base_url}/nodes/{node}/storage",
-            headers=headers,
-            verify=verify_ssl
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('data', [])
+        return client.get(f"nodes/{node}/storage") or []
         
     except requests.exceptions.RequestException as e:
         logging.error(f"Error getting storage status: {str(e)}")
         raise Exception(f"Error getting storage status: {str(e)}")
+
+def get_nodes_details(settings, nodes=None, max_workers=None, deadline=None):
+    """
+    Fetch status and storage for many nodes concurrently
+    
+    Every nodes/{node}/status and nodes/{node}/storage request runs on a
+    bounded thread pool; anything not finished when the overall deadline
+    expires is reported as a per-node timeout instead of blocking the caller.
+    
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        nodes: Optional list of node names or node dicts (with 'node' and
+            'cluster'); defaults to all nodes from get_nodes
+        max_workers: Maximum concurrent requests
+        deadline: Overall time budget in seconds
+        
+    Returns:
+        dict: {'nodes': {node: {'status': ..., 'storage': ...}},
+               'errors': {node: {'status'|'storage': message}},
+               'timed_out': bool, 'elapsed': seconds}
+        Node keys are "cluster:node" when federation is enabled.
+    """
+    max_workers = max_workers or PROXMOX_FANOUT_WORKERS
+    deadline = PROXMOX_FANOUT_DEADLINE if deadline is None else deadline
+    
+    if nodes is None:
+        nodes = [n for n in get_nodes(settings) if n.get('node')]
+    
+    federated = is_federated()
+    targets = {}
+    for entry in nodes:
+        if isinstance(entry, dict):
+            cluster, node = entry.get('cluster'), entry.get('node')
+        else:
+            cluster, node = None, entry
+        key = f"{cluster}:{node}" if federated and cluster else node
+        targets[key] = (cluster, node)
+    
+    fetchers = {
+        'status': get_node_status,
+        'storage': get_node_storage
+    }
+    
+    tasks = {}
+    for key, (cluster, node) in targets.items():
+        for kind, fetch in fetchers.items():
+            tasks[(key, kind)] = (fetch, (settings, node, cluster))
+    
+    outcome = fan_out(tasks, max_workers, deadline, "proxmox-fanout")
+    
+    results = {key: {} for key in targets}
+    errors = {}
+    for (node, kind), value in outcome['results'].items():
+        results[node][kind] = value
+    for (node, kind), message in outcome['errors'].items():
+        errors.setdefault(node, {})[kind] = message
+    
+    return {
+        'nodes': results,
+        'errors': errors,
+        'timed_out': bool(outcome['timed_out']),
+        'elapsed': outcome['elapsed']
+    }
+
+def get_rrddata(settings, path, timeframe="hour", cf="AVERAGE", cluster=None):
+    """
+    Get RRD time-series samples for a node or guest
+    
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        path: API path prefix, e.g. "nodes/pve1" or "nodes/pve1/qemu/100"
+        timeframe: hour, day, week, month or year
+        cf: Consolidation function (AVERAGE or MAX)
+        cluster: Optional cluster name when federated
+        
+    Returns:
+        list: Samples, each a dict with 'time' and metric values
+    """
+    client = get_proxmox_client(settings, cluster)
+    
+    try:
+        return client.get(f"{path}/rrddata", params={'timeframe': timeframe, 'cf': cf}) or []
+        
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error getting RRD data for {path}: {str(e)}")
+        raise Exception(f"Error getting RRD data: {str(e)}")
+
+def get_rrd_path(resource):
+    """
+    Build the rrddata path prefix for a cluster/resources entry
+    
+    Args:
+        resource: Resource dict with type, node and vmid
+        
+    Returns:
+        str: API path prefix, or None for resource types without RRD data
+    """
+    rtype = resource.get('type')
+    node = resource.get('node')
+    if rtype == 'node':
+        return f"nodes/{node}"
+    if rtype in ('qemu', 'lxc') and resource.get('vmid') is not None:
+        return f"nodes/{node}/{rtype}/{resource['vmid']}"
+    return None
+
+def get_all_rrddata(settings, resources=None, timeframe="hour", max_workers=None, deadline=None):
+    """
+    Fetch RRD data for every online node and running guest concurrently
+    
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        resources: Optional cluster/resources list (fetched if omitted)
+        timeframe: hour, day, week, month or year
+        max_workers: Maximum concurrent requests
+        deadline: Overall time budget in seconds
+        
+    Returns:
+        dict: {'results': {resource_uid: samples}, 'errors': {resource_uid: message},
+               'timed_out': [resource_uids], 'elapsed': seconds}
+    """
+    if resources is None:
+        resources = get_resources(settings)
+    
+    tasks = {}
+    for resource in resources:
+        if resource.get('status') not in ('online', 'running'):
+            continue
+        path = get_rrd_path(resource)
+        if path:
+            tasks[resource_uid(resource)] = (
+                get_rrddata, (settings, path, timeframe, "AVERAGE", resource.get('cluster'))
+            )
+    
+    return fan_out(
+        tasks,
+        max_workers or PROXMOX_FANOUT_WORKERS,
+        PROXMOX_FANOUT_DEADLINE if deadline is None else deadline,
+        "proxmox-rrd"
+    )
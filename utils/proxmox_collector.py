@@ -0,0 +1,321 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+from utils import proxmox
+from utils.timeseries import rrd_store
+
+# Background collector configuration
+PROXMOX_COLLECTOR_ENABLED = os.environ.get("PROXMOX_COLLECTOR_ENABLED", "false").lower() == "true"
+PROXMOX_COLLECTOR_INTERVAL = float(os.environ.get("PROXMOX_COLLECTOR_INTERVAL", 10))
+PROXMOX_COLLECTOR_HISTORY = int(os.environ.get("PROXMOX_COLLECTOR_HISTORY", 30))
+
+# RRD history ingestion, piggybacking on the collector schedule
+PROXMOX_RRD_ENABLED = os.environ.get("PROXMOX_RRD_ENABLED", "false").lower() == "true"
+PROXMOX_RRD_INTERVAL = float(os.environ.get("PROXMOX_RRD_INTERVAL", 60))
+# Sample spacing of the 'hour' rrddata timeframe
+RRD_HOUR_STEP = 60
+
+_collector = None
+_collector_lock = threading.Lock()
+
+class ProxmoxSnapshot:
+    """One point-in-time view of the cluster as seen by the collector"""
+
+    __slots__ = ('version', 'taken_at', 'duration', 'resources', 'nodes', 'node_details')
+
+    def __init__(self, version, taken_at, duration, resources, nodes, node_details):
+        self.version = version
+        self.taken_at = taken_at
+        self.duration = duration
+        self.resources = resources
+        self.nodes = nodes
+        self.node_details = node_details
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.taken_at
+
+class ProxmoxCollector:
+    """
+    Polls cluster/resources and per-node status on a fixed interval
+
+    The last N snapshots are kept in a ring buffer so API routes can answer
+    from memory and upstream load stays constant regardless of how many
+    dashboards are open.
+    """
+
+    def __init__(self, settings=None, interval=PROXMOX_COLLECTOR_INTERVAL,
+                 history=PROXMOX_COLLECTOR_HISTORY):
+        self.settings = settings
+        self.interval = interval
+        self._snapshots = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._version = 0
+
+        self.runs = 0
+        self.failures = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.last_duration = None
+        self.last_error = None
+        self.last_error_at = None
+
+        self._rrd_thread = None
+        self._last_rrd = 0.0
+        self.rrd_last_result = None
+
+    def start(self):
+        """Start the polling thread (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="proxmox-collector", daemon=True)
+        self._thread.start()
+        logging.info(f"Proxmox collector started (interval {self.interval}s)")
+
+    def stop(self):
+        """Stop the polling thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            # How far behind schedule this run starts
+            self.lag = max(0.0, time.monotonic() - next_run)
+            self.max_lag = max(self.max_lag, self.lag)
+
+            self.collect_once()
+
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                # A slow poll overran one or more ticks; skip them rather than bunching up
+                missed = int((now - next_run) // self.interval) + 1
+                next_run += missed * self.interval
+                logging.warning(f"Proxmox collector overran its interval, skipped {missed} tick(s)")
+            self._stop.wait(next_run - now)
+
+    def collect_once(self):
+        """
+        Take one snapshot and append it to the ring buffer
+
+        Returns:
+            ProxmoxSnapshot or None if the poll failed
+        """
+        taken_at = time.time()
+        started = time.monotonic()
+        self.runs += 1
+
+        try:
+            resources = proxmox.get_resources(self.settings, use_cache=False)
+            # Served as /api/proxmox/nodes, so keep the /nodes response shape
+            nodes = [proxmox.node_from_resource(r) for r in resources if r.get('type') == 'node']
+            online = [n for n in nodes if n.get('status') == 'online']
+            node_details = proxmox.get_nodes_details(
+                self.settings,
+                online,
+                deadline=min(proxmox.PROXMOX_FANOUT_DEADLINE, self.interval)
+            )
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self.last_error_at = taken_at
+            logging.error(f"Proxmox collector poll failed: {str(e)}")
+            return None
+
+        self.last_duration = round(time.monotonic() - started, 3)
+
+        with self._lock:
+            self._version += 1
+            snapshot = ProxmoxSnapshot(
+                self._version, taken_at, self.last_duration, resources, nodes, node_details
+            )
+            self._snapshots.append(snapshot)
+
+        if PROXMOX_RRD_ENABLED:
+            self._maybe_ingest_rrd(resources)
+        return snapshot
+
+    def _maybe_ingest_rrd(self, resources):
+        """Kick off an RRD ingest in the background if one is due and none is running"""
+        if time.monotonic() - self._last_rrd < PROXMOX_RRD_INTERVAL:
+            return
+        if self._rrd_thread is not None and self._rrd_thread.is_alive():
+            return
+        self._last_rrd = time.monotonic()
+        self._rrd_thread = threading.Thread(
+            target=self._ingest_rrd, args=(resources,), name="proxmox-rrd", daemon=True
+        )
+        self._rrd_thread.start()
+
+    def _ingest_rrd(self, resources):
+        try:
+            self.rrd_last_result = ingest_rrd(self.settings, resources)
+        except Exception as e:
+            logging.error(f"Proxmox RRD ingest failed: {str(e)}")
+            self.rrd_last_result = {'error': str(e)}
+
+    def latest(self):
+        """Newest snapshot, or None if nothing has been collected yet"""
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def history(self):
+        """All buffered snapshots, oldest first"""
+        with self._lock:
+            return list(self._snapshots)
+
+    def get_status(self):
+        """
+        Get collector health information
+
+        Returns:
+            dict: Running state, snapshot age, lag and failure counters
+        """
+        latest = self.latest()
+        return {
+            'running': self.is_running(),
+            'interval': self.interval,
+            'history_size': self._snapshots.maxlen,
+            'snapshots': len(self._snapshots),
+            'latest_version': latest.version if latest else None,
+            'snapshot_age': round(latest.age, 3) if latest else None,
+            'lag': round(self.lag, 3),
+            'max_lag': round(self.max_lag, 3),
+            'last_duration': self.last_duration,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_error_at': self.last_error_at,
+            'rrd': self.rrd_last_result
+        }
+
+def start_collector(settings=None, interval=None, history=None):
+    """
+    Start the shared collector if it isn't running yet
+
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        interval: Poll interval in seconds
+        history: Number of snapshots to keep
+
+    Returns:
+        ProxmoxCollector: The shared collector
+    """
+    global _collector
+
+    with _collector_lock:
+        if _collector is None:
+            _collector = ProxmoxCollector(
+                settings,
+                interval or PROXMOX_COLLECTOR_INTERVAL,
+                history or PROXMOX_COLLECTOR_HISTORY
+            )
+        _collector.start()
+        return _collector
+
+def get_collector():
+    """Return the shared collector, or None if it was never started"""
+    return _collector
+
+def get_fresh_snapshot():
+    """
+    Get the newest snapshot if the collector is running and keeping up
+
+    Snapshots older than three intervals are treated as stale so callers
+    fall back to querying Proxmox directly.
+
+    Returns:
+        ProxmoxSnapshot or None
+    """
+    collector = _collector
+    if collector is None or not collector.is_running():
+        return None
+    snapshot = collector.latest()
+    if snapshot is None or snapshot.age > collector.interval * 3:
+        return None
+    return snapshot
+
+def ingest_rrd(settings=None, resources=None):
+    """
+    Pull rrddata for all online nodes and running guests into the local store
+
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        resources: Optional cluster/resources list to walk
+
+    Returns:
+        dict: Counts of resources fetched, failed and values stored
+    """
+    outcome = proxmox.get_all_rrddata(settings, resources)
+
+    stored = 0
+    for resource_id, samples in outcome['results'].items():
+        stored += rrd_store.ingest(resource_id, samples)
+    rrd_store.prune()
+
+    if outcome['errors']:
+        logging.warning(f"RRD fetch failed for {len(outcome['errors'])} resource(s)")
+
+    return {
+        'resources': len(outcome['results']),
+        'failed': len(outcome['errors']),
+        'values_stored': stored,
+        'elapsed': outcome['elapsed']
+    }
+
+def get_history(settings, resource_id, metric, start=None, end=None, resolution=None):
+    """
+    Get locally stored history for a resource metric
+
+    If nothing has been collected for the resource yet, or its newest
+    sample is older than an ingest interval plus one RRD step, its rrddata
+    is fetched on demand so charts still work, and keep moving, without
+    the collector. A failed refetch serves the stored history.
+
+    Args:
+        settings: UserSettings object with Proxmox credentials
+        resource_id: Resource uid such as "node/pve1", "qemu/100" or,
+            when federated, "lab:qemu/100"
+        metric: Metric name (cpu, mem, netin, ...)
+        start: Range start as epoch seconds
+        end: Range end as epoch seconds
+        resolution: Optional 'raw', '5m' or '1h'
+
+    Returns:
+        dict: {'resolution': ..., 'points': [...]}
+    """
+    newest = rrd_store.newest(resource_id)
+    if newest is None or time.time() - newest > PROXMOX_RRD_INTERVAL + RRD_HOUR_STEP:
+        cluster, rid = proxmox.split_uid(resource_id)
+        rtype, _, ident = rid.partition('/')
+        if rtype == 'node':
+            resource = {'type': 'node', 'node': ident}
+        elif ident.isdigit():
+            resource = proxmox.get_inventory(settings).get_guest(ident, cluster)
+        else:
+            resource = None
+        path = proxmox.get_rrd_path(resource) if resource else None
+        if not path and newest is None:
+            raise ValueError(f"Unknown resource: {resource_id}")
+        if path:
+            try:
+                rrd_store.ingest(resource_id, proxmox.get_rrddata(settings, path, cluster=cluster))
+            except Exception:
+                # Stale history beats none
+                if newest is None:
+                    raise
+
+    return rrd_store.query(resource_id, metric, start, end, resolution)
@@ -0,0 +1,132 @@
+import os
+import uuid
+import threading
+from collections import OrderedDict
+
+# How many resource snapshots a client can be behind and still get a delta
+PROXMOX_DELTA_HISTORY = int(os.environ.get("PROXMOX_DELTA_HISTORY", 20))
+
+def resource_key(resource):
+    """
+    Stable key for a cluster/resources entry
+
+    Proxmox ids ("qemu/100", "node/pve1", "storage/pve1/local") are unique
+    within a cluster and get a "cluster:" prefix when tagged with one;
+    mock data without an id falls back to type/node/name.
+    """
+    if resource.get('id'):
+        key = resource['id']
+    else:
+        name = resource.get('storage') or resource.get('name') or ''
+        key = f"{resource.get('type')}/{resource.get('node')}/{name}"
+    if resource.get('cluster'):
+        key = f"{resource['cluster']}:{key}"
+    return key
+
+def diff_resources(old, new):
+    """
+    Compute added, removed and changed resources between two keyed snapshots
+
+    Args:
+        old: dict key -> resource
+        new: dict key -> resource
+
+    Returns:
+        dict: {'added': {key: resource}, 'removed': [keys],
+               'changed': {key: {field: new value or None if dropped}}}
+    """
+    added = {}
+    changed = {}
+    for key, resource in new.items():
+        previous = old.get(key)
+        if previous is None:
+            added[key] = resource
+        elif previous is not resource and previous != resource:
+            fields = {f: v for f, v in resource.items() if previous.get(f) != v}
+            for f in previous.keys() - resource.keys():
+                fields[f] = None
+            changed[key] = fields
+    removed = [key for key in old if key not in new]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+class SnapshotVersions:
+    """
+    Assigns version tokens to resource snapshots and serves deltas between them
+
+    Tokens embed a per-process nonce, so a token issued by another worker or
+    before a restart is simply unknown and the client gets a full snapshot.
+    """
+
+    def __init__(self, history=PROXMOX_DELTA_HISTORY):
+        self.history = history
+        self._nonce = uuid.uuid4().hex[:8]
+        self._counter = 0
+        self._lock = threading.Lock()
+        # token -> (source list, keyed dict), oldest first
+        self._versions = OrderedDict()
+        self._diffs = OrderedDict()
+
+    def record(self, resources):
+        """
+        Register a snapshot and return its version token
+
+        The same list object, or one with identical content, keeps the
+        current token so unchanged polls don't churn versions.
+
+        Args:
+            resources: cluster/resources list
+
+        Returns:
+            tuple: (token, keyed dict)
+        """
+        with self._lock:
+            if self._versions:
+                token, (source, keyed) = next(reversed(self._versions.items()))
+                if source is resources:
+                    return token, keyed
+            else:
+                keyed = None
+
+            new_keyed = {resource_key(r): r for r in resources}
+            if keyed is not None and new_keyed == keyed:
+                # Identical content: refresh the source so the identity check hits next time
+                self._versions[token] = (resources, keyed)
+                return token, keyed
+
+            self._counter += 1
+            token = f"{self._nonce}-{self._counter}"
+            self._versions[token] = (resources, new_keyed)
+            while len(self._versions) > self.history:
+                self._versions.popitem(last=False)
+            return token, new_keyed
+
+    def delta(self, since, resources):
+        """
+        Build the response for a client that last saw version `since`
+
+        Args:
+            since: Token the client holds (may be empty or unknown)
+            resources: Current cluster/resources list
+
+        Returns:
+            dict: Delta payload if `since` is still retained, otherwise a
+                full keyed snapshot with 'delta': False
+        """
+        token, keyed = self.record(resources)
+
+        with self._lock:
+            old = self._versions.get(since) if since else None
+            if old is None:
+                return {'version': token, 'delta': False, 'resources': keyed}
+
+            cached = self._diffs.get((since, token))
+            if cached is None:
+                cached = diff_resources(old[1], keyed)
+                self._diffs[(since, token)] = cached
+                while len(self._diffs) > self.history:
+                    self._diffs.popitem(last=False)
+
+        return {'version': token, 'delta': True, **cached}
+
+# Shared version registry for /api/proxmox/resources
+resource_versions = SnapshotVersions()
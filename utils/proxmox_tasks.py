@@ -0,0 +1,263 @@
+import os
+import time
+import heapq
+import logging
+import threading
+
+from utils import proxmox
+from utils.fanout import fan_out
+
+# Task index configuration
+PROXMOX_TASKS_MAX = int(os.environ.get("PROXMOX_TASKS_MAX", 5000))
+PROXMOX_TASKS_TTL = float(os.environ.get("PROXMOX_TASKS_TTL", 10))
+PROXMOX_TASKS_FETCH_LIMIT = int(os.environ.get("PROXMOX_TASKS_FETCH_LIMIT", 500))
+
+def parse_upid(upid):
+    """
+    Split a Proxmox UPID into its fields
+
+    Format: UPID:node:pid:pstart:starttime:type:id:user:
+
+    Args:
+        upid: UPID string
+
+    Returns:
+        dict: node, pid, pstart, starttime, type, id, user (empty if malformed)
+    """
+    parts = upid.split(':')
+    if len(parts) < 8 or parts[0] != 'UPID':
+        return {}
+    return {
+        'node': parts[1],
+        'pid': int(parts[2], 16),
+        'pstart': int(parts[3], 16),
+        'starttime': int(parts[4], 16),
+        'type': parts[5],
+        'id': parts[6],
+        'user': parts[7]
+    }
+
+def task_state(task):
+    """Normalize a task's status into running, ok, warning or error"""
+    if not task.get('endtime'):
+        return 'running'
+    status = task.get('status') or ''
+    if status == 'OK':
+        return 'ok'
+    if status.startswith('WARNINGS'):
+        return 'warning'
+    return 'error'
+
+def node_label(node_key):
+    """Render a (cluster, node) key as "cluster:node", or just the node name"""
+    cluster, node = node_key
+    return f"{cluster}:{node}" if cluster and proxmox.is_federated() else node
+
+class TaskIndex:
+    """
+    Bounded local index of Proxmox tasks, fed incrementally per node
+
+    Each (cluster, node) has a starttime cursor; polls request only tasks since the
+    cursor (or since the oldest task we still see as running, so finished
+    tasks get their final status). Tasks are de-duplicated by UPID and the
+    oldest by start time are evicted once the index is full.
+
+    Only nodes/{node}/tasks is polled: cluster/tasks has no since filter and
+    lists the same task logs, so it would re-send the whole recent list on
+    every poll.
+    """
+
+    def __init__(self, max_tasks=PROXMOX_TASKS_MAX):
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._tasks = {}
+        self._cursors = {}
+        self._running = {}
+        self.last_poll = None
+        self.last_poll_monotonic = 0.0
+        self.last_errors = {}
+
+    def _since(self, node_key):
+        """Cursor to request from, rewound to cover tasks still running"""
+        cursor = self._cursors.get(node_key)
+        running = self._running.get(node_key)
+        if running:
+            oldest = min(
+                (self._tasks[upid].get('starttime', 0) for upid in running if upid in self._tasks),
+                default=None
+            )
+            if oldest is not None:
+                cursor = oldest if cursor is None else min(cursor, oldest)
+        return cursor
+
+    def _fetch_node(self, settings, cluster, node, since):
+        # Proxmox returns the newest `limit` tasks and the cursor then jumps to
+        # the newest of them, so page until a short page or anything older
+        # that arrived since the last poll would be skipped for good. The
+        # first poll takes one page; there is nothing indexed to skip past.
+        client = proxmox.get_proxmox_client(settings, cluster)
+        max_pages = 1 if since is None else max(1, -(-self.max_tasks // PROXMOX_TASKS_FETCH_LIMIT))
+        tasks = []
+        for _ in range(max_pages):
+            params = {'source': 'all', 'limit': PROXMOX_TASKS_FETCH_LIMIT, 'start': len(tasks)}
+            if since is not None:
+                params['since'] = since
+            page = client.get(f"nodes/{node}/tasks", params=params) or []
+            tasks.extend(page)
+            if len(page) < PROXMOX_TASKS_FETCH_LIMIT:
+                break
+        return tasks
+
+    def merge(self, node_key, tasks):
+        """
+        Merge fetched tasks for a node into the index
+
+        Args:
+            node_key: (cluster, node) the tasks were fetched from
+            tasks: Task dicts as returned by nodes/{node}/tasks
+
+        Returns:
+            int: Number of tasks that were new or changed
+        """
+        cluster = node_key[0]
+        changed = 0
+        with self._lock:
+            running = self._running.setdefault(node_key, set())
+            for task in sorted(tasks, key=lambda t: t.get('starttime', 0)):
+                upid = task.get('upid')
+                if not upid:
+                    continue
+                entry = {**parse_upid(upid), **task}
+                entry['state'] = task_state(entry)
+                if cluster:
+                    entry['cluster'] = cluster
+
+                # UPIDs are only unique within a cluster
+                key = (cluster, upid)
+                previous = self._tasks.get(key)
+                if previous is None or previous.get('state') != entry['state']:
+                    changed += 1
+                self._tasks[key] = entry
+
+                if entry['state'] == 'running':
+                    running.add(key)
+                else:
+                    running.discard(key)
+
+                starttime = entry.get('starttime')
+                if starttime and starttime > self._cursors.get(node_key, 0):
+                    self._cursors[node_key] = starttime
+
+            excess = len(self._tasks) - self.max_tasks
+            if excess > 0:
+                # Evict by start time, not insertion order: paged-in backfill
+                # is older than tasks already indexed and must go first
+                oldest = heapq.nsmallest(excess, self._tasks.items(),
+                                         key=lambda item: item[1].get('starttime', 0))
+                for key, evicted in oldest:
+                    del self._tasks[key]
+                    self._running.get((evicted.get('cluster'), evicted.get('node')), set()).discard(key)
+        return changed
+
+    def poll(self, settings, nodes=None):
+        """
+        Fetch new and updated tasks from every node concurrently
+
+        Args:
+            settings: UserSettings object with Proxmox credentials
+            nodes: Optional node dicts with 'node' and 'cluster' (defaults
+                to online nodes)
+
+        Returns:
+            dict: Counts of changed tasks and per-node errors
+        """
+        if nodes is None:
+            nodes = [n for n in proxmox.get_nodes(settings)
+                     if n.get('node') and n.get('status') == 'online']
+
+        with self._lock:
+            tasks = {}
+            for n in nodes:
+                node_key = (n.get('cluster'), n.get('node'))
+                tasks[node_key] = (self._fetch_node, (settings, *node_key, self._since(node_key)))
+
+        outcome = fan_out(
+            tasks, proxmox.PROXMOX_FANOUT_WORKERS, proxmox.PROXMOX_FANOUT_DEADLINE, "proxmox-tasks"
+        )
+
+        changed = 0
+        for node_key, node_tasks in outcome['results'].items():
+            changed += self.merge(node_key, node_tasks)
+
+        errors = {node_label(k): message for k, message in outcome['errors'].items()}
+        for label, message in errors.items():
+            logging.warning(f"Error fetching tasks from node {label}: {message}")
+
+        self.last_poll = time.time()
+        self.last_poll_monotonic = time.monotonic()
+        self.last_errors = errors
+        return {'changed': changed, 'errors': errors, 'elapsed': outcome['elapsed']}
+
+    def refresh(self, settings, max_age=PROXMOX_TASKS_TTL):
+        """
+        Poll if the index is older than max_age
+
+        Concurrent callers don't pile up: if a poll is already running they
+        read the current index instead of waiting.
+        """
+        if time.monotonic() - self.last_poll_monotonic < max_age:
+            return
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            self.poll(settings)
+        finally:
+            self._poll_lock.release()
+
+    def query(self, task_type=None, node=None, state=None, vmid=None, cluster=None, limit=100):
+        """
+        Filter indexed tasks, newest first
+
+        Args:
+            task_type: Task type such as vzdump, qmigrate or replication
+            node: Node name
+            state: running, ok, warning or error
+            vmid: Guest id the task refers to
+            cluster: Cluster name when federated
+            limit: Maximum number of tasks to return
+
+        Returns:
+            list: Matching task dicts
+        """
+        vmid = str(vmid) if vmid is not None else None
+        matches = []
+        with self._lock:
+            for task in self._tasks.values():
+                if task_type and task.get('type') != task_type:
+                    continue
+                if node and task.get('node') != node:
+                    continue
+                if state and task.get('state') != state:
+                    continue
+                if vmid and str(task.get('id')) != vmid:
+                    continue
+                if cluster and task.get('cluster') != cluster:
+                    continue
+                matches.append(task)
+        matches.sort(key=lambda t: t.get('starttime', 0), reverse=True)
+        return matches[:limit]
+
+    def get_status(self):
+        with self._lock:
+            return {
+                'tasks': len(self._tasks),
+                'max_tasks': self.max_tasks,
+                'running': sum(len(r) for r in self._running.values()),
+                'cursors': {node_label(k): v for k, v in self._cursors.items()},
+                'last_poll': self.last_poll,
+                'errors': self.last_errors
+            }
+
+# Shared index used by the API routes
+task_index = TaskIndex()
@@ -0,0 +1,255 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+import paramiko
+
+# Persistent SSH transport pool configuration
+SSH_CONNECT_TIMEOUT = float(os.environ.get("SSH_CONNECT_TIMEOUT", 10))
+SSH_COMMAND_TIMEOUT = float(os.environ.get("SSH_COMMAND_TIMEOUT", 300))
+SSH_POOL_IDLE_TIMEOUT = float(os.environ.get("SSH_POOL_IDLE_TIMEOUT", 300))
+SSH_POOL_KEEPALIVE = int(os.environ.get("SSH_POOL_KEEPALIVE", 30))
+# OpenSSH's MaxSessions defaults to 10 channels per connection
+SSH_POOL_MAX_CHANNELS = int(os.environ.get("SSH_POOL_MAX_CHANNELS", 8))
+
+def pool_key(host, username, password=None, key_path=None):
+    """
+    Identify a pooled connection by host, user and credentials
+
+    The password is hashed so it never appears in status output, and the
+    key file's mtime is included so a replaced key gets a fresh login.
+    """
+    key_stamp = None
+    if key_path and os.path.exists(key_path):
+        key_stamp = os.path.getmtime(key_path)
+    secret = hashlib.sha256((password or '').encode()).hexdigest()[:16]
+    return (host, username, secret, key_path if key_stamp else None, key_stamp)
+
+class PooledConnection:
+    """One authenticated SSH transport shared by up to max_channels concurrent commands"""
+
+    def __init__(self, key, client, max_channels):
+        self.key = key
+        self.client = client
+        self.transport = client.get_transport()
+        self.channels = threading.BoundedSemaphore(max_channels)
+        self.in_use = 0
+        self.commands = 0
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+
+    def is_active(self):
+        return self.transport is not None and self.transport.is_active()
+
+    def close(self):
+        self.client.close()
+
+class SSHPool:
+    """
+    Authenticated paramiko transports kept open between commands
+
+    Each command runs on a new channel of an existing transport, so only the
+    first command to a host pays for the TCP connect, key exchange and
+    authentication. Transports send keepalives so NAT and firewalls keep
+    them open, are evicted after sitting idle, and cap the number of
+    concurrent channels so the server's session limit isn't hit.
+    """
+
+    def __init__(self, idle_timeout=SSH_POOL_IDLE_TIMEOUT, keepalive=SSH_POOL_KEEPALIVE,
+                 max_channels=SSH_POOL_MAX_CHANNELS, connect_timeout=SSH_CONNECT_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.max_channels = max_channels
+        self.connect_timeout = connect_timeout
+        self._connections = {}
+        # One lock per key so a slow login doesn't hold up other hosts
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+        self.connects = 0
+        self.reuses = 0
+        self.evictions = 0
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _connect(self, key, host, username, password, key_path):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            # Connect using either password or key
+            if key_path and os.path.exists(key_path):
+                pkey = paramiko.RSAKey.from_private_key_file(key_path)
+                client.connect(host, username=username, pkey=pkey, timeout=self.connect_timeout,
+                               banner_timeout=self.connect_timeout, auth_timeout=self.connect_timeout)
+            else:
+                client.connect(host, username=username, password=password, timeout=self.connect_timeout,
+                               banner_timeout=self.connect_timeout, auth_timeout=self.connect_timeout)
+        except Exception:
+            client.close()
+            raise
+        client.get_transport().set_keepalive(self.keepalive)
+        self.connects += 1
+        logging.info(f"Opened pooled SSH connection to {username}@{host}")
+        return PooledConnection(key, client, self.max_channels)
+
+    def acquire(self, host, username, password=None, key_path=None):
+        """
+        Get a live connection for these credentials, logging in if needed
+
+        Returns:
+            PooledConnection
+        """
+        key = pool_key(host, username, password, key_path)
+        with self._key_lock(key):
+            with self._lock:
+                connection = self._connections.get(key)
+            if connection is not None and connection.is_active():
+                self.reuses += 1
+                return connection
+            if connection is not None:
+                self._evict(key, connection, "transport closed")
+
+            connection = self._connect(key, host, username, password, key_path)
+            with self._lock:
+                self._connections[key] = connection
+            self._ensure_reaper()
+            return connection
+
+    def _evict(self, key, connection, reason):
+        with self._lock:
+            if self._connections.get(key) is connection:
+                del self._connections[key]
+                self.evictions += 1
+        logging.info(f"Closing pooled SSH connection to {key[1]}@{key[0]}: {reason}")
+        connection.close()
+
+    def run(self, host, username, password=None, key_path=None, command="", timeout=SSH_COMMAND_TIMEOUT):
+        """
+        Run one command on a pooled connection
+
+        A transport that died since its last use (server restart, dropped
+        NAT entry) is replaced and the command retried once.
+
+        Returns:
+            tuple: (stdout, stderr, return_code)
+
+        Raises:
+            paramiko.SSHException, OSError: If the host can't be reached or
+                the login fails
+        """
+        for attempt in range(2):
+            connection = self.acquire(host, username, password, key_path)
+            try:
+                channel = self._open_channel(connection, timeout)
+            except paramiko.SSHException as e:
+                # A refused channel on a live transport (server session limit)
+                # must not tear down the commands already running on it
+                if attempt or connection.is_active():
+                    raise
+                self._evict(connection.key, connection, str(e))
+                continue
+            try:
+                return self._exec(channel, command)
+            finally:
+                channel.close()
+                with self._lock:
+                    connection.in_use -= 1
+                    connection.last_used = time.monotonic()
+                connection.channels.release()
+
+    def _open_channel(self, connection, timeout):
+        if not connection.channels.acquire(timeout=timeout):
+            raise TimeoutError(f"No free SSH channel after {timeout}s")
+        try:
+            channel = connection.transport.open_session(timeout=self.connect_timeout)
+        except Exception:
+            connection.channels.release()
+            raise
+        channel.settimeout(timeout)
+        with self._lock:
+            connection.in_use += 1
+            connection.commands += 1
+            connection.last_used = time.monotonic()
+        return channel
+
+    def _exec(self, channel, command):
+        channel.exec_command(command)
+        stdout = channel.makefile('rb')
+        stderr = channel.makefile_stderr('rb')
+        stdout_str = stdout.read().decode('utf-8')
+        stderr_str = stderr.read().decode('utf-8')
+        exit_code = channel.recv_exit_status()
+        return stdout_str, stderr_str, exit_code
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(max(1.0, self.idle_timeout / 4))
+            self.reap()
+            with self._lock:
+                if not self._connections:
+                    # Nothing left to watch; the next login starts a new reaper
+                    self._reaper = None
+                    return
+
+    def reap(self):
+        """Close connections that are dead or have been idle past the timeout"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._connections.items())
+        for key, connection in candidates:
+            if not connection.is_active():
+                self._evict(key, connection, "transport closed")
+            elif connection.in_use == 0 and now - connection.last_used > self.idle_timeout:
+                self._evict(key, connection, "idle")
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            candidates = list(self._connections.items())
+        for key, connection in candidates:
+            self._evict(key, connection, "pool closed")
+
+    def get_status(self):
+        """
+        Get pool health information
+
+        Returns:
+            dict: Open connections and reuse counters
+        """
+        now = time.monotonic()
+        with self._lock:
+            connections = [
+                {
+                    'host': connection.key[0],
+                    'username': connection.key[1],
+                    'active': connection.is_active(),
+                    'channels_in_use': connection.in_use,
+                    'commands': connection.commands,
+                    'created_at': connection.created_at,
+                    'idle': round(now - connection.last_used, 1)
+                }
+                for connection in self._connections.values()
+            ]
+        return {
+            'idle_timeout': self.idle_timeout,
+            'keepalive': self.keepalive,
+            'max_channels': self.max_channels,
+            'connects': self.connects,
+            'reuses': self.reuses,
+            'evictions': self.evictions,
+            'connections': connections
+        }
+
+# Shared pool for storage.run_ssh_command
+ssh_pool = SSHPool()
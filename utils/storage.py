@@ -1,17 +1,32 @@
 import json
 import os
-import shutil
+import re
 import logging
+import threading
 import subprocess
 import paramiko
 from paramiko import SFTPClient
 from typing import Optional, Tuple, Dict, List, Any
+from utils.dirsize import iter_directory_sizes
+from utils.fanout import fan_out
+from utils.sshpool import ssh_pool
+
+# Storage usage probing
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+STORAGE_STATVFS_TIMEOUT = float(os.environ.get("STORAGE_STATVFS_TIMEOUT", 2))
+
+# Paths whose statvfs call is still in flight (possibly stuck on a dead mount)
+_probing = set()
+_probing_lock = threading.Lock()
 
 def run_ssh_command(host: str, username: str, password: Optional[str] = None, 
                   key_path: Optional[str] = None, command: str = "") -> Tuple[str, str, int]:
     """
     Run a command over SSH
     
+    Connections are pooled per host, user and credentials, so repeated
+    commands reuse one authenticated session instead of logging in again.
+    
     Args:
         host: SSH host (IP or hostname)
         username: SSH username
@@ -28,35 +43,13 @@ def run_ssh_command(host: str, username: str, password: Optional[str] = None,
     if not command:
         return "", "No command specified", -1
     
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    
     try:
-        # Connect using either password or key
-        if key_path and os.path.exists(key_path):
-            # Use key-based authentication
-            key = paramiko.RSAKey.from_private_key_file(key_path)
-            ssh.connect(host, username=username, pkey=key)
-        else:
-            # Use password authentication
-            ssh.connect(host, username=username, password=password)
-        
-        # Execute command
-        stdin, stdout, stderr = ssh.exec_command(command)
-        exit_code = stdout.channel.recv_exit_status()
-        
-        # Get output
-        stdout_str = stdout.read().decode('utf-8')
-        stderr_str = stderr.read().decode('utf-8')
-        
-        return stdout_str, stderr_str, exit_code
+        # Runs on a channel of a pooled, already authenticated connection
+        return ssh_pool.run(host, username, password, key_path, command)
     
     except Exception as e:
         logging.error(f"SSH error: {str(e)}")
         return "", str(e), -1
-    
-    finally:
-        ssh.close()
 
 def manage_zpool(action: str, pool_name: str, settings: Optional[Any] = None) -> Dict[str, Any]:
     """
@@ -226,10 +219,79 @@ def manage_zpool(action: str, pool_name: str, settings: Optional[Any] = None) ->
             'message': f"Error: {str(e)}"
         }
 
+def parse_mountinfo(path: str = MOUNTINFO_PATH) -> Dict[str, Tuple[str, str]]:
+    """
+    Read the mount table from /proc/self/mountinfo
+    
+    Reading one proc file replaces a `df -T` fork per path and never
+    touches the mounted filesystems, so it can't hang on a dead NFS server.
+    
+    Returns:
+        dict: mount point -> (filesystem type, source); empty if unavailable
+    """
+    mounts = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                # "36 35 98:0 /root /mnt/point rw,noatime shared:1 - ext4 /dev/sda1 rw"
+                fields, _, tail = line.partition(' - ')
+                fields, tail = fields.split(), tail.split()
+                if len(fields) < 5 or len(tail) < 2:
+                    continue
+                # Spaces and the like are octal-escaped; a later mount on the same point hides the earlier one
+                mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])
+                mounts[mount_point] = (tail[0], tail[1])
+    except OSError as e:
+        logging.warning(f"Could not read {path}: {e}")
+    return mounts
+
+def find_mount(path: str, mounts: Dict[str, Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    Find the mount a path lives on by longest mount point prefix
+    
+    Returns:
+        tuple: (mount point, filesystem type)
+    """
+    best = None
+    for mount_point in mounts:
+        prefix = mount_point.rstrip('/') + '/'
+        if path == mount_point or path.startswith(prefix) or mount_point == '/':
+            if best is None or len(mount_point) > len(best):
+                best = mount_point
+    if best is None:
+        return path, "Unknown"
+    return best, mounts[best][0]
+
+def _statvfs_path(path: str) -> Optional[Tuple[str, os.statvfs_result]]:
+    """
+    Stat one storage path, run on a worker thread
+    
+    A stat on a hard NFS/CIFS mount whose server is gone blocks in the
+    kernel and can't be interrupted, so the path is tracked while in
+    flight; later requests see it still pending and don't pile up more
+    stuck threads behind it.
+    
+    Returns:
+        tuple: (resolved path, statvfs result), or None if the path doesn't exist
+    """
+    with _probing_lock:
+        _probing.add(path)
+    try:
+        if not os.path.exists(path):
+            return None
+        return os.path.realpath(path), os.statvfs(path)
+    finally:
+        with _probing_lock:
+            _probing.discard(path)
+
 def get_storage_info(settings):
     """
     Get storage usage information for configured paths
     
+    Mount points and filesystem types come from one read of the mount
+    table; statvfs runs for all paths concurrently with a per-path timeout,
+    and a path that doesn't answer in time is reported as stale.
+    
     Args:
         settings: UserSettings object with storage paths
         
@@ -249,63 +311,75 @@ def get_storage_info(settings):
         if not storage_paths:
             raise ValueError("No storage paths configured")
         
+        mounts = parse_mountinfo()
+        
+        with _probing_lock:
+            still_stuck = set(storage_paths) & _probing
+        outcome = fan_out(
+            {path: (_statvfs_path, (path,)) for path in storage_paths if path not in still_stuck},
+            max_workers=len(storage_paths),
+            deadline=STORAGE_STATVFS_TIMEOUT,
+            thread_name_prefix="storage-statvfs"
+        )
+        stale = still_stuck | set(outcome['timed_out'])
+        
         storage_info = []
         
         for path in storage_paths:
-            if not os.path.exists(path):
-                logging.warning(f"Storage path does not exist: {path}")
+            if path in stale:
+                # The mount table is readable even when the mount itself isn't
+                mount_point, fs_type = find_mount(os.path.abspath(path), mounts)
+                logging.warning(f"Storage path is not responding: {path}")
                 storage_info.append({
                     'path': path,
-                    'exists': False,
-                    'error': 'Path does not exist'
+                    'exists': True,
+                    'stale': True,
+                    'mount_point': mount_point,
+                    'filesystem': fs_type,
+                    'error': f"Not responding after {STORAGE_STATVFS_TIMEOUT}s (stale mount?)"
                 })
                 continue
             
-            # Get disk usage stats
-            try:
-                total, used, free = shutil.disk_usage(path)
-                
-                # Get filesystem type - try to use df command
-                fs_type = "Unknown"
-                mount_point = path
-                try:
-                    df_output = subprocess.run(
-                        ['df', '-T', path], 
-                        capture_output=True, 
-                        text=True, 
-                        timeout=5
-                    )
-                    if df_output.returncode == 0:
-                        # Parse df output (skip header)
-                        lines = df_output.stdout.strip().split('\n')
-                        if len(lines) > 1:
-                            parts = lines[1].split()
-                            if len(parts) >= 7:
-                                fs_type = parts[1]
-                                mount_point = parts[6]
-                except (subprocess.SubprocessError, IndexError) as e:
-                    logging.warning(f"Could not determine filesystem type: {e}")
-                
+            if path in outcome['errors']:
+                logging.error(f"Error getting disk usage for {path}: {outcome['errors'][path]}")
                 storage_info.append({
                     'path': path,
                     'exists': True,
-                    'mount_point': mount_point,
-                    'total': total,
-                    'used': used,
-                    'free': free,
-                    'total_gb': round(total / (1024**3), 2),
-                    'used_gb': round(used / (1024**3), 2),
-                    'free_gb': round(free / (1024**3), 2),
-                    'percent_used': round((used / total) * 100, 1),
-                    'filesystem': fs_type
+                    'error': outcome['errors'][path]
                 })
-            except Exception as e:
-                logging.error(f"Error getting disk usage for {path}: {str(e)}")
+                continue
+            
+            probed = outcome['results'][path]
+            if probed is None:
+                logging.warning(f"Storage path does not exist: {path}")
                 storage_info.append({
                     'path': path,
-                    'exists': True,
-                    'error': str(e)
+                    'exists': False,
+                    'error': 'Path does not exist'
                 })
+                continue
+            
+            resolved, st = probed
+            # Same arithmetic as shutil.disk_usage
+            total = st.f_blocks * st.f_frsize
+            free = st.f_bavail * st.f_frsize
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            mount_point, fs_type = find_mount(resolved, mounts)
+            
+            storage_info.append({
+                'path': path,
+                'exists': True,
+                'stale': False,
+                'mount_point': mount_point,
+                'total': total,
+                'used': used,
+                'free': free,
+                'total_gb': round(total / (1024**3), 2),
+                'used_gb': round(used / (1024**3), 2),
+                'free_gb': round(free / (1024**3), 2),
+                'percent_used': round((used / total) * 100, 1) if total else 0,
+                'filesystem': fs_type
+            })
         
         return storage_info
     
@@ -473,10 +547,34 @@ def transfer_files(source_path: str, destination_host: str, destination_path: st
         if ssh:
             ssh.close()
 
+def resolve_storage_path(settings, path: str) -> str:
+    """
+    Check that a path lies within one of the configured storage paths
+    
+    Returns:
+        str: The resolved path
+        
+    Raises:
+        ValueError: If the path is outside every configured storage path
+    """
+    try:
+        configured = json.loads(settings.storage_paths or '[]')
+    except json.JSONDecodeError:
+        configured = []
+    resolved = os.path.realpath(path)
+    for base in configured:
+        base = os.path.realpath(base)
+        if resolved == base or resolved.startswith(base.rstrip('/') + '/'):
+            return resolved
+    raise ValueError(f"'{path}' is not within a configured storage path")
+
 def get_storage_details(path):
     """
     Get detailed information about a storage path
     
+    Directories still being sized at the deadline are included with
+    'partial': True; use dirsize.iter_directory_sizes directly to stream them.
+    
     Args:
         path: The path to examine
         
@@ -493,33 +591,11 @@ def get_storage_details(path):
     try:
         stats = os.stat(path)
         
-        # Get largest directories (limited to avoid long operations)
+        # Size the top-level directories with the parallel in-process walker
         largest_dirs = []
         try:
             if os.path.isdir(path):
-                dirs = [(d, os.path.join(path, d)) for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
-                dir_sizes = []
-                
-                for name, dirpath in dirs:
-                    try:
-                        # Use du command for faster directory size calculation
-                        du_output = subprocess.run(
-                            ['du', '-s', dirpath], 
-                            capture_output=True, 
-                            text=True, 
-                            timeout=10
-                        )
-                        if du_output.returncode == 0:
-                            size_kb = int(du_output.stdout.strip().split()[0])
-                            dir_sizes.append({
-                                'name': name,
-                                'path': dirpath,
-                                'size': size_kb * 1024,  # Convert KB to bytes
-                                'size_gb': round(size_kb / (1024**2), 2)  # Convert KB to GB
-                            })
-                    except Exception as e:
-                        logging.warning(f"Error measuring directory {name}: {str(e)}")
-                        
+                dir_sizes = list(iter_directory_sizes(path))
                 # Sort by size (largest first) and take top 5
                 largest_dirs = sorted(dir_sizes, key=lambda x: x['size'], reverse=True)[:5]
         except Exception as e:
@@ -0,0 +1,208 @@
+import os
+import time
+import threading
+from collections import deque
+
+# Retention per tier, in seconds
+TIMESERIES_RAW_RETENTION = int(os.environ.get("TIMESERIES_RAW_RETENTION", 3600 * 2))
+TIMESERIES_5M_RETENTION = int(os.environ.get("TIMESERIES_5M_RETENTION", 86400 * 2))
+TIMESERIES_1H_RETENTION = int(os.environ.get("TIMESERIES_1H_RETENTION", 86400 * 30))
+
+class _RollupTier:
+    """Fixed-step buckets holding sum/count/min/max for one series"""
+
+    __slots__ = ('step', 'retention', 'buckets')
+
+    def __init__(self, step, retention):
+        self.step = step
+        self.retention = retention
+        # bucket start -> [sum, count, min, max]; filled in time order
+        self.buckets = {}
+
+    def add(self, ts, value):
+        start = ts - ts % self.step
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            self.buckets[start] = [value, 1, value, value]
+        else:
+            bucket[0] += value
+            bucket[1] += 1
+            if value < bucket[2]:
+                bucket[2] = value
+            if value > bucket[3]:
+                bucket[3] = value
+
+    def prune(self, now):
+        cutoff = now - self.retention
+        for start in list(self.buckets):
+            if start >= cutoff:
+                break
+            del self.buckets[start]
+
+    def points(self, start, end):
+        return [
+            {'time': ts, 'avg': b[0] / b[1], 'min': b[2], 'max': b[3]}
+            for ts, b in self.buckets.items()
+            if start <= ts <= end
+        ]
+
+class _Series:
+    """Raw samples plus 5 minute and 1 hour rollups for one metric"""
+
+    __slots__ = ('raw', 'last_ts', 'tiers')
+
+    def __init__(self):
+        self.raw = deque()
+        self.last_ts = None
+        self.tiers = (
+            _RollupTier(300, TIMESERIES_5M_RETENTION),
+            _RollupTier(3600, TIMESERIES_1H_RETENTION)
+        )
+
+    def add(self, ts, value):
+        # RRD fetches overlap, so only accept samples newer than what we have
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+        self.last_ts = ts
+        self.raw.append((ts, value))
+        for tier in self.tiers:
+            tier.add(ts, value)
+        return True
+
+    def prune(self, now):
+        cutoff = now - TIMESERIES_RAW_RETENTION
+        while self.raw and self.raw[0][0] < cutoff:
+            self.raw.popleft()
+        for tier in self.tiers:
+            tier.prune(now)
+
+class TimeSeriesStore:
+    """
+    In-memory time-series store with automatic raw -> 5m -> 1h rollups
+
+    Series are indexed by resource_id, then metric. Each ingested sample is
+    appended to the raw tier and folded into the rollup buckets, and each
+    tier is trimmed to its own retention window.
+    """
+
+    RESOLUTIONS = ('raw', '5m', '1h')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # resource_id -> metric -> _Series
+        self._series = {}
+        self.samples_ingested = 0
+        self.last_ingest = None
+
+    def ingest(self, resource_id, samples):
+        """
+        Add Proxmox rrddata samples for a resource
+
+        Args:
+            resource_id: Resource id such as "node/pve1" or "qemu/100"
+            samples: List of dicts with 'time' and numeric metric values
+
+        Returns:
+            int: Number of new (non-duplicate) values stored
+        """
+        added = 0
+        with self._lock:
+            for sample in sorted(samples, key=lambda s: s.get('time', 0)):
+                ts = sample.get('time')
+                if ts is None:
+                    continue
+                for metric, value in sample.items():
+                    if metric == 'time' or not isinstance(value, (int, float)):
+                        continue
+                    metrics = self._series.get(resource_id)
+                    if metrics is None:
+                        metrics = self._series[resource_id] = {}
+                    series = metrics.get(metric)
+                    if series is None:
+                        series = metrics[metric] = _Series()
+                    if series.add(int(ts), float(value)):
+                        added += 1
+            self.samples_ingested += added
+            self.last_ingest = time.time()
+        return added
+
+    def prune(self, now=None):
+        """Trim every series to its retention windows and drop empty ones"""
+        now = now or time.time()
+        with self._lock:
+            for resource_id in list(self._series):
+                metrics = self._series[resource_id]
+                for metric in list(metrics):
+                    series = metrics[metric]
+                    series.prune(now)
+                    if not series.raw and not any(t.buckets for t in series.tiers):
+                        del metrics[metric]
+                if not metrics:
+                    del self._series[resource_id]
+
+    def has_series(self, resource_id):
+        with self._lock:
+            return resource_id in self._series
+
+    def newest(self, resource_id):
+        """Timestamp of the newest sample stored for a resource, or None"""
+        with self._lock:
+            return max((series.last_ts for series in self._series.get(resource_id, {}).values()),
+                       default=None)
+
+    def metrics(self, resource_id):
+        """List the metrics stored for a resource"""
+        with self._lock:
+            return sorted(self._series.get(resource_id, ()))
+
+    def query(self, resource_id, metric, start=None, end=None, resolution=None):
+        """
+        Read a series, picking the finest tier that covers the range
+
+        Args:
+            resource_id: Resource id
+            metric: Metric name (cpu, mem, netin, ...)
+            start: Range start as epoch seconds (default: one hour ago)
+            end: Range end as epoch seconds (default: now)
+            resolution: Force 'raw', '5m' or '1h'
+
+        Returns:
+            dict: {'resolution': ..., 'points': [...]}
+        """
+        now = time.time()
+        end = end or now
+        start = start or end - 3600
+
+        if resolution is None:
+            age = now - start
+            if age <= TIMESERIES_RAW_RETENTION:
+                resolution = 'raw'
+            elif age <= TIMESERIES_5M_RETENTION:
+                resolution = '5m'
+            else:
+                resolution = '1h'
+        if resolution not in self.RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        with self._lock:
+            series = self._series.get(resource_id, {}).get(metric)
+            if series is None:
+                points = []
+            elif resolution == 'raw':
+                points = [{'time': ts, 'value': v} for ts, v in series.raw if start <= ts <= end]
+            else:
+                tier = series.tiers[self.RESOLUTIONS.index(resolution) - 1]
+                points = tier.points(start, end)
+
+        return {'resolution': resolution, 'points': points}
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'series': sum(len(metrics) for metrics in self._series.values()),
+                'samples_ingested': self.samples_ingested,
+                'last_ingest': self.last_ingest
+            }
+
+# Shared store for Proxmox RRD history
+rrd_store = TimeSeriesStore()
@@ -0,0 +1,58 @@
+import socket
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+class UnixSocketConnection(HTTPConnection):
+    """HTTP connection that dials a Unix domain socket instead of TCP"""
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+class UnixSocketConnectionPool(HTTPConnectionPool):
+    """Keep-alive pool of connections to one Unix socket"""
+
+    def __init__(self, socket_path, timeout=None, maxsize=1):
+        super().__init__("localhost", timeout=timeout, maxsize=maxsize)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        self.num_connections += 1
+        return UnixSocketConnection(self.socket_path, timeout=self.timeout.connect_timeout)
+
+class UnixSocketAdapter(HTTPAdapter):
+    """
+    requests transport adapter that sends every request over a Unix socket
+
+    Mount it on a URL prefix (e.g. "http+unix://docker") and the host part of
+    the URL is ignored; only the path and query are sent.
+    """
+
+    def __init__(self, socket_path, timeout=None, pool_maxsize=10):
+        self.socket_path = socket_path
+        self._pool = UnixSocketConnectionPool(socket_path, timeout=timeout, maxsize=pool_maxsize)
+        super().__init__(pool_maxsize=pool_maxsize)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool
+
+    def get_connection(self, url, proxies=None):
+        return self._pool
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        self._pool.close()
+        super().close()
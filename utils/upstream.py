@@ -0,0 +1,193 @@
+import os
+import time
+import logging
+import threading
+import requests
+
+# Circuit breaker defaults, shared by every upstream target
+UPSTREAM_FAILURE_THRESHOLD = int(os.environ.get("UPSTREAM_FAILURE_THRESHOLD", 5))
+UPSTREAM_RESET_TIMEOUT = float(os.environ.get("UPSTREAM_RESET_TIMEOUT", 30))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+def is_upstream_failure(error):
+    """
+    Decide whether an exception says the upstream itself is unhealthy
+
+    Connection errors, timeouts and 5xx responses count; 4xx responses
+    (unknown container, bad request) are the caller's problem and don't.
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code < 500:
+            return False
+    return isinstance(error, requests.exceptions.RequestException)
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream target
+
+    closed: calls go through; failures are counted.
+    open: calls fail immediately with CircuitOpenError until reset_timeout passes.
+    half-open: a single probe call is let through; success closes the
+    breaker, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=UPSTREAM_FAILURE_THRESHOLD,
+                 reset_timeout=UPSTREAM_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+        self.calls = 0
+        self.rejected = 0
+        self.total_failures = 0
+        self.last_error = None
+        self.last_failure_at = None
+        self.last_success_at = None
+
+    def _admit(self):
+        """Return True if the call may proceed, False to fail fast"""
+        with self._lock:
+            self.calls += 1
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logging.info(f"Circuit '{self.name}' closed after successful probe")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+            self.last_success_at = time.time()
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self.last_error = str(error)
+            self.last_failure_at = time.time()
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logging.warning(f"Circuit '{self.name}' opened after {self.failures} failure(s): {error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn through the breaker
+
+        Raises:
+            CircuitOpenError: If the breaker is open (or a probe is already in flight)
+        """
+        if not self._admit():
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - (self.opened_at or 0)))
+            raise CircuitOpenError(
+                f"{self.name} is unavailable (circuit open, retry in {retry_in:.0f}s): {self.last_error}"
+            )
+        try:
+            result = fn(*args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if is_upstream_failure(e):
+                self.record_failure(e)
+            else:
+                # The upstream answered; it's healthy even if the request was bad
+                self.record_success()
+            raise
+        except Exception:
+            # Local bug, not an upstream verdict: just free the probe slot
+            with self._lock:
+                self._probing = False
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        """Force the breaker closed"""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def get_status(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in,
+                'calls': self.calls,
+                'rejected': self.rejected,
+                'total_failures': self.total_failures,
+                'last_error': self.last_error,
+                'last_failure_at': self.last_failure_at,
+                'last_success_at': self.last_success_at
+            }
+
+def get_breaker(name):
+    """
+    Get (or create) the shared breaker for an upstream target
+
+    Args:
+        name: Target name, e.g. "proxmox:lab" or "docker:10.0.0.5:2375"
+
+    Returns:
+        CircuitBreaker: Shared breaker instance
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+def get_all_breakers():
+    """
+    Get the state of every breaker
+
+    Returns:
+        dict: Target name -> status dict
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_status() for breaker in breakers}
+
+def reset_breaker(name):
+    """
+    Force a breaker closed
+
+    Returns:
+        bool: False if no breaker with that name exists
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+    if breaker is None:
+        return False
+    breaker.reset()
+    return True
@@ -0,0 +1,411 @@
+import os
+import re
+import time
+import subprocess
+from typing import Optional, Tuple, Dict, List, Any
+
+from utils.cache import TTLCache
+from utils.storage import run_ssh_command
+
+# ZFS inventory cache configuration
+ZFS_INVENTORY_TTL = float(os.environ.get("ZFS_INVENTORY_TTL", 30))
+ZFS_COMMAND_TIMEOUT = float(os.environ.get("ZFS_COMMAND_TIMEOUT", 60))
+
+# Dataset properties fetched with `zfs get` on top of the `zfs list` columns
+DATASET_PROPERTIES = (
+    'compression', 'compressratio', 'recordsize', 'volsize', 'quota', 'refquota',
+    'reservation', 'encryption', 'mounted', 'usedbysnapshots', 'usedbychildren',
+    'usedbydataset', 'logicalused'
+)
+
+POOL_COLUMNS = ('name', 'size', 'allocated', 'free', 'fragmentation', 'capacity',
+                'dedupratio', 'health', 'altroot')
+DATASET_COLUMNS = ('name', 'type', 'used', 'available', 'referenced', 'mountpoint')
+
+SECTION_MARKER = '@@zfs-inventory:'
+
+# Every command runs even if an earlier one fails; each section ends with its exit status
+INVENTORY_SCRIPT = '; '.join(
+    f"echo '{SECTION_MARKER}{section}'; {command}; echo \"{SECTION_MARKER}rc $?\""
+    for section, command in (
+        ('zpool-list', f"zpool list -Hp -o {','.join(POOL_COLUMNS)}"),
+        ('zpool-status', "zpool status -P"),
+        ('zfs-list', f"zfs list -Hp -t filesystem,volume -o {','.join(DATASET_COLUMNS)}"),
+        ('zfs-get', f"zfs get -Hp -t filesystem,volume -o name,property,value,source {','.join(DATASET_PROPERTIES)}")
+    )
+)
+
+# vdev classes that appear as headings in the `zpool status` config tree
+VDEV_CLASSES = {'logs', 'cache', 'spares', 'special', 'dedup'}
+
+_inventory_cache = TTLCache("zfs", ZFS_INVENTORY_TTL)
+
+def ssh_target(settings) -> Optional[Tuple[str, str, Optional[str], Optional[str]]]:
+    """
+    SSH connection details from settings, or None to run ZFS commands locally
+
+    Returns:
+        tuple: (host, user, password, key_path) or None
+    """
+    if settings and getattr(settings, 'ssh_host', None):
+        return (
+            settings.ssh_host,
+            getattr(settings, 'ssh_user', None) or 'root',
+            getattr(settings, 'ssh_password', None),
+            getattr(settings, 'ssh_key_path', None)
+        )
+    return None
+
+def target_key(settings):
+    """
+    Identify the ZFS host for per-host caches: (host, user), or 'local'
+
+    Credentials are left out so caches aren't keyed by secrets.
+    """
+    target = ssh_target(settings)
+    return target[:2] if target else 'local'
+
+def run_command(settings, command: str) -> Tuple[str, str, int]:
+    """
+    Run a shell command on the ZFS host (over SSH if configured, else locally)
+
+    Returns:
+        tuple: (stdout, stderr, return_code)
+    """
+    target = ssh_target(settings)
+    if target:
+        return run_ssh_command(*target, command)
+    try:
+        result = subprocess.run(['sh', '-c', command], capture_output=True, text=True,
+                                timeout=ZFS_COMMAND_TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as e:
+        return "", str(e), -1
+    return result.stdout, result.stderr, result.returncode
+
+def parse_value(value: str) -> Any:
+    """Convert a `-Hp` column to int or float where it is numeric; '-' becomes None"""
+    if value in ('-', ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value.rstrip('x%'))
+    except ValueError:
+        return value
+
+def split_sections(output: str) -> Dict[str, Tuple[List[str], int]]:
+    """
+    Split the batched script's output into its sections
+
+    Returns:
+        dict: section name -> (lines, exit status)
+    """
+    sections = {}
+    name = None
+    lines = []
+    for line in output.split('\n'):
+        if line.startswith(SECTION_MARKER):
+            tag = line[len(SECTION_MARKER):]
+            if tag.startswith('rc ') and name:
+                sections[name] = (lines, int(tag[3:] or -1))
+                name = None
+            else:
+                name, lines = tag, []
+        elif name:
+            lines.append(line)
+    return sections
+
+class VDev:
+    """One node of a pool's vdev tree (a mirror/raidz group or a leaf device)"""
+
+    __slots__ = ('name', 'vdev_class', 'state', 'read_errors', 'write_errors',
+                 'checksum_errors', 'children')
+
+    def __init__(self, name: str, vdev_class: str, state: Optional[str],
+                 read_errors: Any = None, write_errors: Any = None, checksum_errors: Any = None):
+        self.name = name
+        self.vdev_class = vdev_class
+        self.state = state
+        self.read_errors = read_errors
+        self.write_errors = write_errors
+        self.checksum_errors = checksum_errors
+        self.children: List['VDev'] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'class': self.vdev_class,
+            'state': self.state,
+            'read_errors': self.read_errors,
+            'write_errors': self.write_errors,
+            'checksum_errors': self.checksum_errors,
+            'children': [child.to_dict() for child in self.children]
+        }
+
+class Dataset:
+    """A filesystem or volume with exact byte counts"""
+
+    __slots__ = ('name', 'type', 'used', 'available', 'referenced', 'mountpoint', 'properties')
+
+    def __init__(self, name: str, type: str, used: Optional[int], available: Optional[int],
+                 referenced: Optional[int], mountpoint: Optional[str]):
+        self.name = name
+        self.type = type
+        self.used = used
+        self.available = available
+        self.referenced = referenced
+        self.mountpoint = mountpoint
+        self.properties: Dict[str, Any] = {}
+
+    @property
+    def pool(self) -> str:
+        return self.name.split('/')[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'pool': self.pool,
+            'type': self.type,
+            'used': self.used,
+            'available': self.available,
+            'referenced': self.referenced,
+            'mountpoint': self.mountpoint,
+            'properties': dict(self.properties)
+        }
+
+class Pool:
+    """A zpool with exact sizes, health and its vdev tree"""
+
+    __slots__ = ('name', 'size', 'allocated', 'free', 'fragmentation', 'capacity',
+                 'dedupratio', 'health', 'altroot', 'state', 'status', 'scan',
+                 'errors', 'vdevs')
+
+    def __init__(self, name: str, size: Optional[int], allocated: Optional[int], free: Optional[int],
+                 fragmentation: Optional[int], capacity: Optional[int], dedupratio: Optional[float],
+                 health: Optional[str], altroot: Optional[str]):
+        self.name = name
+        self.size = size
+        self.allocated = allocated
+        self.free = free
+        self.fragmentation = fragmentation
+        self.capacity = capacity
+        self.dedupratio = dedupratio
+        self.health = health
+        self.altroot = altroot
+        self.state: Optional[str] = None
+        self.status: Optional[str] = None
+        self.scan: Optional[str] = None
+        self.errors: Optional[str] = None
+        self.vdevs: List[VDev] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'size': self.size,
+            'allocated': self.allocated,
+            'free': self.free,
+            'fragmentation': self.fragmentation,
+            'capacity': self.capacity,
+            'dedupratio': self.dedupratio,
+            'health': self.health,
+            'altroot': self.altroot,
+            'state': self.state,
+            'status': self.status,
+            'scan': self.scan,
+            'errors': self.errors,
+            'vdevs': [vdev.to_dict() for vdev in self.vdevs]
+        }
+
+class ZFSInventory:
+    """Pools, vdevs and datasets from one batched inventory run"""
+
+    __slots__ = ('pools', 'datasets', 'errors', 'taken_at', 'duration')
+
+    def __init__(self, pools: List[Pool], datasets: List[Dataset], errors: Dict[str, str],
+                 taken_at: float, duration: float):
+        self.pools = pools
+        self.datasets = datasets
+        self.errors = errors
+        self.taken_at = taken_at
+        self.duration = duration
+
+    @property
+    def age(self) -> float:
+        """Seconds since the inventory was taken"""
+        return time.time() - self.taken_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'taken_at': self.taken_at,
+            'age': round(self.age, 1),
+            'duration': self.duration,
+            'errors': self.errors,
+            'pools': [pool.to_dict() for pool in self.pools],
+            'datasets': [dataset.to_dict() for dataset in self.datasets]
+        }
+
+def parse_pool_list(lines: List[str]) -> List[Pool]:
+    pools = []
+    for line in lines:
+        parts = line.split('\t')
+        if len(parts) < len(POOL_COLUMNS):
+            continue
+        values = dict(zip(POOL_COLUMNS, parts))
+        pools.append(Pool(
+            values['name'],
+            parse_value(values['size']),
+            parse_value(values['allocated']),
+            parse_value(values['free']),
+            parse_value(values['fragmentation']),
+            parse_value(values['capacity']),
+            parse_value(values['dedupratio']),
+            values['health'],
+            None if values['altroot'] == '-' else values['altroot']
+        ))
+    return pools
+
+def parse_pool_status(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse `zpool status -P` into per-pool state, scan text and vdev trees
+
+    The config block is an indented tree: the pool itself at depth 0, vdev
+    groups and class headings (logs, cache, spares...) below it, and leaf
+    devices (full paths thanks to -P) below those.
+
+    Returns:
+        dict: pool name -> {'state', 'status', 'scan', 'errors', 'vdevs'}
+    """
+    pools = {}
+    current = None
+    key = None
+    in_config = False
+    stack: List[Tuple[int, VDev]] = []
+    vdev_class = 'data'
+
+    for line in lines:
+        header = re.match(r'^\s*(pool|state|status|action|scan|errors|config):\s?(.*)$', line)
+        if header and not (in_config and line.startswith('\t')):
+            key, value = header.group(1), header.group(2).strip()
+            if key == 'pool':
+                current = pools.setdefault(value, {'state': None, 'status': None, 'scan': None,
+                                                   'errors': None, 'vdevs': []})
+                in_config = False
+            elif current is not None and key == 'config':
+                in_config = True
+                stack = []
+                vdev_class = 'data'
+            elif current is not None:
+                in_config = False
+                if key in ('state', 'status', 'scan', 'errors'):
+                    current[key] = value
+            continue
+
+        if current is None:
+            continue
+
+        if in_config:
+            if not line.startswith('\t') or not line.strip():
+                continue
+            body = line[1:]
+            depth = (len(body) - len(body.lstrip(' '))) // 2
+            parts = body.split()
+            if parts[0] == 'NAME':
+                continue
+            if depth == 0:
+                if parts[0] in VDEV_CLASSES:
+                    vdev_class = parts[0]
+                # The pool's own row or a class heading; vdevs hang directly below
+                stack = []
+                continue
+            counts = [parse_value(p) for p in parts[2:5]] + [None] * 3
+            vdev = VDev(parts[0], vdev_class, parts[1] if len(parts) > 1 else None, *counts[:3])
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+            if stack:
+                stack[-1][1].children.append(vdev)
+            else:
+                current['vdevs'].append(vdev)
+            stack.append((depth, vdev))
+        elif key in ('status', 'action', 'scan') and line.startswith('\t') and key in current:
+            # Continuation of a multi-line scan/status message
+            current[key] = f"{current[key]} {line.strip()}".strip()
+    return pools
+
+def parse_datasets(list_lines: List[str], get_lines: List[str]) -> List[Dataset]:
+    datasets = {}
+    for line in list_lines:
+        parts = line.split('\t')
+        if len(parts) < len(DATASET_COLUMNS):
+            continue
+        values = dict(zip(DATASET_COLUMNS, parts))
+        datasets[values['name']] = Dataset(
+            values['name'],
+            values['type'],
+            parse_value(values['used']),
+            parse_value(values['available']),
+            parse_value(values['referenced']),
+            None if values['mountpoint'] in ('-', 'none') else values['mountpoint']
+        )
+    for line in get_lines:
+        parts = line.split('\t')
+        if len(parts) < 3 or parts[0] not in datasets:
+            continue
+        datasets[parts[0]].properties[parts[1]] = parse_value(parts[2])
+    return list(datasets.values())
+
+def parse_inventory(output: str, stderr: str = "", taken_at: Optional[float] = None,
+                    duration: float = 0.0) -> ZFSInventory:
+    """
+    Build a ZFSInventory from the batched script's output
+
+    Raises:
+        RuntimeError: If the pool listing itself failed (no ZFS, no permission)
+    """
+    sections = split_sections(output)
+    if 'zpool-list' not in sections or sections['zpool-list'][1] != 0:
+        raise RuntimeError(f"Failed to list ZFS pools: {stderr.strip() or 'no output'}")
+
+    errors = {name: f"exit status {rc}" for name, (_, rc) in sections.items() if rc != 0}
+    pools = parse_pool_list(sections['zpool-list'][0])
+    status = parse_pool_status(sections.get('zpool-status', ([], 0))[0])
+    for pool in pools:
+        for key, value in status.get(pool.name, {}).items():
+            setattr(pool, key, value)
+    datasets = parse_datasets(sections.get('zfs-list', ([], 0))[0],
+                              sections.get('zfs-get', ([], 0))[0])
+    return ZFSInventory(pools, datasets, errors, taken_at or time.time(), duration)
+
+def collect_inventory(settings) -> ZFSInventory:
+    """Run the batched inventory script once and parse it"""
+    taken_at = time.time()
+    started = time.monotonic()
+    stdout, stderr, exit_code = run_command(settings, INVENTORY_SCRIPT)
+    if exit_code == -1 and not stdout:
+        raise RuntimeError(f"ZFS inventory command failed: {stderr.strip()}")
+    return parse_inventory(stdout, stderr, taken_at, round(time.monotonic() - started, 3))
+
+def get_inventory(settings, use_cache: bool = True) -> ZFSInventory:
+    """
+    Get pools, vdevs and datasets, cached for ZFS_INVENTORY_TTL seconds
+
+    All four listings come from a single shell invocation, so a refresh
+    costs one SSH exec; concurrent callers share one in-flight refresh.
+
+    Args:
+        settings: UserSettings object for the SSH connection (optional)
+        use_cache: Set False to force a fresh inventory
+
+    Returns:
+        ZFSInventory
+    """
+    key = target_key(settings)
+    if not use_cache:
+        _inventory_cache.invalidate(key)
+    return _inventory_cache.get_or_load(key, lambda: collect_inventory(settings))
+
+def invalidate_inventory():
+    """Forget cached inventories, e.g. after a pool was created or destroyed"""
+    _inventory_cache.invalidate()
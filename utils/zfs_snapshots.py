@@ -0,0 +1,415 @@
+import os
+import re
+import time
+import shlex
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Iterable
+
+from utils import zfs
+
+# Snapshot index configuration
+ZFS_SNAPSHOT_TTL = float(os.environ.get("ZFS_SNAPSHOT_TTL", 300))
+# Snapshots per `zfs destroy` invocation; keeps the command line well under ARG_MAX
+ZFS_DESTROY_BATCH = int(os.environ.get("ZFS_DESTROY_BATCH", 100))
+
+SNAPSHOT_COLUMNS = 'name,used,creation'
+
+# Retention periods, smallest first, and how a creation time maps to its bucket
+PERIODS = {
+    'hourly': lambda t: (t.year, t.month, t.day, t.hour),
+    'daily': lambda t: (t.year, t.month, t.day),
+    'weekly': lambda t: t.isocalendar()[:2],
+    'monthly': lambda t: (t.year, t.month),
+    'yearly': lambda t: t.year
+}
+
+# zfs.target_key -> SnapshotIndex, so a changed SSH host never sees another host's snapshots
+_indexes = {}
+_index_lock = threading.Lock()
+
+class Snapshot:
+    """One snapshot with its exact unique bytes and retention buckets"""
+
+    __slots__ = ('name', 'dataset', 'snapname', 'used', 'creation', 'buckets')
+
+    def __init__(self, name: str, used: int, creation: int):
+        self.name = name
+        self.dataset, self.snapname = name.split('@', 1)
+        self.used = used
+        self.creation = creation
+        # Bucket keys are computed once here so planning is just set lookups
+        local = datetime.fromtimestamp(creation)
+        self.buckets = {period: key(local) for period, key in PERIODS.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'dataset': self.dataset,
+            'snapshot': self.snapname,
+            'used': self.used,
+            'creation': self.creation
+        }
+
+def parse_snapshots(lines: Iterable[str]) -> Dict[str, List[Snapshot]]:
+    """
+    Parse `zfs list -Hp -t snapshot -o name,used,creation` output
+
+    Returns:
+        dict: dataset name -> snapshots, newest first
+    """
+    by_dataset: Dict[str, List[Snapshot]] = {}
+    for line in lines:
+        parts = line.split('\t')
+        if len(parts) < 3 or '@' not in parts[0]:
+            continue
+        try:
+            snapshot = Snapshot(parts[0], int(parts[1]), int(parts[2]))
+        except ValueError:
+            continue
+        by_dataset.setdefault(snapshot.dataset, []).append(snapshot)
+    for snapshots in by_dataset.values():
+        snapshots.sort(key=lambda s: s.creation, reverse=True)
+    return by_dataset
+
+def parse_policy(values: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Pick retention counts out of query args or a JSON body
+
+    Raises:
+        ValueError: If a count isn't a non-negative integer, or the counts
+            are all zero
+    """
+    policy = {}
+    for key in list(PERIODS) + ['last']:
+        if values.get(key) in (None, ''):
+            continue
+        try:
+            count = int(values[key])
+        except (TypeError, ValueError):
+            raise ValueError(f"'{key}' must be an integer")
+        if count < 0:
+            raise ValueError(f"'{key}' must not be negative")
+        policy[key] = count
+    if not policy:
+        raise ValueError(f"Give at least one of: {', '.join(list(PERIODS) + ['last'])}")
+    if not any(policy.values()):
+        # All zeros keeps nothing, i.e. destroys every snapshot selected
+        raise ValueError("A policy must keep at least one snapshot")
+    return policy
+
+def select_prunable(snapshots: List[Snapshot], policy: Dict[str, int],
+                    pattern: Optional[re.Pattern] = None) -> List[Snapshot]:
+    """
+    Pick the snapshots a keep-N-per-period policy would destroy
+
+    For each period the newest snapshot in each of the N most recent
+    buckets is kept (N hourly keeps the latest snapshot of each of the last
+    N hours that have one). A snapshot kept by any period survives, as do
+    the `last` newest. Snapshots not matching the pattern are never touched.
+
+    Args:
+        snapshots: One dataset's snapshots, newest first
+        policy: Period name -> count, plus optional 'last'
+        pattern: Optional compiled regex matched against the snapshot name
+
+    Returns:
+        list: Snapshots to destroy, newest first
+    """
+    candidates = [s for s in snapshots if pattern is None or pattern.search(s.snapname)]
+    keep = set(s.name for s in candidates[:max(0, policy.get('last', 0))])
+
+    for period in PERIODS:
+        count = policy.get(period, 0)
+        if count <= 0:
+            continue
+        seen = set()
+        for snapshot in candidates:
+            bucket = snapshot.buckets[period]
+            if bucket in seen:
+                continue
+            seen.add(bucket)
+            keep.add(snapshot.name)
+            if len(seen) >= count:
+                break
+
+    return [s for s in candidates if s.name not in keep]
+
+def destroy_commands(snapshots: List[Snapshot], batch: int = ZFS_DESTROY_BATCH) -> List[str]:
+    """
+    Build batched `zfs destroy` commands
+
+    ZFS destroys several snapshots of one dataset in a single call when
+    given as dataset@snap1,snap2,..., which is far cheaper than one
+    transaction group sync per snapshot.
+    """
+    by_dataset: Dict[str, List[str]] = {}
+    for snapshot in snapshots:
+        by_dataset.setdefault(snapshot.dataset, []).append(snapshot.snapname)
+    commands = []
+    for dataset, names in by_dataset.items():
+        for start in range(0, len(names), batch):
+            target = f"{dataset}@{','.join(names[start:start + batch])}"
+            commands.append(f"zfs destroy {shlex.quote(target)}")
+    return commands
+
+class SnapshotIndex:
+    """
+    In-memory index of every snapshot, refreshed per dataset
+
+    A full `zfs list -t snapshot` over tens of thousands of snapshots is
+    slow, so only datasets whose entry is older than the TTL (or that were
+    changed through this index) are re-listed, all in one `zfs list -d 1`
+    call. Retention plans then run entirely from memory.
+    """
+
+    def __init__(self, ttl: float = ZFS_SNAPSHOT_TTL):
+        self.ttl = ttl
+        # dataset -> snapshots, newest first
+        self._snapshots: Dict[str, List[Snapshot]] = {}
+        # dataset -> time.monotonic() of its last listing
+        self._refreshed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        self.full_refreshes = 0
+        self.partial_refreshes = 0
+        self.last_duration = None
+        self.last_error = None
+
+    def refresh(self, settings, datasets: Optional[List[str]] = None, force: bool = False) -> List[str]:
+        """
+        Re-list snapshots for stale datasets
+
+        Args:
+            settings: UserSettings object for the SSH connection (optional)
+            datasets: Restrict to these datasets (default: every filesystem
+                and volume from the ZFS inventory)
+            force: Re-list even if the entries are fresh
+
+        Returns:
+            list: Datasets that were re-listed
+
+        Raises:
+            RuntimeError: If the listing command fails
+        """
+        with self._refresh_lock:
+            full = datasets is None and (force or not self._refreshed)
+            if full:
+                stale = None
+            else:
+                if datasets is None:
+                    datasets = [d.name for d in zfs.get_inventory(settings).datasets]
+                    self._forget_missing(datasets)
+                now = time.monotonic()
+                stale = [d for d in datasets
+                         if force or now - self._refreshed.get(d, float('-inf')) > self.ttl]
+                if not stale:
+                    return []
+
+            started = time.monotonic()
+            command = f"zfs list -Hp -t snapshot -o {SNAPSHOT_COLUMNS}"
+            if stale is not None:
+                command += " -d 1 " + ' '.join(shlex.quote(d) for d in stale)
+            stdout, stderr, exit_code = zfs.run_command(settings, command)
+            # A dataset destroyed since the inventory was taken makes zfs list exit 1
+            # but still prints the others
+            if exit_code != 0 and not stdout:
+                self.last_error = stderr.strip() or f"exit status {exit_code}"
+                raise RuntimeError(f"Failed to list ZFS snapshots: {self.last_error}")
+
+            listed = parse_snapshots(stdout.split('\n'))
+            now = time.monotonic()
+            with self._lock:
+                if full:
+                    self._snapshots = listed
+                    self._refreshed = {dataset: now for dataset in listed}
+                else:
+                    for dataset in stale:
+                        self._snapshots[dataset] = listed.get(dataset, [])
+                        self._refreshed[dataset] = now
+            if full:
+                self.full_refreshes += 1
+            else:
+                self.partial_refreshes += 1
+            self.last_duration = round(time.monotonic() - started, 3)
+            self.last_error = None
+            return list(listed) if full else stale
+
+    def _forget_missing(self, datasets: List[str]):
+        """Drop index entries for datasets that no longer exist"""
+        existing = set(datasets)
+        with self._lock:
+            for dataset in set(self._snapshots) - existing:
+                del self._snapshots[dataset]
+                self._refreshed.pop(dataset, None)
+
+    def mark_stale(self, datasets: Iterable[str]):
+        """Force the next refresh to re-list these datasets"""
+        with self._lock:
+            for dataset in datasets:
+                self._refreshed.pop(dataset, None)
+
+    def snapshots(self, dataset: Optional[str] = None) -> List[Snapshot]:
+        """Indexed snapshots for one dataset, or all of them, newest first per dataset"""
+        with self._lock:
+            if dataset is not None:
+                return list(self._snapshots.get(dataset, []))
+            return [s for snapshots in self._snapshots.values() for s in snapshots]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-dataset snapshot counts, bytes and age range"""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._snapshots.items())
+            refreshed = dict(self._refreshed)
+        return [
+            {
+                'dataset': dataset,
+                'count': len(snapshots),
+                'used': sum(s.used for s in snapshots),
+                'newest': snapshots[0].creation if snapshots else None,
+                'oldest': snapshots[-1].creation if snapshots else None,
+                'age': round(now - refreshed[dataset], 1) if dataset in refreshed else None
+            }
+            for dataset, snapshots in sorted(items)
+        ]
+
+    def plan(self, policy: Dict[str, int], datasets: Optional[List[str]] = None,
+             pattern: Optional[str] = None, recursive: bool = False) -> Dict[str, Any]:
+        """
+        Work out what a retention policy would destroy, from the index alone
+
+        Bytes freed is the sum of each snapshot's `used`, the space unique
+        to it. Destroying neighbouring snapshots together can free more,
+        since blocks shared only between them become unique too, so this
+        is a lower bound.
+
+        Args:
+            policy: {'hourly': N, 'daily': N, 'weekly': N, 'monthly': N,
+                'yearly': N, 'last': N}; missing periods keep nothing
+            datasets: Datasets to plan for (default: all indexed)
+            pattern: Optional regex; only matching snapshot names are considered
+            recursive: Include child datasets of the given ones
+
+        Returns:
+            dict: Per-dataset and total counts and bytes, plus the snapshots to destroy
+
+        Raises:
+            ValueError: For an unknown policy key or invalid pattern
+        """
+        started = time.perf_counter()
+        unknown = set(policy) - set(PERIODS) - {'last'}
+        if unknown:
+            raise ValueError(f"Unknown retention period(s): {', '.join(sorted(unknown))}")
+        try:
+            regex = re.compile(pattern) if pattern else None
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}")
+
+        with self._lock:
+            indexed = dict(self._snapshots)
+        if datasets:
+            wanted = set(datasets)
+            selected = {d: s for d, s in indexed.items()
+                        if d in wanted or (recursive and any(d.startswith(p + '/') for p in wanted))}
+        else:
+            selected = indexed
+
+        per_dataset = []
+        prune: List[Snapshot] = []
+        for dataset, snapshots in sorted(selected.items()):
+            doomed = select_prunable(snapshots, policy, regex)
+            prune.extend(doomed)
+            per_dataset.append({
+                'dataset': dataset,
+                'snapshots': len(snapshots),
+                'prune': len(doomed),
+                'keep': len(snapshots) - len(doomed),
+                'bytes_freed': sum(s.used for s in doomed)
+            })
+
+        return {
+            'policy': policy,
+            'pattern': pattern,
+            'datasets': per_dataset,
+            'total_snapshots': sum(d['snapshots'] for d in per_dataset),
+            'total_prune': len(prune),
+            'bytes_freed': sum(s.used for s in prune),
+            'prune': prune,
+            'planning_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def execute(self, settings, snapshots: List[Snapshot]) -> Dict[str, Any]:
+        """
+        Destroy snapshots with batched `zfs destroy` calls
+
+        Each batch is its own command: a batch is sized to stay under
+        ARG_MAX, and joining them into one `sh -c` script would not be.
+        A failed batch doesn't stop the ones after it.
+
+        Args:
+            settings: UserSettings object for the SSH connection (optional)
+            snapshots: Snapshots to destroy, e.g. a plan's 'prune' list
+
+        Returns:
+            dict: Batch count and the command, exit status and error of any
+                failed batches
+        """
+        commands = destroy_commands(snapshots)
+        failed = []
+        for command in commands:
+            _, stderr, exit_code = zfs.run_command(settings, command)
+            if exit_code != 0:
+                failed.append({
+                    'command': command,
+                    'exit_status': exit_code,
+                    'error': stderr.strip() or f"exit status {exit_code}"
+                })
+
+        # Whatever happened, these datasets no longer match the index
+        self.mark_stale({s.dataset for s in snapshots})
+        if failed:
+            logging.error(f"ZFS snapshot destroy: {len(failed)} of {len(commands)} batches failed: "
+                          f"{failed[0]['error']}")
+        return {
+            'success': not failed,
+            'batches': len(commands),
+            'failed': failed,
+            'error': '; '.join(f['error'] for f in failed) if failed else None
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get index health information
+
+        Returns:
+            dict: Index size and refresh counters
+        """
+        with self._lock:
+            datasets = len(self._snapshots)
+            snapshots = sum(len(s) for s in self._snapshots.values())
+        return {
+            'ttl': self.ttl,
+            'datasets': datasets,
+            'snapshots': snapshots,
+            'full_refreshes': self.full_refreshes,
+            'partial_refreshes': self.partial_refreshes,
+            'last_duration': self.last_duration,
+            'last_error': self.last_error
+        }
+
+def get_index(settings) -> SnapshotIndex:
+    """
+    Return the snapshot index for the ZFS host in settings, creating it on first use
+
+    Args:
+        settings: UserSettings object for the SSH connection (optional)
+    """
+    key = zfs.target_key(settings)
+    with _index_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SnapshotIndex()
+        return index